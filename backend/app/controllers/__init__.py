@@ -1,2 +1,4 @@
 
-from . import usuarios_controller, cuentas_controller, partidas_controller, manual_cuentas_controller
+from . import usuarios_controller, cuentas_controller, partidas_controller, manual_cuentas_controller, mayorizacion_controller, \
+    balanza_controller, estados_financieros_controller, \
+    exportar_controller, mayor_controller
@@ -0,0 +1,61 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.tablas import Balanza, Cuenta
+from ..schemas import BalanzaOut
+from ..utils.conexion_db import get_db
+from ..utils.saldos_mayor import generar_balanza, periodo_de
+
+router = APIRouter(prefix="/balanza", tags=["Balanza de Comprobación"])
+
+
+def _leer_balanza(db: Session, periodo: date):
+    return (
+        db.query(Balanza, Cuenta.codigo, Cuenta.nombre, Cuenta.tipo)
+        .join(Cuenta, Cuenta.id_cuenta == Balanza.id_cuenta)
+        .filter(Balanza.periodo == periodo)
+        .order_by(Cuenta.codigo)
+        .all()
+    )
+
+
+# =====================================================
+# 📘 Balanza de comprobación de un período
+# =====================================================
+@router.get("/", response_model=List[BalanzaOut])
+def obtener_balanza(periodo: Optional[date] = None, regenerar: bool = False, db: Session = Depends(get_db)):
+    """
+    Devuelve la balanza del mes que contiene `periodo` (por defecto el mes actual).
+    Se genera a partir de `mayor` solo si no existe o fue invalidada por nuevas partidas.
+    """
+    periodo = periodo_de(periodo or date.today())
+    filas = [] if regenerar else _leer_balanza(db, periodo)
+    if not filas:
+        try:
+            generar_balanza(db, periodo)
+            db.commit()
+        except IntegrityError:
+            # Otra petición la generó al mismo tiempo; se usa la suya
+            db.rollback()
+        filas = _leer_balanza(db, periodo)
+
+    resultado = []
+    for b, codigo, nombre, tipo in filas:
+        saldo_final = float(b.saldo_final or 0)
+        resultado.append({
+            "id_cuenta": b.id_cuenta,
+            "codigo": codigo,
+            "cuenta": nombre,
+            "tipo_cuenta": (tipo or "Activo").upper(),
+            "saldo_anterior": float(b.saldo_anterior or 0),
+            "debe": float(b.movimientos_debe or 0),
+            "haber": float(b.movimientos_haber or 0),
+            "saldo_final": saldo_final,
+            "saldo_deudor": saldo_final if saldo_final > 0 else 0.0,
+            "saldo_acreedor": -saldo_final if saldo_final < 0 else 0.0
+        })
+    return resultado
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ..models.tablas import Cuenta
-from ..schemas import CuentaCreate, CuentaOut
-from ..utils.conexion_db import get_db
+from ..schemas import CuentaCreate, CuentaOut, CuentaArbolOut
+from ..utils.catalogo_cache import catalogo, marcar_catalogo_modificado
+from ..utils.conexion_db import get_async_db, get_db
 
 router = APIRouter(prefix="/cuentas", tags=["Cuentas"])
 
@@ -24,17 +28,46 @@ def procesar_nivel_y_padre(db: Session, codigo: str) -> (int, Optional[int]):
     if longitud <= 4:
         return 1, None
 
-    # Buscar el padre según las longitudes previas (de 4 en 4)
-    for i in range(longitud - 1, 3, -1):
-        codigo_padre = codigo[:i]
-        padre = db.query(Cuenta).filter(Cuenta.codigo == codigo_padre).first()
-        if padre:
-            nivel = (len(codigo) // 2)  # Puedes ajustar esta lógica según tu estructura
-            return nivel, padre.id_cuenta
+    # Buscar el padre según las longitudes previas en el índice de códigos en memoria
+    # (el catálogo en memoria se recarga si otro worker lo modificó)
+    padre = catalogo.obtener(db).padre_de(codigo)
+    if padre:
+        nivel = (len(codigo) // 2)  # Puedes ajustar esta lógica según tu estructura
+        return nivel, padre.id_cuenta
 
     raise HTTPException(status_code=400, detail=f"No existe una cuenta padre válida para el código {codigo}")
 
 
+def consulta_subcuentas(id_cuenta: int):
+    """Primera subcuenta de la cuenta, si tiene (sobre el índice de cuenta_padre)."""
+    return select(Cuenta.id_cuenta).where(Cuenta.cuenta_padre == id_cuenta).limit(1)
+
+
+def _confirmar(db: Session, error: str):
+    """
+    Confirma un cambio del catálogo y sube su versión en la base. Si otro worker lo cambió
+    entre la validación y el commit, la restricción que falla se informa como 400.
+    """
+    marcar_catalogo_modificado(db)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=error)
+
+
+def _cuenta_out(c: Cuenta, padre: Optional[Cuenta]) -> dict:
+    return {
+        "id_cuenta": c.id_cuenta,
+        "codigo": c.codigo,
+        "nombre": c.nombre,
+        "tipo": c.tipo,
+        "nivel": c.nivel,
+        "cuenta_padre": f"{padre.codigo} - {padre.nombre}" if padre else None,
+        "fecha_creacion": getattr(c, "fecha_creacion", None)
+    }
+
+
 # Crear cuenta
 @router.post("/", response_model=CuentaOut)
 def crear_cuenta(cuenta: CuentaCreate, db: Session = Depends(get_db)):
@@ -53,51 +86,46 @@ def crear_cuenta(cuenta: CuentaCreate, db: Session = Depends(get_db)):
     )
 
     db.add(nueva_cuenta)
-    db.commit()
+    _confirmar(db, "No se pudo crear la cuenta: el código ya existe o la cuenta padre ya no existe")
     db.refresh(nueva_cuenta)
 
     # Añadir nombre del padre al resultado
-    padre_nombre = None
-    if cuenta_padre_id:
-        padre = db.query(Cuenta).filter(Cuenta.id_cuenta == cuenta_padre_id).first()
-        if padre:
-            padre_nombre = f"{padre.codigo} - {padre.nombre}"
-
-    return {
-        "id_cuenta": nueva_cuenta.id_cuenta,
-        "codigo": nueva_cuenta.codigo,
-        "nombre": nueva_cuenta.nombre,
-        "tipo": nueva_cuenta.tipo,
-        "nivel": nueva_cuenta.nivel,
-        "cuenta_padre": padre_nombre,
-        "fecha_creacion": nueva_cuenta.fecha_creacion
-    }
+    padre = db.get(Cuenta, cuenta_padre_id) if cuenta_padre_id else None
+    return _cuenta_out(nueva_cuenta, padre)
 
 
 # Listar cuentas (muestra nombre del padre)
 @router.get("/", response_model=List[CuentaOut])
-def listar_cuentas(db: Session = Depends(get_db)):
-    cuentas = db.query(Cuenta).order_by(Cuenta.codigo).all()
-    resultado = []
+async def listar_cuentas(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    snapshot = await catalogo.obtener_async(db)
+    # Revalidación barata: si el cliente ya tiene esta versión del catálogo no se reenvía
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers={"ETag": snapshot.etag})
+    response.headers["ETag"] = snapshot.etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    # Los padres se resuelven en memoria con el índice por id del catálogo
+    return [_cuenta_out(c, snapshot.por_id.get(c.cuenta_padre)) for c in snapshot.cuentas]
 
-    for c in cuentas:
-        nombre_padre = None
-        if c.cuenta_padre:
-            padre = db.query(Cuenta).filter(Cuenta.id_cuenta == c.cuenta_padre).first()
-            if padre:
-                nombre_padre = f"{padre.codigo} - {padre.nombre}"
 
-        resultado.append({
-            "id_cuenta": c.id_cuenta,
-            "codigo": c.codigo,
-            "nombre": c.nombre,
-            "tipo": c.tipo,
-            "nivel": c.nivel,
-            "cuenta_padre": nombre_padre,
-            "fecha_creacion": getattr(c, "fecha_creacion", None)
-        })
+# Listar cuentas como árbol (cada cuenta con sus subcuentas anidadas)
+@router.get("/arbol", response_model=List[CuentaArbolOut])
+async def listar_arbol_cuentas(db: AsyncSession = Depends(get_async_db)):
+    snapshot = await catalogo.obtener_async(db)
+    cuentas, por_id = snapshot.cuentas, snapshot.por_id
 
-    return resultado
+    nodos = {}
+    for c in cuentas:
+        nodos[c.id_cuenta] = _cuenta_out(c, por_id.get(c.cuenta_padre))
+        nodos[c.id_cuenta]["subcuentas"] = []
+
+    raices = []
+    for c in cuentas:
+        if c.cuenta_padre in nodos:
+            nodos[c.cuenta_padre]["subcuentas"].append(nodos[c.id_cuenta])
+        else:
+            raices.append(nodos[c.id_cuenta])
+    return raices
 
 
 # Obtener cuenta por ID
@@ -107,21 +135,8 @@ def obtener_cuenta(id_cuenta: int, db: Session = Depends(get_db)):
     if not c:
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
 
-    nombre_padre = None
-    if c.cuenta_padre:
-        padre = db.query(Cuenta).filter(Cuenta.id_cuenta == c.cuenta_padre).first()
-        if padre:
-            nombre_padre = f"{padre.codigo} - {padre.nombre}"
-
-    return {
-        "id_cuenta": c.id_cuenta,
-        "codigo": c.codigo,
-        "nombre": c.nombre,
-        "tipo": c.tipo,
-        "nivel": c.nivel,
-        "cuenta_padre": nombre_padre,
-        "fecha_creacion": getattr(c, "fecha_creacion", None)
-    }
+    padre = db.get(Cuenta, c.cuenta_padre) if c.cuenta_padre else None
+    return _cuenta_out(c, padre)
 
 
 # Actualizar cuenta
@@ -140,24 +155,11 @@ def actualizar_cuenta(id: int, data: CuentaCreate, db: Session = Depends(get_db)
     c.nivel = nivel
     c.cuenta_padre = cuenta_padre_id
 
-    db.commit()
+    _confirmar(db, "No se pudo actualizar la cuenta: el código ya existe o la cuenta padre ya no existe")
     db.refresh(c)
 
-    nombre_padre = None
-    if cuenta_padre_id:
-        padre = db.query(Cuenta).filter(Cuenta.id_cuenta == cuenta_padre_id).first()
-        if padre:
-            nombre_padre = f"{padre.codigo} - {padre.nombre}"
-
-    return {
-        "id_cuenta": c.id_cuenta,
-        "codigo": c.codigo,
-        "nombre": c.nombre,
-        "tipo": c.tipo,
-        "nivel": c.nivel,
-        "cuenta_padre": nombre_padre,
-        "fecha_creacion": getattr(c, "fecha_creacion", None)
-    }
+    padre = db.get(Cuenta, cuenta_padre_id) if cuenta_padre_id else None
+    return _cuenta_out(c, padre)
 
 
 # Eliminar cuenta (validando subcuentas)
@@ -168,10 +170,9 @@ def eliminar_cuenta(id_cuenta: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Cuenta no encontrada")
 
     # Validar si tiene subcuentas
-    subcuentas = db.query(Cuenta).filter(Cuenta.cuenta_padre == id_cuenta).first()
-    if subcuentas:
+    if db.scalar(consulta_subcuentas(id_cuenta)) is not None:
         raise HTTPException(status_code=400, detail="No se puede eliminar una cuenta con subcuentas asociadas")
 
     db.delete(cuenta)
-    db.commit()
+    _confirmar(db, "No se puede eliminar una cuenta con subcuentas, movimientos o entradas en el manual")
     return {"mensaje": "Cuenta eliminada correctamente"}
@@ -0,0 +1,31 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..schemas import BalanceGeneralOut, EstadoResultadosOut
+from ..utils.conexion_db import get_db
+from ..utils.estados_financieros import balance_general, estado_resultados
+
+router = APIRouter(prefix="/estados_financieros", tags=["Estados Financieros"])
+
+
+# =====================================================
+# 🏦 Balance General a una fecha de corte
+# =====================================================
+@router.get("/balance_general", response_model=BalanceGeneralOut)
+def obtener_balance_general(hasta: Optional[date] = None, max_nivel: Optional[int] = Query(None, ge=1),
+                            db: Session = Depends(get_db)):
+    return balance_general(db, hasta, max_nivel)
+
+
+# =====================================================
+# 📈 Estado de Resultados de un período
+# =====================================================
+@router.get("/estado_resultados", response_model=EstadoResultadosOut)
+def obtener_estado_resultados(desde: Optional[date] = None, hasta: Optional[date] = None,
+                              max_nivel: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db)):
+    if desde and hasta and desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha inicial no puede ser mayor que la final")
+    return estado_resultados(db, desde, hasta, max_nivel)
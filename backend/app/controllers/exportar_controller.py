@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.tablas import Cuenta, Partida, PartidaDetalle
+from ..utils.conexion_db import SessionLocal, get_db
+from ..utils import exportacion
+from ..utils.exportacion import TIPOS_MIME, generar_archivo
+from ..utils.saldos_mayor import saldo_segun_naturaleza, saldos_por_cuenta
+
+router = APIRouter(prefix="/exportar", tags=["Exportación"])
+
+# Filas que el cursor del servidor entrega por viaje a la base de datos
+FILAS_POR_LECTURA = 2000
+
+
+def _filtrar(query, desde: Optional[date], hasta: Optional[date], tipo: Optional[str]):
+    if desde:
+        query = query.where(Partida.fecha >= desde)
+    if hasta:
+        query = query.where(Partida.fecha <= hasta)
+    if tipo:
+        query = query.where(Partida.tipo == tipo)
+    return query
+
+
+def _leer_en_streaming(consulta):
+    """
+    Recorre la consulta con un cursor del lado del servidor (stream_results) en una sesión
+    propia, que vive lo que dura la descarga y no lo que dura el request.
+    """
+    with SessionLocal() as db:
+        yield from db.execute(consulta.execution_options(yield_per=FILAS_POR_LECTURA))
+
+
+def _verificar_limite_xlsx(db: Session, consulta, filas_extra: int = 0):
+    """Una hoja de Excel no admite más de MAX_FILAS_XLSX filas: se rechaza antes de generar el archivo."""
+    filas = db.scalar(select(func.count()).select_from(consulta.order_by(None).subquery())) + filas_extra
+    maximo = exportacion.MAX_FILAS_XLSX - 1  # la primera fila es el encabezado
+    if filas > maximo:
+        raise HTTPException(status_code=413, detail=(
+            f"La exportación tiene {filas} filas y una hoja XLSX admite {maximo}: "
+            "use formato=csv o acote el rango de fechas"
+        ))
+
+
+def _respuesta(formato: str, nombre: str, encabezados, filas, hoja: str) -> StreamingResponse:
+    return StreamingResponse(
+        generar_archivo(formato, encabezados, filas, hoja),
+        media_type=TIPOS_MIME[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{formato}"'}
+    )
+
+
+# =====================================================
+# 📒 Libro diario: una fila por línea de detalle
+# =====================================================
+@router.get("/diario")
+def exportar_diario(formato: str = Query("csv", pattern="^(csv|xlsx)$"), desde: Optional[date] = None,
+                    hasta: Optional[date] = None, tipo: Optional[str] = None, db: Session = Depends(get_db)):
+    consulta = _filtrar(
+        select(Partida.id_partida, Partida.fecha, Partida.tipo, Partida.descripcion, Cuenta.codigo, Cuenta.nombre,
+               PartidaDetalle.debe, PartidaDetalle.haber, PartidaDetalle.descripcion)
+        .join(PartidaDetalle, PartidaDetalle.id_partida == Partida.id_partida)
+        .join(Cuenta, Cuenta.id_cuenta == PartidaDetalle.id_cuenta),
+        desde, hasta, tipo
+    ).order_by(Partida.fecha, Partida.id_partida, PartidaDetalle.id_detalle)
+
+    if formato == "xlsx":
+        _verificar_limite_xlsx(db, consulta)
+
+    encabezados = ["Partida", "Fecha", "Tipo", "Concepto", "Código", "Cuenta", "Debe", "Haber", "Detalle"]
+    return _respuesta(formato, f"libro_diario_{date.today()}", encabezados, _leer_en_streaming(consulta), "Diario")
+
+
+# =====================================================
+# 📗 Libro mayor de una cuenta con saldo acumulado
+# =====================================================
+@router.get("/mayor/{id_cuenta}")
+def exportar_mayor(id_cuenta: int, formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+                   desde: Optional[date] = None, hasta: Optional[date] = None, tipo: Optional[str] = None,
+                   db: Session = Depends(get_db)):
+    cuenta = db.get(Cuenta, id_cuenta)
+    if not cuenta:
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada")
+
+    # Saldo acumulado antes del rango (desde `mayor`), para que el primer saldo sea el real
+    saldo_inicial = 0
+    if desde:
+        for s in saldos_por_cuenta(db, None, desde - timedelta(days=1), tipo, id_cuenta):
+            saldo_inicial = saldo_segun_naturaleza(cuenta.tipo, s["debe"], s["haber"])
+
+    consulta = _filtrar(
+        select(Partida.fecha, Partida.id_partida, Partida.tipo, Partida.descripcion,
+               PartidaDetalle.debe, PartidaDetalle.haber)
+        .join(PartidaDetalle, PartidaDetalle.id_partida == Partida.id_partida)
+        .where(PartidaDetalle.id_cuenta == id_cuenta),
+        desde, hasta, tipo
+    ).order_by(Partida.fecha, Partida.id_partida, PartidaDetalle.id_detalle)
+
+    if formato == "xlsx":
+        _verificar_limite_xlsx(db, consulta, filas_extra=1)  # fila del saldo inicial
+
+    tipo_cuenta = cuenta.tipo
+
+    def filas():
+        saldo = saldo_inicial
+        yield desde, None, None, "Saldo inicial", None, None, saldo
+        for fecha, id_partida, tipo_partida, descripcion, debe, haber in _leer_en_streaming(consulta):
+            saldo += saldo_segun_naturaleza(tipo_cuenta, debe or 0, haber or 0)
+            yield fecha, id_partida, tipo_partida, descripcion, debe, haber, saldo
+
+    encabezados = ["Fecha", "Partida", "Tipo", "Concepto", "Debe", "Haber", "Saldo"]
+    return _respuesta(formato, f"mayor_{cuenta.codigo}_{date.today()}", encabezados, filas(), cuenta.codigo)
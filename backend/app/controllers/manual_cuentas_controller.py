@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ..models import tablas
 from ..schemas import ManualCuentaCreate, ManualCuentaOut
-from ..utils.conexion_db import get_db
+from ..utils.conexion_db import get_async_db, get_db
 
 router = APIRouter(prefix="/manual_cuentas", tags=["Manual de Cuentas"])
 
@@ -43,12 +45,15 @@ def crear_manual(manual: ManualCuentaCreate, db: Session = Depends(get_db)):
 # 📋 Listar manuales de cuentas
 # =====================================================
 @router.get("/", response_model=List[ManualCuentaOut])
-def listar_manuales(db: Session = Depends(get_db)):
-    manuales = db.query(tablas.ManualCuenta).all()
+async def listar_manuales(db: AsyncSession = Depends(get_async_db)):
+    # La cuenta de cada manual llega en la misma consulta (LEFT JOIN)
+    filas = await db.execute(
+        select(tablas.ManualCuenta, tablas.Cuenta)
+        .outerjoin(tablas.Cuenta, tablas.Cuenta.id_cuenta == tablas.ManualCuenta.id_cuenta)
+    )
     resultado = []
 
-    for m in manuales:
-        cuenta = db.query(tablas.Cuenta).filter(tablas.Cuenta.id_cuenta == m.id_cuenta).first()
+    for m, cuenta in filas:
         resultado.append({
             "id_manual": m.id_manual,
             "id_cuenta": m.id_cuenta,
@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from ..models.tablas import Cuenta, Partida, PartidaDetalle
+from ..schemas import LibroMayorOut
+from ..utils.conexion_db import get_db
+from ..utils.saldos_mayor import TIPOS_DEUDORES, saldo_segun_naturaleza, saldos_por_cuenta
+
+router = APIRouter(prefix="/mayor", tags=["Libro Mayor"])
+
+
+def _leer_cursor(cursor: str):
+    """El cursor tiene la forma 'AAAA-MM-DD_idpartida_iddetalle' (último movimiento visto)."""
+    try:
+        fecha, id_partida, id_detalle = cursor.split("_", 2)
+        return date.fromisoformat(fecha), int(id_partida), int(id_detalle)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def consultas_libro_mayor(id_cuenta: int, signo: int, limit: int, ultimo_visto: Optional[tuple] = None,
+                          desde: Optional[date] = None, hasta: Optional[date] = None, tipo: Optional[str] = None):
+    """
+    Consulta de la página (una fila de más) con el acumulado dentro de ella y, si hay cursor,
+    la suma de los movimientos del rango hasta la clave del último visto (None si no lo hay).
+    """
+    neto = (func.coalesce(PartidaDetalle.debe, 0) - func.coalesce(PartidaDetalle.haber, 0)) * literal(signo)
+    consulta = (
+        select(PartidaDetalle.id_detalle, Partida.id_partida, Partida.fecha, Partida.tipo, Partida.descripcion,
+               PartidaDetalle.debe, PartidaDetalle.haber, neto.label("neto"))
+        .join(Partida, Partida.id_partida == PartidaDetalle.id_partida)
+        .where(PartidaDetalle.id_cuenta == id_cuenta)
+    )
+    if desde:
+        consulta = consulta.where(Partida.fecha >= desde)
+    if hasta:
+        consulta = consulta.where(Partida.fecha <= hasta)
+    if tipo:
+        consulta = consulta.where(Partida.tipo == tipo)
+
+    # El cursor se aplica en la consulta sobre el índice y la ventana (SUM ... OVER con marco
+    # ROWS) solo recorre la página; lo anterior a la página se suma hasta la clave del cursor
+    previos = None
+    if ultimo_visto:
+        clave = tuple_(Partida.fecha, Partida.id_partida, PartidaDetalle.id_detalle)
+        anteriores = consulta.where(clave <= tuple_(*ultimo_visto)).subquery()
+        previos = select(func.sum(anteriores.c.neto))
+        consulta = consulta.where(clave > tuple_(*ultimo_visto))
+
+    pagina = consulta.order_by(Partida.fecha, Partida.id_partida, PartidaDetalle.id_detalle).limit(limit + 1).subquery()
+    orden = (pagina.c.fecha, pagina.c.id_partida, pagina.c.id_detalle)
+    return (select(pagina, func.sum(pagina.c.neto).over(order_by=orden, rows=(None, 0)).label("acumulado"))
+            .order_by(*orden)), previos
+
+
+# =====================================================
+# 📗 Libro mayor de una cuenta con saldo acumulado
+# =====================================================
+@router.get("/{id_cuenta}", response_model=LibroMayorOut)
+def libro_mayor(id_cuenta: int, response: Response, desde: Optional[date] = None, hasta: Optional[date] = None,
+                tipo: Optional[str] = None, limit: int = Query(500, ge=1, le=5000), cursor: Optional[str] = None,
+                db: Session = Depends(get_db)):
+    cuenta = db.get(Cuenta, id_cuenta)
+    if not cuenta:
+        raise HTTPException(status_code=404, detail="Cuenta no encontrada")
+    signo = 1 if (cuenta.tipo or "ACTIVO").upper() in TIPOS_DEUDORES else -1
+
+    # Saldo de todo lo anterior al rango: meses completos desde `mayor` y días sueltos desde el detalle
+    saldo_inicial = 0
+    if desde:
+        for s in saldos_por_cuenta(db, None, desde - timedelta(days=1), tipo, id_cuenta):
+            saldo_inicial = saldo_segun_naturaleza(cuenta.tipo, s["debe"], s["haber"])
+
+    # El saldo previo a la página lo calcula siempre el servidor (el cursor solo lleva la clave)
+    pagina, previos = consultas_libro_mayor(id_cuenta, signo, limit, _leer_cursor(cursor) if cursor else None,
+                                            desde, hasta, tipo)
+    saldo_previo = saldo_inicial + ((db.scalar(previos) or 0) if previos is not None else 0)
+    filas = db.execute(pagina).all()
+
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        response.headers["X-Next-Cursor"] = f"{ultima.fecha.isoformat()}_{ultima.id_partida}_{ultima.id_detalle}"
+
+    return {
+        "id_cuenta": cuenta.id_cuenta,
+        "codigo": cuenta.codigo,
+        "cuenta": cuenta.nombre,
+        "tipo_cuenta": (cuenta.tipo or "Activo").upper(),
+        "saldo_inicial": float(saldo_inicial),
+        "movimientos": [
+            {
+                "id_detalle": f.id_detalle,
+                "id_partida": f.id_partida,
+                "fecha": f.fecha,
+                "tipo": f.tipo,
+                "descripcion": f.descripcion,
+                "debe": float(f.debe or 0),
+                "haber": float(f.haber or 0),
+                "saldo": float(saldo_previo + (f.acumulado or 0))
+            }
+            for f in filas
+        ]
+    }
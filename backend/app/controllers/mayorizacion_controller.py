@@ -0,0 +1,70 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..schemas import MayorizacionOut, SaldoJerarquicoOut
+from ..utils.auth_dependencies import requerir_admin
+from ..utils.catalogo_cache import catalogo
+from ..utils.conexion_db import get_db
+from ..utils.saldos_mayor import acumular_jerarquia, reconstruir_mayor, saldo_segun_naturaleza, saldos_por_cuenta
+
+router = APIRouter(prefix="/mayorizacion", tags=["Mayorización"])
+
+
+# =====================================================
+# 📊 Resumen de saldos por cuenta (desde los saldos materializados)
+# =====================================================
+@router.get("/", response_model=List[MayorizacionOut])
+def resumen_mayorizacion(desde: Optional[date] = None, hasta: Optional[date] = None,
+                         tipo: Optional[str] = None, id_cuenta: Optional[int] = None,
+                         db: Session = Depends(get_db)):
+    return [
+        {
+            "id_cuenta": f["id_cuenta"],
+            "codigo": f["codigo"],
+            "cuenta": f["nombre"],
+            "tipo_cuenta": (f["tipo"] or "Activo").upper(),
+            "debe": float(f["debe"]),
+            "haber": float(f["haber"]),
+            "saldo": float(saldo_segun_naturaleza(f["tipo"], f["debe"], f["haber"]))
+        }
+        for f in saldos_por_cuenta(db, desde, hasta, tipo, id_cuenta)
+    ]
+
+
+# =====================================================
+# 🌳 Saldos acumulados por niveles del catálogo
+# =====================================================
+@router.get("/jerarquia", response_model=List[SaldoJerarquicoOut])
+def saldos_jerarquicos(desde: Optional[date] = None, hasta: Optional[date] = None, tipo: Optional[str] = None,
+                       max_nivel: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db)):
+    """Cada cuenta con el total de su subárbol; max_nivel colapsa el reporte a esa profundidad."""
+    saldos = saldos_por_cuenta(db, desde, hasta, tipo)
+    return [
+        {
+            "id_cuenta": f["id_cuenta"],
+            "codigo": f["codigo"],
+            "cuenta": f["nombre"],
+            "tipo_cuenta": (f["tipo"] or "Activo").upper(),
+            "nivel": f["nivel"],
+            "id_cuenta_padre": f["id_cuenta_padre"],
+            "debe": float(f["debe"]),
+            "haber": float(f["haber"]),
+            "saldo": float(saldo_segun_naturaleza(f["tipo"], f["debe"], f["haber"]))
+        }
+        for f in acumular_jerarquia(catalogo.obtener(db).cuentas, saldos, max_nivel)
+    ]
+
+
+# =====================================================
+# 🔄 Reconstrucción completa de la tabla mayor
+# =====================================================
+# Bloquea mayor y balanza mientras se reconstruyen: solo administradores
+@router.post("/reconstruir", dependencies=[Depends(requerir_admin)])
+def reconstruir(db: Session = Depends(get_db)):
+    registros = reconstruir_mayor(db)
+    db.commit()
+    return {"mensaje": "Mayor reconstruido correctamente", "registros": registros}
+
@@ -1,54 +1,204 @@
+import io
+from datetime import date
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..utils.conexion_db import get_db
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from ..utils.catalogo_cache import catalogo
+from ..utils.conexion_db import get_async_db, get_db
+from ..utils.partidas_utils import TIPOS_PARTIDA, a_monto, leer_csv, leer_ndjson, validar_detalles
+from ..utils.saldos_mayor import aplicar_movimientos
 from ..models.tablas import Partida, PartidaDetalle, Cuenta
-from ..schemas import PartidaCreate, PartidaOut, PartidaDetalleCreate
+from ..schemas import PartidaCreate, PartidaOut, PartidaDetalleCreate, ImportacionOut
+
+# Partidas por lote en la importación masiva (una sentencia multi-VALUES por lote)
+LOTE_IMPORTACION = 1000
+# Máximo de errores detallados que se devuelven en el reporte
+MAX_ERRORES_REPORTE = 1000
 
 router = APIRouter(prefix="/partidas", tags=["partidas"])
 
+
+def _partida_out(p: Partida) -> PartidaOut:
+    detalles_out = [PartidaDetalleCreate(id_cuenta=d.id_cuenta, debe=float(d.debe or 0), haber=float(d.haber or 0), descripcion=d.descripcion) for d in p.detalles]
+    return PartidaOut(id_partida=p.id_partida, fecha=p.fecha, descripcion=p.descripcion, tipo=p.tipo, detalles=detalles_out)
+
+def _leer_cursor(cursor: str):
+    """El cursor tiene la forma 'AAAA-MM-DD_id' (clave de la última partida vista)."""
+    try:
+        fecha, id_partida = cursor.split("_", 1)
+        return date.fromisoformat(fecha), int(id_partida)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def consulta_listado(limit: int, ultima_vista: Optional[tuple] = None, skip: int = 0,
+                     desde: Optional[date] = None, hasta: Optional[date] = None,
+                     tipo: Optional[str] = None, id_cuenta: Optional[int] = None):
+    """Consulta de una página del libro diario (una fila de más para saber si hay otra página)."""
+    query = select(Partida)
+    if desde:
+        query = query.where(Partida.fecha >= desde)
+    if hasta:
+        query = query.where(Partida.fecha <= hasta)
+    if tipo:
+        query = query.where(Partida.tipo == tipo)
+    if id_cuenta:
+        query = query.where(Partida.detalles.any(PartidaDetalle.id_cuenta == id_cuenta))
+
+    # Paginación por cursor (keyset) sobre el índice (fecha, id_partida); skip queda por compatibilidad
+    if ultima_vista:
+        query = query.where(tuple_(Partida.fecha, Partida.id_partida) > tuple_(*ultima_vista))
+    elif skip:
+        query = query.offset(skip)
+
+    # Los detalles de toda la página se cargan en una sola consulta adicional (SELECT ... IN)
+    return (query.options(selectinload(Partida.detalles))
+            .order_by(Partida.fecha, Partida.id_partida)
+            .limit(limit + 1))
+
 @router.get("/", response_model=list[PartidaOut])
-def listar_partidas(skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
-    partidas = db.query(Partida).offset(skip).limit(limit).all()
-    result = []
-    for p in partidas:
-        detalles = db.query(PartidaDetalle).filter(PartidaDetalle.id_partida == p.id_partida).all()
-        detalles_out = [PartidaDetalleCreate(id_cuenta=d.id_cuenta, debe=float(d.debe or 0), haber=float(d.haber or 0), descripcion=d.descripcion) for d in detalles]
-        result.append(PartidaOut(id_partida=p.id_partida, fecha=p.fecha, descripcion=p.descripcion, tipo=p.tipo, detalles=detalles_out))
-    return result
+async def listar_partidas(response: Response, skip: int = 0, limit: int = Query(200, ge=1, le=1000),
+                          cursor: Optional[str] = None, desde: Optional[date] = None, hasta: Optional[date] = None,
+                          tipo: Optional[str] = None, id_cuenta: Optional[int] = None,
+                          db: AsyncSession = Depends(get_async_db)):
+    ultima_vista = _leer_cursor(cursor) if cursor else None
+    partidas = (await db.execute(
+        consulta_listado(limit, ultima_vista, skip, desde, hasta, tipo, id_cuenta)
+    )).scalars().all()
+    if len(partidas) > limit:
+        partidas = partidas[:limit]
+        ultima = partidas[-1]
+        response.headers["X-Next-Cursor"] = f"{ultima.fecha.isoformat()}_{ultima.id_partida}"
+    return [_partida_out(p) for p in partidas]
+
+def _insertar_lote(db: Session, lote: list):
+    """
+    Inserta las cabeceras con RETURNING y luego todas las líneas del lote en un executemany;
+    los saldos de `mayor` se actualizan en la misma transacción. Se guardan los mismos
+    importes en centavos que revisó validar_detalles, no los float recibidos.
+    """
+    montos = [[(a_monto(d.debe), a_monto(d.haber)) for d in p.detalles] for p in lote]
+    ids = db.execute(
+        insert(Partida).returning(Partida.id_partida, sort_by_parameter_order=True),
+        [{"fecha": p.fecha, "descripcion": p.descripcion, "tipo": p.tipo} for p in lote]
+    ).scalars().all()
+    db.execute(insert(PartidaDetalle), [
+        {"id_partida": id_partida, "id_cuenta": d.id_cuenta, "debe": debe, "haber": haber,
+         "descripcion": d.descripcion}
+        for id_partida, p, importes in zip(ids, lote, montos) for d, (debe, haber) in zip(p.detalles, importes)
+    ])
+    aplicar_movimientos(db, ((d.id_cuenta, p.fecha, debe, haber)
+                             for p, importes in zip(lote, montos) for d, (debe, haber) in zip(p.detalles, importes)))
+    return ids
 
 @router.post("/", response_model=PartidaOut)
 def crear_partida(data: PartidaCreate, db: Session = Depends(get_db)):
-    p = Partida(fecha=data.fecha, descripcion=data.descripcion, tipo=data.tipo)
-    db.add(p); db.commit(); db.refresh(p)
-    detalles_objs = []
-    for d in data.detalles:
-        # validate cuenta exists
-        cuenta = db.query(Cuenta).filter(Cuenta.id_cuenta == d.id_cuenta).first()
-        if not cuenta:
-            raise HTTPException(status_code=400, detail=f"Cuenta {d.id_cuenta} no existe")
-        det = PartidaDetalle(id_partida=p.id_partida, id_cuenta=d.id_cuenta, debe=d.debe or 0, haber=d.haber or 0, descripcion=d.descripcion)
-        db.add(det); detalles_objs.append(det)
-    db.commit()
-    detalles = db.query(PartidaDetalle).filter(PartidaDetalle.id_partida == p.id_partida).all()
-    detalles_out = [PartidaDetalleCreate(id_cuenta=d.id_cuenta, debe=float(d.debe or 0), haber=float(d.haber or 0), descripcion=d.descripcion) for d in detalles]
-    return PartidaOut(id_partida=p.id_partida, fecha=p.fecha, descripcion=p.descripcion, tipo=p.tipo, detalles=detalles_out)
+    if (data.tipo or "DIARIO") not in TIPOS_PARTIDA:
+        raise HTTPException(status_code=400, detail=f"Tipo de partida inválido: {data.tipo}")
+
+    # Todas las cuentas referenciadas se validan con una sola consulta IN (...)
+    ids = {d.id_cuenta for d in data.detalles}
+    existentes = {i for (i,) in db.query(Cuenta.id_cuenta).filter(Cuenta.id_cuenta.in_(ids))} if ids else set()
+    error = validar_detalles(data.detalles, existentes)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    # Cabecera y detalles en una sola transacción: un INSERT ... RETURNING y un solo lote de líneas
+    data = data.model_copy(update={"fecha": data.fecha or date.today(), "tipo": data.tipo or "DIARIO"})
+    try:
+        id_partida, = _insertar_lote(db, [data])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="No se pudo registrar la partida: una cuenta referenciada ya no existe")
+
+    # La respuesta se arma con los datos en memoria, sin volver a consultar
+    detalles_out = [PartidaDetalleCreate(id_cuenta=d.id_cuenta, debe=float(a_monto(d.debe)), haber=float(a_monto(d.haber)), descripcion=d.descripcion) for d in data.detalles]
+    return PartidaOut(id_partida=id_partida, fecha=data.fecha, descripcion=data.descripcion, tipo=data.tipo, detalles=detalles_out)
+
+@router.post("/importar", response_model=ImportacionOut)
+def importar_partidas(archivo: UploadFile = File(...), formato: Optional[str] = None,
+                      omitir_errores: bool = False, db: Session = Depends(get_db)):
+    """
+    Importa partidas en bloque desde CSV (una fila por línea de detalle, agrupadas por
+    `referencia`) o NDJSON (una partida por línea). Todo ocurre en una sola transacción:
+    si hay errores y omitir_errores es falso no se guarda nada.
+    """
+    formato = (formato or ("ndjson" if (archivo.filename or "").endswith((".ndjson", ".jsonl")) else "csv")).lower()
+    if formato not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Formato no soportado (use csv o ndjson)")
+
+    snapshot = catalogo.obtener(db)
+    texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    lector = leer_csv(texto, snapshot.por_codigo) if formato == "csv" else leer_ndjson(texto)
+
+    importadas = lineas = total_errores = 0
+    errores = []
+    lote = []
+    try:
+        for partida, error in lector:
+            if partida is not None:
+                if not partida.descripcion:
+                    error = "Falta la descripción"
+                elif partida.tipo not in TIPOS_PARTIDA:
+                    error = f"Tipo de partida inválido: {partida.tipo}"
+                else:
+                    error = validar_detalles(partida.detalles, snapshot.por_id)
+                if error:
+                    error = {"linea": partida.linea, "referencia": partida.referencia, "error": error}
+            if error:
+                total_errores += 1
+                if len(errores) < MAX_ERRORES_REPORTE:
+                    errores.append(error)
+                continue
+
+            if total_errores and not omitir_errores:
+                continue  # ya no se insertará nada; solo se sigue validando el resto del archivo
+
+            lote.append(partida)
+            if len(lote) >= LOTE_IMPORTACION:
+                _insertar_lote(db, lote)
+                importadas += len(lote)
+                lineas += sum(len(p.detalles) for p in lote)
+                lote = []
+
+        if total_errores and not omitir_errores:
+            db.rollback()
+            raise HTTPException(status_code=400, detail={
+                "mensaje": "Importación rechazada: no se guardó ninguna partida",
+                "importadas": 0, "lineas": 0, "total_errores": total_errores, "errores": errores
+            })
+
+        if lote:
+            _insertar_lote(db, lote)
+            importadas += len(lote)
+            lineas += sum(len(p.detalles) for p in lote)
+        db.commit()
+    except IntegrityError:
+        # Una cuenta del catálogo leído se eliminó en otro worker antes de confirmar
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Importación rechazada: una cuenta referenciada ya no existe")
+
+    return {"importadas": importadas, "lineas": lineas, "total_errores": total_errores, "errores": errores}
 
 @router.get("/{id}", response_model=PartidaOut)
 def ver_partida(id: int, db: Session = Depends(get_db)):
-    p = db.query(Partida).filter(Partida.id_partida == id).first()
+    p = db.query(Partida).options(selectinload(Partida.detalles)).filter(Partida.id_partida == id).first()
     if not p:
         raise HTTPException(status_code=404, detail="Partida no encontrada")
-    detalles = db.query(PartidaDetalle).filter(PartidaDetalle.id_partida == p.id_partida).all()
-    detalles_out = [PartidaDetalleCreate(id_cuenta=d.id_cuenta, debe=float(d.debe or 0), haber=float(d.haber or 0), descripcion=d.descripcion) for d in detalles]
-    return PartidaOut(id_partida=p.id_partida, fecha=p.fecha, descripcion=p.descripcion, tipo=p.tipo, detalles=detalles_out)
+    return _partida_out(p)
 
 @router.delete("/{id}")
 def eliminar_partida(id: int, db: Session = Depends(get_db)):
     p = db.query(Partida).filter(Partida.id_partida == id).first()
     if not p:
         raise HTTPException(status_code=404, detail="Partida no encontrada")
-    # Eliminar detalles primero (por la FK con cascade)
+    # Revertir sus movimientos en el mayor y eliminar detalles primero (por la FK con cascade)
+    detalles = db.query(PartidaDetalle.id_cuenta, PartidaDetalle.debe, PartidaDetalle.haber).filter(PartidaDetalle.id_partida == id).all()
+    aplicar_movimientos(db, ((d.id_cuenta, p.fecha, d.debe, d.haber) for d in detalles), signo=-1)
     db.query(PartidaDetalle).filter(PartidaDetalle.id_partida == id).delete()
     db.delete(p)
     db.commit()
@@ -1,52 +1,89 @@
+import math
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..models.tablas import Usuario
 from ..schemas import UsuarioCreate, LoginRequest
-from ..utils.auth_utils import encriptar, verificar
-from ..utils.conexion_db import get_db
+from ..utils.auth_dependencies import es_admin, invalidar_usuario, obtener_usuario_opcional, requerir_admin
+from ..utils.auth_utils import ColaHashLlena, encriptar_async, verificar_async
+from ..utils.conexion_db import get_async_db, get_db
+from ..utils.limite_intentos import limite_login
 from ..utils.token import crear_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# Rol de quien se registra por su cuenta; cualquier otro lo asigna un administrador
+ROL_POR_DEFECTO = "usuario"
+
+
+def _servicio_ocupado():
+    return HTTPException(status_code=503, detail="Servicio de autenticación ocupado, intente de nuevo",
+                         headers={"Retry-After": "1"})
+
 
 # ---------------------- REGISTRO ----------------------
 @router.post("/register")
-def register(usuario: UsuarioCreate, db: Session = Depends(get_db)):
-    db_user = db.query(Usuario).filter(Usuario.username == usuario.username).first()
+async def register(usuario: UsuarioCreate, db: AsyncSession = Depends(get_async_db),
+                   solicitante: Optional[dict] = Depends(obtener_usuario_opcional)):
+    rol = usuario.rol or ROL_POR_DEFECTO
+    if rol != ROL_POR_DEFECTO and not es_admin(solicitante):
+        raise HTTPException(status_code=403, detail=f"Solo un administrador puede crear usuarios con rol '{rol}'")
+
+    db_user = (await db.execute(select(Usuario.id_usuario).where(Usuario.username == usuario.username))).first()
 
     if db_user:
         raise HTTPException(status_code=400, detail="Usuario ya existe")
 
+    # bcrypt corre en el ejecutor acotado, fuera del event loop y del threadpool
+    try:
+        password_hash = await encriptar_async(usuario.password)
+    except ColaHashLlena:
+        raise _servicio_ocupado()
+
     nuevo = Usuario(
         username=usuario.username,
-        password_hash=encriptar(usuario.password),
+        password_hash=password_hash,
         nombre_completo=usuario.nombre_completo,
-        rol=usuario.rol,
+        rol=rol,
         activo=True
     )
 
     db.add(nuevo)
-    db.commit()
-    db.refresh(nuevo)
+    await db.commit()
 
     return {"mensaje": "Usuario creado", "usuario": nuevo.username}
 
 
 # ---------------------- LOGIN ----------------------
 @router.post("/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    usuario = db.query(Usuario).filter(Usuario.username == data.username).first()
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    # Límite de intentos por usuario antes de gastar CPU en bcrypt
+    clave = data.username.strip().lower()
+    espera = limite_login.registrar(clave)
+    if espera:
+        raise HTTPException(status_code=429, detail="Demasiados intentos de inicio de sesión",
+                            headers={"Retry-After": str(math.ceil(espera))})
+
+    usuario = (await db.execute(select(Usuario).where(Usuario.username == data.username))).scalars().first()
 
     if not usuario:
         raise HTTPException(status_code=401, detail="Usuario o contraseña incorrectos")
 
-    if not verificar(data.password, usuario.password_hash):
+    try:
+        valida = await verificar_async(data.password, usuario.password_hash)
+    except ColaHashLlena:
+        raise _servicio_ocupado()
+    if not valida:
         raise HTTPException(status_code=401, detail="Usuario o contraseña incorrectos")
 
     if not usuario.activo:
         raise HTTPException(status_code=403, detail="Usuario inactivo")
 
+    limite_login.reiniciar(clave)
     token = crear_token({"sub": usuario.username, "rol": usuario.rol})
 
     return {
@@ -58,3 +95,26 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
             "rol": usuario.rol
         }
     }
+
+
+# ---------------------- ACTIVAR / DESACTIVAR ----------------------
+def _cambiar_estado(db: Session, id_usuario: int, activo: bool):
+    usuario = db.get(Usuario, id_usuario)
+    if not usuario:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    usuario.activo = activo
+    db.commit()
+    # Sus tokens vigentes dejan de aceptarse en cuanto se olvida el estado en caché
+    invalidar_usuario(usuario.username)
+    return {"mensaje": "Usuario activado" if activo else "Usuario desactivado", "usuario": usuario.username}
+
+
+@router.put("/usuarios/{id_usuario}/desactivar", dependencies=[Depends(requerir_admin)])
+def desactivar_usuario(id_usuario: int, db: Session = Depends(get_db)):
+    return _cambiar_estado(db, id_usuario, False)
+
+
+@router.put("/usuarios/{id_usuario}/activar", dependencies=[Depends(requerir_admin)])
+def activar_usuario(id_usuario: int, db: Session = Depends(get_db)):
+    return _cambiar_estado(db, id_usuario, True)
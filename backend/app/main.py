@@ -1,30 +1,71 @@
 
-from fastapi import FastAPI
-from .utils.conexion_db import engine, Base
+from fastapi import Depends, FastAPI, Query
+from fastapi.responses import PlainTextResponse
+from .utils.auth_dependencies import requerir_admin
+from .utils.auth_utils import ejecutor_hash
+from .utils.conexion_db import async_engine, consultas_lentas, engine, estado_pool
+from .utils.migraciones import DB_VERIFICAR_ESQUEMA, verificar_esquema
+from .utils.instrumentacion import MiddlewareInstrumentacion, configurar_log, instalar_eventos_sql, metricas_rutas
 from .controllers import usuarios_controller, cuentas_controller, partidas_controller, manual_cuentas_controller, \
-    panel_controller
+    panel_controller, mayorizacion_controller, balanza_controller, estados_financieros_controller, \
+    exportar_controller, mayor_controller
 
 
 def create_app():
     app = FastAPI(title="Sistema Contable API")
 
+    # Sentencias SQL, tiempo de BD y latencia por petición (Server-Timing, log JSON y /metrics)
+    configurar_log()
+    instalar_eventos_sql(engine, async_engine.sync_engine)
+    app.add_middleware(MiddlewareInstrumentacion)
+
     # include routers
     app.include_router(usuarios_controller.router)
     app.include_router(cuentas_controller.router)
     app.include_router(partidas_controller.router)
     app.include_router(manual_cuentas_controller.router)
     app.include_router(panel_controller.router)
+    app.include_router(mayorizacion_controller.router)
+    app.include_router(balanza_controller.router)
+    app.include_router(estados_financieros_controller.router)
+    app.include_router(exportar_controller.router)
+    app.include_router(mayor_controller.router)
 
 
     @app.on_event("startup")
     def on_startup():
-        # create tables if not exist
-        Base.metadata.create_all(bind=engine)
+        # El esquema lo crean las migraciones (alembic upgrade head, una vez antes de los
+        # workers); aquí solo se comprueba que la base esté en la revisión del código
+        if DB_VERIFICAR_ESQUEMA:
+            verificar_esquema(engine)
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await async_engine.dispose()
 
     @app.get("/health")
     def health():
         return {"status": "ok"}
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        return PlainTextResponse(metricas_rutas.exposicion(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/health/pool", dependencies=[Depends(requerir_admin)])
+    def health_pool():
+        return {"sync": estado_pool(engine.pool), "async": estado_pool(async_engine.sync_engine.pool)}
+
+    @app.get("/health/consultas_lentas", dependencies=[Depends(requerir_admin)])
+    def health_consultas_lentas(limite: int = Query(50, ge=1, le=1000)):
+        if consultas_lentas is None:
+            return {"activo": False, "detalle": "Definir SLOW_QUERY_MS para registrar las consultas lentas"}
+        return {"activo": True, "umbral_ms": consultas_lentas.umbral_ms, "explain": consultas_lentas.explain,
+                "total": consultas_lentas.total, "consultas": consultas_lentas.entradas(limite)}
+
+    @app.get("/health/hash", dependencies=[Depends(requerir_admin)])
+    def health_hash():
+        return ejecutor_hash.estado()
+
     return app
 
 app = create_app()
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, Numeric, ForeignKey, TIMESTAMP
+from sqlalchemy import BigInteger, Column, Integer, String, Text, Boolean, Date, DateTime, Numeric, ForeignKey, TIMESTAMP, Index, \
+    CheckConstraint, Computed
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..utils.conexion_db import Base
@@ -17,11 +18,16 @@ class Usuario(Base):
 
 class Cuenta(Base):
     __tablename__ = "cuentas"
+    __table_args__ = (
+        # Subcuentas de una cuenta y verificación de la FK al borrarla
+        Index("ix_cuentas_cuenta_padre", "cuenta_padre"),
+        CheckConstraint("tipo IN ('Activo', 'Pasivo', 'Capital', 'Ingreso', 'Gasto')", name="cuentas_tipo_check"),
+    )
     id_cuenta = Column(Integer, primary_key=True, index=True)
     codigo = Column(String(20), unique=True, nullable=False)
     nombre = Column(String(100), nullable=False)
     tipo = Column(String(20))
-    nivel = Column(Integer, default=1)
+    nivel = Column(Integer, nullable=False, default=1, server_default="1")
     cuenta_padre = Column(Integer, ForeignKey('cuentas.id_cuenta'), nullable=True)
     fecha_creacion = Column(DateTime, server_default=func.now())
     id_usuario_crea = Column(Integer, ForeignKey('usuarios.id_usuario'), nullable=True)
@@ -29,6 +35,12 @@ class Cuenta(Base):
 
 class Partida(Base):
     __tablename__ = "partidas"
+    __table_args__ = (
+        # Orden estable del libro diario y paginación por cursor (fecha, id_partida)
+        Index("ix_partidas_fecha_id", "fecha", "id_partida"),
+        Index("ix_partidas_tipo_fecha", "tipo", "fecha"),
+        CheckConstraint("tipo IN ('DIARIO', 'AJUSTE', 'CIERRE')", name="partidas_tipo_check"),
+    )
     id_partida = Column(Integer, primary_key=True, index=True)
     fecha = Column(Date, nullable=False)
     descripcion = Column(Text, nullable=False)
@@ -36,9 +48,19 @@ class Partida(Base):
     id_usuario_crea = Column(Integer, ForeignKey('usuarios.id_usuario'), nullable=True)
     fecha_creacion = Column(DateTime, server_default=func.now())
 
+    detalles = relationship("PartidaDetalle", back_populates="partida", order_by="PartidaDetalle.id_detalle",
+                            cascade="all, delete-orphan", passive_deletes=True)
+
 
 class PartidaDetalle(Base):
     __tablename__ = "partida_detalle"
+    __table_args__ = (
+        # Cubre el libro mayor por cuenta: los importes se leen del índice sin visitar la tabla
+        Index("ix_partida_detalle_cuenta_movimientos", "id_cuenta", "id_partida",
+              postgresql_include=["id_detalle", "debe", "haber"]),
+        # Detalles de una página de partidas (SELECT ... IN) y borrado en cascada
+        Index("ix_partida_detalle_partida", "id_partida"),
+    )
     id_detalle = Column(Integer, primary_key=True, index=True)
     id_partida = Column(Integer, ForeignKey('partidas.id_partida', ondelete='CASCADE'), nullable=False)
     id_cuenta = Column(Integer, ForeignKey('cuentas.id_cuenta'), nullable=False)
@@ -46,8 +68,45 @@ class PartidaDetalle(Base):
     haber = Column(Numeric(12, 2), default=0)
     descripcion = Column(Text)
 
+    partida = relationship("Partida", back_populates="detalles")
+
+class Mayor(Base):
+    """
+    Saldos materializados por cuenta y período (primer día del mes).
+    saldo_debe / saldo_haber son los movimientos del período y saldo_final el
+    saldo acumulado al cierre del período en sentido deudor (debe - haber).
+    """
+    __tablename__ = "mayor"
+    __table_args__ = (
+        Index("ux_mayor_cuenta_periodo", "id_cuenta", "periodo", unique=True),
+    )
+    id_mayor = Column(Integer, primary_key=True, index=True)
+    id_cuenta = Column(Integer, ForeignKey('cuentas.id_cuenta'), nullable=False)
+    saldo_debe = Column(Numeric(12, 2), default=0)
+    saldo_haber = Column(Numeric(12, 2), default=0)
+    saldo_final = Column(Numeric(12, 2), default=0)
+    periodo = Column(Date, nullable=False)
+    fecha_actualizacion = Column(DateTime, server_default=func.now())
+
+class Balanza(Base):
+    """Balanza de comprobación precalculada por período; importes en sentido deudor (debe - haber)."""
+    __tablename__ = "balanza"
+    __table_args__ = (
+        Index("ux_balanza_periodo_cuenta", "periodo", "id_cuenta", unique=True),
+    )
+    id_balanza = Column(Integer, primary_key=True, index=True)
+    periodo = Column(Date, nullable=False)
+    id_cuenta = Column(Integer, ForeignKey('cuentas.id_cuenta'), nullable=False)
+    saldo_anterior = Column(Numeric(12, 2), default=0)
+    movimientos_debe = Column(Numeric(12, 2), default=0)
+    movimientos_haber = Column(Numeric(12, 2), default=0)
+    saldo_final = Column(Numeric(12, 2), default=0)
+
 class ManualCuenta(Base):
     __tablename__ = "manual_cuentas"
+    __table_args__ = (
+        Index("ix_manual_cuentas_cuenta", "id_cuenta"),
+    )
 
     id_manual = Column(Integer, primary_key=True, index=True)
     id_cuenta = Column(Integer, ForeignKey("cuentas.id_cuenta", ondelete="CASCADE"), nullable=False)
@@ -59,4 +118,45 @@ class ManualCuenta(Base):
     cuenta = relationship("Cuenta")
 
 
+class Factura(Base):
+    __tablename__ = "facturas"
+    id_factura = Column(Integer, primary_key=True)
+    numero_factura = Column(String(20), unique=True, nullable=False)
+    fecha = Column(Date, nullable=False)
+    cliente = Column(String(100))
+    total = Column(Numeric(12, 2), nullable=False)
+    iva = Column(Numeric(12, 2), default=0)
+    total_con_iva = Column(Numeric(12, 2), Computed("total + iva", persisted=True))
+    id_usuario_crea = Column(Integer, ForeignKey("usuarios.id_usuario"))
+    fecha_creacion = Column(TIMESTAMP, server_default=func.now())
+
+
+class Auditoria(Base):
+    __tablename__ = "auditoria"
+    id_auditoria = Column(Integer, primary_key=True)
+    tabla_afectada = Column(String(50))
+    accion = Column(String(20))
+    id_registro = Column(Integer)
+    id_usuario = Column(Integer, ForeignKey("usuarios.id_usuario"))
+    fecha_accion = Column(TIMESTAMP, server_default=func.now())
+    descripcion = Column(Text)
+
+
+class VersionLibro(Base):
+    """
+    Una sola fila con un contador que aumenta en cada transacción que modifica `mayor`.
+    Es compartido por todos los workers: las cachés de reportes lo usan en su clave.
+    """
+    __tablename__ = "version_libro"
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
 
+class VersionCatalogo(Base):
+    """
+    Una sola fila con un contador que aumenta en cada transacción que modifica el catálogo
+    de cuentas. Cada worker la compara con la de su copia en memoria del catálogo.
+    """
+    __tablename__ = "version_catalogo"
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -50,6 +50,13 @@ class CuentaOut(CuentaBase):
         orm_mode = True
 
 
+class CuentaArbolOut(CuentaOut):
+    subcuentas: List["CuentaArbolOut"] = []
+
+
+CuentaArbolOut.model_rebuild()
+
+
 # ----------------- PARTIDAS -----------------
 class PartidaDetalleCreate(BaseModel):
     id_cuenta: int
@@ -96,3 +103,99 @@ class ManualCuentaOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+# ----------------- MAYORIZACIÓN -----------------
+class MayorizacionOut(BaseModel):
+    id_cuenta: int
+    codigo: str
+    cuenta: str
+    tipo_cuenta: str
+    debe: float = 0.0
+    haber: float = 0.0
+    saldo: float = 0.0
+
+
+class SaldoJerarquicoOut(MayorizacionOut):
+    nivel: Optional[int] = 1
+    id_cuenta_padre: Optional[int] = None
+
+
+class MovimientoMayorOut(BaseModel):
+    id_detalle: int
+    id_partida: int
+    fecha: date
+    tipo: Optional[str] = None
+    descripcion: Optional[str] = None
+    debe: float = 0.0
+    haber: float = 0.0
+    saldo: float = 0.0
+
+
+class LibroMayorOut(BaseModel):
+    id_cuenta: int
+    codigo: str
+    cuenta: str
+    tipo_cuenta: str
+    saldo_inicial: float = 0.0
+    movimientos: List[MovimientoMayorOut] = []
+
+
+# ----------------- IMPORTACIÓN DE PARTIDAS -----------------
+class ErrorImportacion(BaseModel):
+    linea: int
+    referencia: Optional[str] = None
+    error: str
+
+
+class ImportacionOut(BaseModel):
+    importadas: int
+    lineas: int
+    total_errores: int
+    errores: List[ErrorImportacion] = []
+
+
+# ----------------- BALANZA DE COMPROBACIÓN -----------------
+class BalanzaOut(BaseModel):
+    id_cuenta: int
+    codigo: str
+    cuenta: str
+    tipo_cuenta: str
+    saldo_anterior: float = 0.0
+    debe: float = 0.0
+    haber: float = 0.0
+    saldo_final: float = 0.0
+    saldo_deudor: float = 0.0
+    saldo_acreedor: float = 0.0
+
+
+# ----------------- ESTADOS FINANCIEROS -----------------
+class LineaEstadoOut(BaseModel):
+    id_cuenta: int
+    codigo: str
+    cuenta: str
+    nivel: Optional[int] = 1
+    saldo: float = 0.0
+
+
+class SeccionEstadoOut(BaseModel):
+    cuentas: List[LineaEstadoOut] = []
+    total: float = 0.0
+
+
+class BalanceGeneralOut(BaseModel):
+    hasta: Optional[date] = None
+    activo: SeccionEstadoOut
+    pasivo: SeccionEstadoOut
+    capital: SeccionEstadoOut
+    resultado_ejercicio: float = 0.0
+    total_pasivo_capital: float = 0.0
+    cuadrado: bool = True
+
+
+class EstadoResultadosOut(BaseModel):
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    ingresos: SeccionEstadoOut
+    gastos: SeccionEstadoOut
+    utilidad_neta: float = 0.0
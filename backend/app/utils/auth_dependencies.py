@@ -1,23 +1,89 @@
+import os
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy.orm import Session
 
+from ..models.tablas import Usuario
+from .cache_ttl import CacheTTL
+from .conexion_db import get_db
 from .token import SECRET_KEY, ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Para endpoints públicos que se comportan distinto si quien llama es un usuario con sesión
+oauth2_opcional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
+# Tokens ya verificados (firma y expiración): se evita decodificarlos en cada request
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+# Estado (activo, rol) de cada usuario; se invalida al desactivarlo y el TTL acota
+# lo que tarda en notarse en otros workers
+AUTH_USUARIO_CACHE_TTL = float(os.getenv("AUTH_USUARIO_CACHE_TTL", "30"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "2048"))
 
-def obtener_usuario_actual(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+_tokens = CacheTTL(max_entradas=AUTH_CACHE_MAX, ttl=AUTH_TOKEN_CACHE_TTL)
+_usuarios = CacheTTL(max_entradas=AUTH_CACHE_MAX, ttl=AUTH_USUARIO_CACHE_TTL)
 
-        username = payload.get("sub")
-        rol = payload.get("rol")
 
-        if username is None:
+def _verificar_token(token: str) -> dict:
+    payload = _tokens.obtener(token)
+    if payload is None:
+        try:
+            datos = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Token inválido")
+        if datos.get("sub") is None:
             raise HTTPException(status_code=401, detail="Token inválido")
+        payload = {"username": datos["sub"], "exp": datos.get("exp")}
+        _tokens.guardar(token, payload)
+
+    # Un token en caché puede vencer antes que su entrada
+    if payload["exp"] is not None and payload["exp"] <= time.time():
+        _tokens.invalidar(token)
+        raise HTTPException(status_code=401, detail="Token expirado")
+    return payload
+
+
+def _estado_usuario(db: Session, username: str) -> dict:
+    estado = _usuarios.obtener(username)
+    if estado is None:
+        fila = db.query(Usuario.activo, Usuario.rol).filter(Usuario.username == username).first()
+        estado = {"existe": fila is not None, "activo": bool(fila and fila.activo), "rol": fila.rol if fila else None}
+        _usuarios.guardar(username, estado)
+    return estado
+
+
+def invalidar_usuario(username: str):
+    """Olvida el estado en caché del usuario (llamar al desactivarlo o cambiar su rol)."""
+    _usuarios.invalidar(username)
+
 
-        return {"username": username, "rol": rol}
+def obtener_usuario_actual(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    username = _verificar_token(token)["username"]
 
-    except JWTError:
+    estado = _estado_usuario(db, username)
+    if not estado["existe"]:
         raise HTTPException(status_code=401, detail="Token inválido")
+    if not estado["activo"]:
+        raise HTTPException(status_code=403, detail="Usuario inactivo")
+
+    return {"username": username, "rol": estado["rol"]}
+
+
+def obtener_usuario_opcional(token: Optional[str] = Depends(oauth2_opcional), db: Session = Depends(get_db)):
+    """El usuario del token si se envió uno (inválido sigue siendo 401); None si la petición es anónima."""
+    if not token:
+        return None
+    return obtener_usuario_actual(token, db)
+
+
+def es_admin(usuario: Optional[dict]) -> bool:
+    return bool(usuario) and (usuario.get("rol") or "").lower() == "admin"
+
+
+def requerir_admin(usuario: dict = Depends(obtener_usuario_actual)):
+    if not es_admin(usuario):
+        raise HTTPException(status_code=403, detail="Se requiere rol de administrador")
+    return usuario
@@ -1,7 +1,15 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
 
+from .metricas import Histograma
+
 SECRET_KEY = "TU_SECRET_KEY"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
@@ -15,6 +23,75 @@ def encriptar(password: str):
 def verificar(password: str, hashed):
     return pwd_context.verify(password, hashed)
 
+# =====================================================
+# Ejecutor acotado para bcrypt
+# =====================================================
+# bcrypt libera el GIL mientras calcula, así que unos pocos hilos dedicados aprovechan los
+# núcleos sin ocupar el threadpool de los endpoints. Si la cola se llena se rechaza de inmediato.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+HASH_MAX_EN_COLA = int(os.getenv("HASH_MAX_EN_COLA", "32"))
+
+
+class ColaHashLlena(Exception):
+    pass
+
+
+class EjecutorHash:
+    def __init__(self, workers: int = HASH_WORKERS, max_en_cola: int = HASH_MAX_EN_COLA):
+        self.workers = workers
+        self.max_en_cola = max_en_cola
+        self._ejecutor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pendientes = 0  # en cola + en ejecución
+        self.rechazados = 0
+        self.espera = Histograma()
+        self.duracion = Histograma()
+
+    def _medir(self, funcion, encolado: float, *args):
+        inicio = time.perf_counter()
+        self.espera.observar(inicio - encolado)
+        try:
+            return funcion(*args)
+        finally:
+            self.duracion.observar(time.perf_counter() - inicio)
+
+    def _liberar(self, _futuro):
+        with self._lock:
+            self.pendientes -= 1
+
+    async def ejecutar(self, funcion, *args):
+        with self._lock:
+            if self.pendientes >= self.workers + self.max_en_cola:
+                self.rechazados += 1
+                raise ColaHashLlena()
+            self.pendientes += 1
+        futuro = self._ejecutor.submit(self._medir, funcion, time.perf_counter(), *args)
+        # Se libera el cupo al terminar o al cancelarse la tarea antes de empezar
+        futuro.add_done_callback(self._liberar)
+        return await asyncio.wrap_future(futuro)
+
+    def estado(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_en_cola": self.max_en_cola,
+            "pendientes": self.pendientes,
+            "rechazados": self.rechazados,
+            "espera": self.espera.resumen(),
+            "duracion": self.duracion.resumen(),
+        }
+
+
+ejecutor_hash = EjecutorHash()
+
+
+async def encriptar_async(password: str):
+    return await ejecutor_hash.ejecutar(encriptar, password)
+
+
+async def verificar_async(password: str, hashed):
+    return await ejecutor_hash.ejecutar(verificar, password, hashed)
+
+
 def crear_token(data: dict):
     to_encode = data.copy()
     to_encode["exp"] = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class CacheTTL:
+    """
+    Caché LRU en memoria con expiración por tiempo, segura entre hilos.
+    Pensada para resultados costosos de calcular cuya clave ya incluye
+    la versión de los datos de origen (así una escritura nunca sirve datos viejos).
+    """
+
+    def __init__(self, max_entradas: int = 128, ttl: float = 300):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable):
+        """Valor vigente para la clave o None."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            creado, valor = entrada
+            if time.monotonic() - creado >= self.ttl:
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Hashable, valor):
+        with self._lock:
+            self._datos[clave] = (time.monotonic(), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def obtener_o_calcular(self, clave: Hashable, calcular: Callable):
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, clave: Hashable = None):
+        """Elimina una clave o, sin argumentos, toda la caché."""
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
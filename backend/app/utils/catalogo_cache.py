@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.tablas import Cuenta, VersionCatalogo
+
+
+def _consulta_version():
+    return select(VersionCatalogo.version).where(VersionCatalogo.id == 1)
+
+
+def version_catalogo(db: Session) -> int:
+    """
+    Versión del catálogo guardada en la base (tabla version_catalogo): aumenta con cada
+    transacción confirmada que modificó `cuentas`, en cualquier worker.
+    """
+    return db.scalar(_consulta_version()) or 0
+
+
+def marcar_catalogo_modificado(db: Session):
+    """Las escrituras sobre `cuentas` lo llaman antes del commit para subir la versión."""
+    db.info["catalogo_modificado"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _al_confirmar(session):
+    if session.info.pop("catalogo_modificado", False):
+        session.execute(update(VersionCatalogo).where(VersionCatalogo.id == 1)
+                        .values(version=VersionCatalogo.version + 1))
+
+
+@event.listens_for(Session, "after_rollback")
+def _al_revertir(session):
+    session.info.pop("catalogo_modificado", None)
+
+
+class SnapshotCatalogo:
+    """
+    Copia inmutable del catálogo de cuentas con sus índices en memoria:
+    por id, por código y búsqueda del padre por prefijo de código.
+    """
+
+    def __init__(self, version: int, cuentas: list):
+        self.version = version
+        self.cuentas = cuentas  # ordenadas por código
+        self.por_id = {c.id_cuenta: c for c in cuentas}
+        self.por_codigo = {c.codigo: c for c in cuentas}
+
+        huella = hashlib.sha1()
+        for c in cuentas:
+            huella.update(f"{c.id_cuenta}|{c.codigo}|{c.nombre}|{c.tipo}|{c.nivel}|{c.cuenta_padre}\n".encode())
+        self.etag = f'"{huella.hexdigest()}"'
+
+    def padre_de(self, codigo: str):
+        """Cuenta cuyo código es el prefijo más largo de `codigo` (mínimo 4 dígitos)."""
+        for i in range(len(codigo) - 1, 3, -1):
+            padre = self.por_codigo.get(codigo[:i])
+            if padre:
+                return padre
+        return None
+
+
+class CatalogoCache:
+    """
+    Instantánea del catálogo en memoria del proceso. Cada lectura consulta la versión del
+    catálogo en la base (una fila por clave primaria) y recarga la instantánea si otro
+    worker lo modificó desde que se cargó.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._carga = threading.Lock()
+        self._snapshot: Optional[SnapshotCatalogo] = None
+        self._carga_async: Optional[asyncio.Lock] = None  # se crea dentro del event loop
+
+    def _vigente(self, version: int) -> Optional[SnapshotCatalogo]:
+        snapshot = self._snapshot
+        if snapshot and snapshot.version == version:
+            return snapshot
+        return None
+
+    def obtener(self, db: Session, refrescar: bool = False) -> SnapshotCatalogo:
+        version = version_catalogo(db)
+        snapshot = None if refrescar else self._vigente(version)
+        if snapshot:
+            return snapshot
+
+        # Una sola carga a la vez; quien esperaba reutiliza la instantánea recién publicada
+        with self._carga:
+            snapshot = None if refrescar else self._vigente(version)
+            if snapshot:
+                return snapshot
+            return self._publicar(version, db.execute(self._consulta()).all())
+
+    async def obtener_async(self, db: AsyncSession, refrescar: bool = False) -> SnapshotCatalogo:
+        """Igual que obtener() pero con una sesión asíncrona, sin bloquear el event loop."""
+        version = (await db.scalar(_consulta_version())) or 0
+        snapshot = None if refrescar else self._vigente(version)
+        if snapshot:
+            return snapshot
+
+        if self._carga_async is None:
+            self._carga_async = asyncio.Lock()
+        async with self._carga_async:
+            snapshot = None if refrescar else self._vigente(version)
+            if snapshot:
+                return snapshot
+            return self._publicar(version, (await db.execute(self._consulta())).all())
+
+    @staticmethod
+    def _consulta():
+        return select(Cuenta.id_cuenta, Cuenta.codigo, Cuenta.nombre, Cuenta.tipo, Cuenta.nivel,
+                      Cuenta.cuenta_padre, Cuenta.fecha_creacion).order_by(Cuenta.codigo)
+
+    def _publicar(self, version: int, filas) -> SnapshotCatalogo:
+        snapshot = SnapshotCatalogo(version, [SimpleNamespace(**f._asdict()) for f in filas])
+        # Una carga más lenta que otra posterior no reemplaza una instantánea más nueva
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version <= version:
+                self._snapshot = snapshot
+        return snapshot
+
+
+catalogo = CatalogoCache()
@@ -1,14 +1,250 @@
 
-from sqlalchemy import create_engine
+import collections
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 
+from .instrumentacion import medicion_actual
+from .metricas import Histograma
+
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:abc123@bd:5432/contabilidad")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Configuración del pool (por proceso/worker). Con DB_POOL_PRE_PING=false no se hace el
+# round-trip de verificación en cada checkout y DB_POOL_RECYCLE descarta las conexiones viejas.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "si", "yes")
+
+# Registro de consultas lentas (opcional): se activa definiendo SLOW_QUERY_MS. Con
+# SLOW_QUERY_EXPLAIN=true se captura además el plan de los SELECT lentos en PostgreSQL
+# (EXPLAIN ANALYZE vuelve a ejecutar la consulta: usar solo mientras se diagnostica).
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() in ("1", "true", "si", "yes")
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "200"))
+SLOW_QUERY_ARCHIVO = os.getenv("SLOW_QUERY_ARCHIVO")  # JSON por línea, rotado a los 10 MB
+
+
+def _url_async(url: str) -> str:
+    """Misma base de datos con el driver asíncrono (asyncpg para PostgreSQL, aiosqlite para SQLite)."""
+    esquema, resto = url.split("://", 1)
+    if esquema.startswith("postgresql") or esquema == "postgres":
+        return f"postgresql+asyncpg://{resto}"
+    if esquema.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{resto}"
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _url_async(DATABASE_URL))
+
+# Esquema de PostgreSQL donde viven las tablas (p. ej. "contabilidad"); vacío usa el
+# search_path por defecto del usuario. Lo respetan la app y las migraciones.
+DB_SCHEMA = os.getenv("DB_SCHEMA", "")
+
+
+def argumentos_conexion(url: str) -> dict:
+    """connect_args que fijan el search_path en DB_SCHEMA (psycopg2 y asyncpg lo reciben distinto)."""
+    if not DB_SCHEMA or not url.startswith("postgres"):
+        return {}
+    if url.startswith("postgresql+asyncpg"):
+        return {"server_settings": {"search_path": DB_SCHEMA}}
+    return {"options": f"-csearch_path={DB_SCHEMA}"}
+
+
+class _MedicionPool:
+    """
+    Mide cada checkout del pool: latencia (histograma), cuántos tuvieron que esperar
+    porque no había conexiones libres, el tiempo total de espera y los timeouts.
+    Solo usa la API pública del pool; los límites configurados salen de _CONFIG_POOL.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout = Histograma()
+        self._lock_metricas = threading.Lock()
+        self.esperas = 0
+        self.espera_total_s = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        saturado = self.checkedout() >= self.size() + max(_CONFIG_POOL["max_overflow"], 0)
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._lock_metricas:
+                self.timeouts += 1
+            raise
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.checkout.observar(duracion)
+            if saturado:
+                with self._lock_metricas:
+                    self.esperas += 1
+                    self.espera_total_s += duracion
+
+
+class QueuePoolMedido(_MedicionPool, QueuePool):
+    pass
+
+
+class AsyncQueuePoolMedido(_MedicionPool, AsyncAdaptedQueuePool):
+    pass
+
+
+_CONFIG_POOL = dict(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                    pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
+
+engine = create_engine(DATABASE_URL, poolclass=QueuePoolMedido, connect_args=argumentos_conexion(DATABASE_URL),
+                       **_CONFIG_POOL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Motor asíncrono para los endpoints de lectura más concurridos: no ocupan un hilo
+# del threadpool mientras esperan a la base de datos
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=AsyncQueuePoolMedido,
+                                   connect_args=argumentos_conexion(ASYNC_DATABASE_URL), **_CONFIG_POOL)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+# =====================================================
+# 🐢 Consultas lentas
+# =====================================================
+def _forma_parametros(parametros, varias: bool):
+    """Tipos de los parámetros, nunca sus valores (pueden ser datos contables o contraseñas)."""
+    if varias:
+        return {"filas": len(parametros), "fila": _forma_parametros(parametros[0], False) if parametros else None}
+    if isinstance(parametros, dict):
+        return {clave: type(valor).__name__ for clave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [type(valor).__name__ for valor in parametros]
+    return type(parametros).__name__
+
+
+class RegistroConsultasLentas:
+    """Últimas sentencias que superaron el umbral, en un buffer circular (y opcionalmente en archivo)."""
+
+    def __init__(self, umbral_ms: float, explain: bool = False, capacidad: int = SLOW_QUERY_BUFFER,
+                 archivo: str = None):
+        self.umbral_ms = umbral_ms
+        self.explain = explain
+        self._entradas = collections.deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+        self.total = 0
+        self._log = None
+        if archivo:
+            self._log = logging.getLogger("sistema_contable.consultas_lentas")
+            manejador = RotatingFileHandler(archivo, maxBytes=10 * 1024 * 1024, backupCount=3, encoding="utf-8")
+            manejador.setFormatter(logging.Formatter("%(message)s"))
+            self._log.addHandler(manejador)
+            self._log.setLevel(logging.INFO)
+            self._log.propagate = False
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_lenta", []).append(time.perf_counter())
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("inicio_lenta")
+        if not inicios:
+            return
+        ms = (time.perf_counter() - inicios.pop()) * 1000
+        if ms < self.umbral_ms or conn.info.get("explicando"):
+            return
+
+        medicion = medicion_actual()
+        entrada = {
+            "fecha": datetime.now().isoformat(timespec="milliseconds"),
+            "duracion_ms": round(ms, 2),
+            "ruta": medicion["ruta"] if medicion else None,
+            "sentencia": statement,
+            "parametros": _forma_parametros(parameters, executemany),
+            "filas": cursor.rowcount,
+        }
+        if self.explain and not executemany and conn.dialect.name == "postgresql" \
+                and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            entrada["plan"] = self._plan(conn, statement, parameters)
+
+        with self._lock:
+            self._entradas.append(entrada)
+            self.total += 1
+        if self._log:
+            self._log.info(json.dumps(entrada, ensure_ascii=False, default=str))
+
+    def _error(self, contexto):
+        # Si la sentencia falla no hay after_cursor_execute: se descarta su inicio
+        inicios = contexto.connection.info.get("inicio_lenta") if contexto.connection is not None else None
+        if inicios:
+            inicios.pop()
+
+    def _plan(self, conn, statement, parameters):
+        # Mismo cursor DBAPI y misma transacción que la consulta original
+        conn.info["explicando"] = True
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                return "\n".join(fila[0] for fila in cursor.fetchall())
+            finally:
+                cursor.close()
+        except Exception as e:  # el plan es un extra: nunca debe romper la petición
+            return f"No se pudo obtener el plan: {e}"
+        finally:
+            conn.info.pop("explicando", None)
+
+    def instalar(self, *motores):
+        for motor in motores:
+            event.listen(motor, "before_cursor_execute", self._antes)
+            event.listen(motor, "after_cursor_execute", self._despues)
+            event.listen(motor, "handle_error", self._error)
+
+    def entradas(self, limite: int = None) -> list:
+        """Las más recientes primero."""
+        with self._lock:
+            entradas = list(reversed(self._entradas))
+        return entradas[:limite] if limite else entradas
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+consultas_lentas = None
+if SLOW_QUERY_MS > 0:
+    consultas_lentas = RegistroConsultasLentas(SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN, SLOW_QUERY_BUFFER, SLOW_QUERY_ARCHIVO)
+    consultas_lentas.instalar(engine, async_engine.sync_engine)
+
+
+def estado_pool(pool) -> dict:
+    """
+    Estadísticas en vivo de un pool medido (para dimensionarlo según el número de workers):
+    la configuración con la que se creó y el uso que informa la API pública del pool.
+    """
+    return {
+        "tamano": pool.size(),
+        "max_overflow": _CONFIG_POOL["max_overflow"],
+        "en_uso": pool.checkedout(),
+        "disponibles": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "timeout_s": _CONFIG_POOL["pool_timeout"],
+        "recycle_s": _CONFIG_POOL["pool_recycle"],
+        "pre_ping": _CONFIG_POOL["pool_pre_ping"],
+        "esperas": pool.esperas,
+        "espera_total_ms": round(pool.espera_total_s * 1000, 3),
+        "timeouts": pool.timeouts,
+        "checkout": pool.checkout.resumen(),
+    }
+
+
 # Dependency for FastAPI endpoints
 def get_db():
     db = SessionLocal()
@@ -16,3 +252,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency for async endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,42 @@
+"""
+Crea un usuario administrador, o da ese rol a uno existente. /auth/register solo crea
+administradores si lo pide otro administrador, así que el primero se crea por aquí:
+    docker compose exec backend python -m app.utils.crear_admin admin --nombre "Administrador"
+"""
+import argparse
+import getpass
+
+from ..models.tablas import Usuario
+from .auth_utils import encriptar
+from .conexion_db import SessionLocal
+
+
+def crear_admin(db, username: str, password: str = None, nombre_completo: str = None) -> bool:
+    """Retorna True si el usuario se creó y False si ya existía y solo se promovió."""
+    usuario = db.query(Usuario).filter(Usuario.username == username).first()
+    if usuario:
+        usuario.rol = "admin"
+        return False
+    db.add(Usuario(username=username, password_hash=encriptar(password), nombre_completo=nombre_completo,
+                   rol="admin", activo=True))
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("username")
+    parser.add_argument("--nombre", help="nombre completo (solo al crear el usuario)")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as sesion:
+        existe = sesion.query(Usuario.id_usuario).filter(Usuario.username == args.username).first()
+        password = None if existe else getpass.getpass("Contraseña: ")
+        if not existe and not password:
+            parser.error("la contraseña no puede estar vacía")
+        creado = crear_admin(sesion, args.username, password, args.nombre)
+        sesion.commit()
+    print(f"Administrador {'creado' if creado else 'asignado'}: {args.username}")
+
+
+if __name__ == "__main__":
+    main()
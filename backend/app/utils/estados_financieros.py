@@ -0,0 +1,117 @@
+import os
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.tablas import Cuenta, Partida, PartidaDetalle
+from .cache_ttl import CacheTTL
+from .catalogo_cache import catalogo, version_catalogo
+from .saldos_mayor import acumular_jerarquia, saldo_segun_naturaleza, version_libro
+
+# La clave incluye las versiones del libro y del catálogo (compartidas en la base), así que
+# una partida o una cuenta modificada en cualquier worker invalida los reportes; el TTL solo
+# libera memoria.
+ESTADOS_CACHE_TTL = float(os.getenv("ESTADOS_CACHE_TTL", "300"))
+
+TIPOS_BALANCE = ("ACTIVO", "PASIVO", "CAPITAL")
+TIPOS_RESULTADOS = ("INGRESO", "GASTO")
+
+_cache_reportes = CacheTTL(max_entradas=64, ttl=ESTADOS_CACHE_TTL)
+
+
+def _totales_por_cuenta(db: Session, desde: Optional[date], hasta: Optional[date], tipos: tuple) -> list:
+    """Una sola consulta agregada sobre partida_detalle: debe y haber por cuenta de los tipos dados."""
+    tipo = func.upper(Cuenta.tipo)
+    query = (
+        db.query(PartidaDetalle.id_cuenta, tipo,
+                 func.coalesce(func.sum(PartidaDetalle.debe), 0), func.coalesce(func.sum(PartidaDetalle.haber), 0))
+        .join(Partida, Partida.id_partida == PartidaDetalle.id_partida)
+        .join(Cuenta, Cuenta.id_cuenta == PartidaDetalle.id_cuenta)
+        .filter(tipo.in_(tipos))
+    )
+    if desde:
+        query = query.filter(Partida.fecha >= desde)
+    if hasta:
+        query = query.filter(Partida.fecha <= hasta)
+
+    return [
+        {"id_cuenta": id_cuenta, "tipo": tipo_cuenta, "debe": Decimal(debe), "haber": Decimal(haber)}
+        for id_cuenta, tipo_cuenta, debe, haber in query.group_by(PartidaDetalle.id_cuenta, tipo)
+    ]
+
+
+def _secciones(db: Session, totales: list, tipos: tuple, max_nivel: Optional[int]) -> dict:
+    """
+    Arma una sección por tipo de cuenta: las líneas acumuladas por jerarquía hasta
+    `max_nivel` y el total de la sección según la naturaleza de sus cuentas.
+    """
+    cuentas = catalogo.obtener(db).cuentas
+    secciones = {}
+    for tipo in tipos:
+        propios = [t for t in totales if t["tipo"] == tipo]
+        lineas = acumular_jerarquia([c for c in cuentas if (c.tipo or "").upper() == tipo], propios, max_nivel)
+        secciones[tipo] = {
+            "cuentas": [
+                {
+                    "id_cuenta": l["id_cuenta"],
+                    "codigo": l["codigo"],
+                    "cuenta": l["nombre"],
+                    "nivel": l["nivel"],
+                    "saldo": float(saldo_segun_naturaleza(tipo, l["debe"], l["haber"]))
+                }
+                for l in lineas
+            ],
+            "total": sum((saldo_segun_naturaleza(tipo, t["debe"], t["haber"]) for t in propios), Decimal("0"))
+        }
+    return secciones
+
+
+def _calcular_balance_general(db: Session, hasta: Optional[date], max_nivel: Optional[int]) -> dict:
+    totales = _totales_por_cuenta(db, None, hasta, TIPOS_BALANCE + TIPOS_RESULTADOS)
+    secciones = _secciones(db, totales, TIPOS_BALANCE, max_nivel)
+
+    # Utilidad acumulada aún no trasladada a capital mediante partidas de cierre
+    resultado = sum((saldo_segun_naturaleza(t["tipo"], t["debe"], t["haber"]) * (1 if t["tipo"] == "INGRESO" else -1)
+                     for t in totales if t["tipo"] in TIPOS_RESULTADOS), Decimal("0"))
+    activo = secciones["ACTIVO"]["total"]
+    pasivo_capital = secciones["PASIVO"]["total"] + secciones["CAPITAL"]["total"] + resultado
+
+    return {
+        "hasta": hasta,
+        "activo": {**secciones["ACTIVO"], "total": float(activo)},
+        "pasivo": {**secciones["PASIVO"], "total": float(secciones["PASIVO"]["total"])},
+        "capital": {**secciones["CAPITAL"], "total": float(secciones["CAPITAL"]["total"])},
+        "resultado_ejercicio": float(resultado),
+        "total_pasivo_capital": float(pasivo_capital),
+        "cuadrado": activo == pasivo_capital
+    }
+
+
+def _calcular_estado_resultados(db: Session, desde: Optional[date], hasta: Optional[date],
+                                max_nivel: Optional[int]) -> dict:
+    secciones = _secciones(db, _totales_por_cuenta(db, desde, hasta, TIPOS_RESULTADOS), TIPOS_RESULTADOS, max_nivel)
+    ingresos, gastos = secciones["INGRESO"]["total"], secciones["GASTO"]["total"]
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "ingresos": {**secciones["INGRESO"], "total": float(ingresos)},
+        "gastos": {**secciones["GASTO"], "total": float(gastos)},
+        "utilidad_neta": float(ingresos - gastos)
+    }
+
+
+# =====================================================
+# Reportes memorizados por período y versiones del libro y del catálogo
+# =====================================================
+def balance_general(db: Session, hasta: Optional[date] = None, max_nivel: Optional[int] = None) -> dict:
+    clave = ("balance_general", hasta, max_nivel, version_libro(db), version_catalogo(db))
+    return _cache_reportes.obtener_o_calcular(clave, lambda: _calcular_balance_general(db, hasta, max_nivel))
+
+
+def estado_resultados(db: Session, desde: Optional[date] = None, hasta: Optional[date] = None,
+                      max_nivel: Optional[int] = None) -> dict:
+    clave = ("estado_resultados", desde, hasta, max_nivel, version_libro(db), version_catalogo(db))
+    return _cache_reportes.obtener_o_calcular(clave, lambda: _calcular_estado_resultados(db, desde, hasta, max_nivel))
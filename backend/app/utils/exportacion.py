@@ -0,0 +1,80 @@
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Sequence
+
+import xlsxwriter
+
+# Filas de CSV que se acumulan antes de enviar un bloque al cliente
+FILAS_POR_BLOQUE = 1000
+# Tamaño de los bloques en que se envía el archivo XLSX terminado
+BYTES_POR_BLOQUE = 64 * 1024
+# Filas por hoja de Excel (incluido el encabezado); xlsxwriter descarta en silencio las demás
+MAX_FILAS_XLSX = 1_048_576
+
+TIPOS_MIME = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def generar_csv(encabezados: Sequence[str], filas: Iterable[Sequence]) -> Iterator[bytes]:
+    """Escribe las filas como CSV (UTF-8 con BOM para Excel) y produce bloques a medida que se leen."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("\ufeff")
+    escritor.writerow(encabezados)
+    # El encabezado sale de inmediato, antes de la primera fila
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    for numero, fila in enumerate(filas, start=1):
+        escritor.writerow(fila)
+        if numero % FILAS_POR_BLOQUE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def generar_xlsx(encabezados: Sequence[str], filas: Iterable[Sequence], hoja: str = "Datos") -> Iterator[bytes]:
+    """
+    Escribe las filas en un XLSX con xlsxwriter en modo constant_memory (cada fila va a disco
+    al escribirse) y luego envía el archivo por bloques. El formato XLSX es un zip que solo
+    queda completo al cerrarse, por eso aquí el primer byte sale al terminar de leer las filas.
+    """
+    with tempfile.TemporaryFile() as archivo:
+        libro = xlsxwriter.Workbook(archivo, {"constant_memory": True, "in_memory": False})
+        hoja_xlsx = libro.add_worksheet(hoja)
+        negrita = libro.add_format({"bold": True})
+        formato_fecha = libro.add_format({"num_format": "yyyy-mm-dd"})
+        formato_monto = libro.add_format({"num_format": "#,##0.00"})
+
+        hoja_xlsx.write_row(0, 0, encabezados, negrita)
+        for numero, fila in enumerate(filas, start=1):
+            if numero >= MAX_FILAS_XLSX:
+                # Mejor cortar la descarga que entregar un archivo al que le faltan filas
+                raise ValueError(f"El XLSX supera las {MAX_FILAS_XLSX} filas de una hoja")
+            for columna, valor in enumerate(fila):
+                if isinstance(valor, (date, datetime)):
+                    hoja_xlsx.write_datetime(numero, columna, valor, formato_fecha)
+                elif isinstance(valor, Decimal):
+                    hoja_xlsx.write_number(numero, columna, float(valor), formato_monto)
+                else:
+                    hoja_xlsx.write(numero, columna, valor)
+        libro.close()
+
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(BYTES_POR_BLOQUE)
+            if not bloque:
+                break
+            yield bloque
+
+
+def generar_archivo(formato: str, encabezados: Sequence[str], filas: Iterable[Sequence], hoja: str = "Datos"):
+    if formato == "xlsx":
+        return generar_xlsx(encabezados, filas, hoja)
+    return generar_csv(encabezados, filas)
@@ -0,0 +1,192 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from .metricas import Histograma
+
+logger = logging.getLogger("sistema_contable.peticiones")
+
+# Nivel de las líneas por petición (INFO las registra todas, WARNING solo las lentas)
+LOG_PETICIONES_NIVEL = os.getenv("LOG_PETICIONES_NIVEL", "INFO").upper()
+# Una petición que supera este tiempo se registra como WARNING
+PETICION_LENTA_MS = float(os.getenv("PETICION_LENTA_MS", "1000"))
+
+# Medición de la petición en curso; el diccionario se comparte con el threadpool y con
+# los greenlets de la sesión asíncrona, que ven el mismo objeto a través del contexto
+_medicion = contextvars.ContextVar("medicion_peticion", default=None)
+
+
+def medicion_actual() -> Optional[dict]:
+    """Medición de la petición HTTP en curso (None fuera de una petición)."""
+    return _medicion.get()
+
+
+# =====================================================
+# ⏱️ Conteo de sentencias SQL por petición
+# =====================================================
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _medicion.get() is not None:
+        conn.info["inicio_sentencia"] = time.perf_counter()
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    medicion = _medicion.get()
+    inicio = conn.info.pop("inicio_sentencia", None)
+    if medicion is not None and inicio is not None:
+        medicion["consultas"] += 1
+        medicion["db_s"] += time.perf_counter() - inicio
+
+
+def instalar_eventos_sql(*motores):
+    """Registra el conteo en los motores (idempotente; para el asíncrono usar `.sync_engine`)."""
+    for motor in motores:
+        if not event.contains(motor, "before_cursor_execute", _antes_de_ejecutar):
+            event.listen(motor, "before_cursor_execute", _antes_de_ejecutar)
+            event.listen(motor, "after_cursor_execute", _despues_de_ejecutar)
+
+
+# =====================================================
+# 📈 Métricas por ruta (formato de exposición de Prometheus)
+# =====================================================
+class MetricasRutas:
+    """Latencia (histograma), peticiones por código, sentencias y tiempo de BD por ruta."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rutas = {}
+
+    def observar(self, metodo: str, ruta: str, estado: int, segundos: float, consultas: int, db_s: float):
+        clave = (metodo, ruta)
+        with self._lock:
+            datos = self._rutas.get(clave)
+            if datos is None:
+                datos = self._rutas[clave] = {"latencia": Histograma(), "estados": {}, "consultas": 0, "db_s": 0.0}
+            datos["estados"][estado] = datos["estados"].get(estado, 0) + 1
+            datos["consultas"] += consultas
+            datos["db_s"] += db_s
+        datos["latencia"].observar(segundos)
+
+    def reiniciar(self):
+        with self._lock:
+            self._rutas = {}
+
+    def exposicion(self) -> str:
+        with self._lock:
+            rutas = sorted((clave, dict(datos, estados=dict(datos["estados"]))) for clave, datos in self._rutas.items())
+
+        lineas = [
+            "# HELP http_request_duration_seconds Latencia de las peticiones por ruta.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (metodo, ruta), datos in rutas:
+            etiquetas = f'method="{metodo}",route="{ruta}"'
+            buckets, total, suma_ms = datos["latencia"].acumulados()
+            for limite_ms, acumulado in buckets:
+                lineas.append(f'http_request_duration_seconds_bucket{{{etiquetas},le="{limite_ms / 1000:g}"}} {acumulado}')
+            lineas.append(f'http_request_duration_seconds_bucket{{{etiquetas},le="+Inf"}} {total}')
+            lineas.append(f"http_request_duration_seconds_sum{{{etiquetas}}} {suma_ms / 1000:.6f}")
+            lineas.append(f"http_request_duration_seconds_count{{{etiquetas}}} {total}")
+
+        lineas += ["# HELP http_requests_total Peticiones atendidas por ruta y código de estado.",
+                   "# TYPE http_requests_total counter"]
+        for (metodo, ruta), datos in rutas:
+            for estado, n in sorted(datos["estados"].items()):
+                lineas.append(f'http_requests_total{{method="{metodo}",route="{ruta}",status="{estado}"}} {n}')
+
+        lineas += ["# HELP db_statements_total Sentencias SQL ejecutadas por ruta.",
+                   "# TYPE db_statements_total counter"]
+        for (metodo, ruta), datos in rutas:
+            lineas.append(f'db_statements_total{{method="{metodo}",route="{ruta}"}} {datos["consultas"]}')
+
+        lineas += ["# HELP db_duration_seconds_total Tiempo acumulado en la base de datos por ruta.",
+                   "# TYPE db_duration_seconds_total counter"]
+        for (metodo, ruta), datos in rutas:
+            lineas.append(f'db_duration_seconds_total{{method="{metodo}",route="{ruta}"}} {datos["db_s"]:.6f}')
+
+        return "\n".join(lineas) + "\n"
+
+
+metricas_rutas = MetricasRutas()
+
+
+# =====================================================
+# 🛰️ Middleware ASGI
+# =====================================================
+class MiddlewareInstrumentacion:
+    """
+    Mide cada petición HTTP: duración total, sentencias SQL y tiempo en la base de datos.
+    Agrega el encabezado Server-Timing, escribe una línea JSON en el log y alimenta
+    `metricas_rutas`. Es ASGI puro para no partir la petición en otra tarea como
+    BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._plantillas = None
+
+    def _ruta(self, scope) -> str:
+        # La plantilla (/partidas/{id}) y no la ruta real, para no crear una serie por id
+        if self._plantillas is None:
+            self._plantillas = {}
+            for ruta in scope["app"].routes:
+                self._plantillas.setdefault(getattr(ruta, "endpoint", None), getattr(ruta, "path", None))
+        return self._plantillas.get(scope.get("endpoint")) or "sin_ruta"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = {"consultas": 0, "db_s": 0.0, "ruta": f"{scope['method']} {scope['path']}"}
+        token = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                total_ms = (time.perf_counter() - inicio) * 1000
+                MutableHeaders(scope=mensaje).append(
+                    "Server-Timing",
+                    f'db;dur={medicion["db_s"] * 1000:.1f};desc="{medicion["consultas"]} consultas", '
+                    f"app;dur={total_ms:.1f}"
+                )
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicion.reset(token)
+            duracion = time.perf_counter() - inicio
+            ruta = self._ruta(scope)
+            metricas_rutas.observar(scope["method"], ruta, estado, duracion, medicion["consultas"], medicion["db_s"])
+
+            nivel = logging.WARNING if duracion * 1000 >= PETICION_LENTA_MS else logging.INFO
+            if logger.isEnabledFor(nivel):
+                logger.log(nivel, json.dumps({
+                    "metodo": scope["method"],
+                    "ruta": ruta,
+                    "path": scope["path"],
+                    "estado": estado,
+                    "duracion_ms": round(duracion * 1000, 2),
+                    "consultas": medicion["consultas"],
+                    "db_ms": round(medicion["db_s"] * 1000, 2),
+                }, ensure_ascii=False))
+
+
+def configurar_log():
+    """Las líneas por petición van a stderr, una por línea en JSON (uvicorn no configura este logger)."""
+    if not logger.handlers:
+        manejador = logging.StreamHandler()
+        manejador.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(manejador)
+        logger.propagate = False
+    logger.setLevel(LOG_PETICIONES_NIVEL)
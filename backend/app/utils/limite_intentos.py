@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Intentos de login permitidos por usuario dentro de la ventana (en segundos)
+LOGIN_MAX_INTENTOS = int(os.getenv("LOGIN_MAX_INTENTOS", "5"))
+LOGIN_VENTANA = float(os.getenv("LOGIN_VENTANA", "60"))
+
+
+class LimiteIntentos:
+    """
+    Ventana deslizante de intentos por clave (username), en memoria del proceso.
+    Se consulta antes de verificar la contraseña, así los intentos bloqueados no gastan bcrypt.
+    """
+
+    def __init__(self, max_intentos: int = LOGIN_MAX_INTENTOS, ventana: float = LOGIN_VENTANA,
+                 max_claves: int = 10000):
+        self.max_intentos = max_intentos
+        self.ventana = ventana
+        self.max_claves = max_claves
+        self._intentos: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, clave: str) -> float:
+        """Registra un intento; retorna 0 si se permite o los segundos que faltan para reintentar."""
+        ahora = time.monotonic()
+        with self._lock:
+            intentos = self._intentos.get(clave)
+            if intentos is None:
+                intentos = self._intentos[clave] = deque()
+                if len(self._intentos) > self.max_claves:
+                    self._intentos.popitem(last=False)
+            self._intentos.move_to_end(clave)
+
+            while intentos and ahora - intentos[0] >= self.ventana:
+                intentos.popleft()
+            if len(intentos) >= self.max_intentos:
+                return self.ventana - (ahora - intentos[0])
+            intentos.append(ahora)
+            return 0.0
+
+    def reiniciar(self, clave: str):
+        with self._lock:
+            self._intentos.pop(clave, None)
+
+
+limite_login = LimiteIntentos()
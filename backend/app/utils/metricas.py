@@ -0,0 +1,73 @@
+import bisect
+import threading
+from typing import Sequence
+
+# Límites superiores (en milisegundos) de los buckets por defecto
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histograma:
+    """
+    Histograma acumulativo de duraciones con buckets fijos, seguro entre hilos.
+    Registrar una observación es O(log buckets) y no guarda las muestras.
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._conteos = [0] * (len(self.buckets_ms) + 1)  # el último es +Inf
+            self.total = 0
+            self.suma_ms = 0.0
+            self.maximo_ms = 0.0
+
+    def observar(self, segundos: float):
+        ms = segundos * 1000
+        with self._lock:
+            self._conteos[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self.total += 1
+            self.suma_ms += ms
+            self.maximo_ms = max(self.maximo_ms, ms)
+
+    def percentil(self, p: float) -> float:
+        """Aproximación del percentil p (0-100): límite superior del bucket que lo contiene."""
+        with self._lock:
+            objetivo = self.total * p / 100
+            acumulado = 0
+            for limite, conteo in zip(self.buckets_ms + (self.maximo_ms,), self._conteos):
+                acumulado += conteo
+                if conteo and acumulado >= objetivo:
+                    return round(min(limite, self.maximo_ms), 3)
+            return 0.0
+
+    def acumulados(self):
+        """(límite_ms, conteo acumulado) por bucket, total y suma en ms: el formato de Prometheus."""
+        with self._lock:
+            acumulado, buckets = 0, []
+            for limite, conteo in zip(self.buckets_ms, self._conteos):
+                acumulado += conteo
+                buckets.append((limite, acumulado))
+            return buckets, self.total, self.suma_ms
+
+    def resumen(self) -> dict:
+        with self._lock:
+            acumulado = 0
+            buckets = {}
+            for limite, conteo in zip(self.buckets_ms, self._conteos):
+                acumulado += conteo
+                buckets[f"le_{limite:g}ms"] = acumulado
+            buckets["le_inf"] = self.total
+            total, suma, maximo = self.total, self.suma_ms, self.maximo_ms
+
+        return {
+            "total": total,
+            "promedio_ms": round(suma / total, 3) if total else 0.0,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "p99_ms": self.percentil(99),
+            "maximo_ms": round(maximo, 3),
+            "buckets": buckets,
+        }
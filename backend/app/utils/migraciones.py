@@ -0,0 +1,48 @@
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+# backend/ (donde están alembic.ini y migrations/), sin depender del directorio actual
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Al arrancar solo se compara la revisión de la base con la del código; con false se omite
+DB_VERIFICAR_ESQUEMA = os.getenv("DB_VERIFICAR_ESQUEMA", "true").lower() in ("1", "true", "si", "yes")
+
+
+def configuracion() -> Config:
+    config = Config(os.path.join(DIRECTORIO_BACKEND, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(DIRECTORIO_BACKEND, "migrations"))
+    return config
+
+
+def revision_esperada() -> str:
+    """Última revisión de migrations/versions (la que espera este código)."""
+    return ScriptDirectory.from_config(configuracion()).get_current_head()
+
+
+def revision_actual(motor) -> Optional[str]:
+    """Revisión registrada en alembic_version (None si la base nunca se migró)."""
+    with motor.connect() as conexion:
+        return MigrationContext.configure(conexion).get_current_revision()
+
+
+def verificar_esquema(motor):
+    """
+    Chequeo rápido para el arranque de cada worker (una consulta): las migraciones se
+    aplican antes, una sola vez, con `alembic upgrade head`.
+    """
+    esperada, actual = revision_esperada(), revision_actual(motor)
+    if actual != esperada:
+        raise RuntimeError(
+            f"El esquema de la base de datos está en la revisión {actual or 'ninguna'} y el código espera "
+            f"{esperada}: ejecutar `alembic upgrade head` desde backend/ antes de iniciar la API"
+        )
+
+
+def aplicar_migraciones(revision: str = "head"):
+    """Equivalente a `alembic upgrade head` (para scripts y benchmarks)."""
+    command.upgrade(configuracion(), revision)
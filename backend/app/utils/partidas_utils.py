@@ -0,0 +1,132 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import groupby
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+TIPOS_PARTIDA = ("DIARIO", "AJUSTE", "CIERRE")
+CENTAVO = Decimal("0.01")
+
+
+def a_monto(valor) -> Decimal:
+    """Convierte un importe (float, str o None) a Decimal redondeado a centavos."""
+    if valor is None or valor == "":
+        return Decimal("0.00")
+    return Decimal(str(valor).strip()).quantize(CENTAVO)
+
+
+def validar_detalles(detalles: Iterable, cuentas_validas) -> Optional[str]:
+    """
+    Valida las líneas de una partida: cuentas existentes, importes no negativos,
+    cada línea en Debe o en Haber, y partida cuadrada (total Debe == total Haber).
+    Retorna el mensaje del primer error encontrado o None si es válida.
+    """
+    total_debe = total_haber = Decimal("0.00")
+    lineas = 0
+    for d in detalles:
+        lineas += 1
+        if d.id_cuenta not in cuentas_validas:
+            return f"Cuenta {d.id_cuenta} no existe"
+        debe, haber = a_monto(d.debe), a_monto(d.haber)
+        if debe < 0 or haber < 0:
+            return "Los importes no pueden ser negativos"
+        if debe > 0 and haber > 0:
+            return "Una línea no puede tener Debe y Haber al mismo tiempo"
+        total_debe += debe
+        total_haber += haber
+
+    if lineas == 0:
+        return "La partida no tiene detalles"
+    if total_debe != total_haber:
+        return f"La partida no cuadra: Debe {total_debe} ≠ Haber {total_haber}"
+    if total_debe == 0:
+        return "La partida no tiene importes"
+    return None
+
+
+# =====================================================
+# Lectura en streaming de archivos de importación
+# =====================================================
+
+class LineaImportada:
+    def __init__(self, id_cuenta, debe, haber, descripcion=None):
+        self.id_cuenta = id_cuenta
+        self.debe = debe
+        self.haber = haber
+        self.descripcion = descripcion
+
+
+class PartidaImportada:
+    def __init__(self, linea: int, referencia, fecha, descripcion, tipo, detalles: List[LineaImportada]):
+        self.linea = linea
+        self.referencia = referencia
+        self.fecha = fecha
+        self.descripcion = descripcion
+        self.tipo = tipo
+        self.detalles = detalles
+
+
+def _resolver_cuenta(fila: dict, por_codigo: dict) -> int:
+    if (fila.get("id_cuenta") or "").strip():
+        return int(fila["id_cuenta"])
+    codigo = (fila.get("codigo") or "").strip()
+    if codigo not in por_codigo:
+        raise ValueError(f"Cuenta con código '{codigo}' no existe")
+    return por_codigo[codigo].id_cuenta
+
+
+def leer_csv(lineas: Iterable[str], por_codigo: dict) -> Iterator[Tuple[Optional[PartidaImportada], Optional[dict]]]:
+    """
+    Lee un CSV con una fila por línea de detalle. Las filas consecutivas con la misma
+    `referencia` forman una partida; fecha, descripcion y tipo se toman de su primera fila.
+    Columnas: referencia, fecha, descripcion, tipo, id_cuenta o codigo, debe, haber, detalle.
+    Produce (partida, None) o (None, error) sin cargar el archivo completo en memoria.
+    """
+    lector = csv.DictReader(lineas)
+    for referencia, filas in groupby(lector, key=lambda f: (f.get("referencia") or "").strip()):
+        numero = lector.line_num  # línea de la primera fila del grupo
+        try:
+            filas = list(filas)
+            primera = filas[0]
+            partida = PartidaImportada(
+                linea=numero,
+                referencia=referencia,
+                fecha=date.fromisoformat((primera.get("fecha") or "").strip()),
+                descripcion=(primera.get("descripcion") or "").strip(),
+                tipo=(primera.get("tipo") or "DIARIO").strip().upper(),
+                detalles=[
+                    LineaImportada(_resolver_cuenta(f, por_codigo), a_monto(f.get("debe")), a_monto(f.get("haber")),
+                                   (f.get("detalle") or None))
+                    for f in filas
+                ]
+            )
+        except (ValueError, TypeError, InvalidOperation) as e:
+            yield None, {"linea": numero, "referencia": referencia, "error": f"Fila inválida: {e}"}
+            continue
+        yield partida, None
+
+
+def leer_ndjson(lineas: Iterable[str]) -> Iterator[Tuple[Optional[PartidaImportada], Optional[dict]]]:
+    """Lee un archivo NDJSON con una partida por línea (mismo formato que POST /partidas)."""
+    for numero, texto in enumerate(lineas, start=1):
+        if not texto.strip():
+            continue
+        try:
+            obj = json.loads(texto)
+            partida = PartidaImportada(
+                linea=numero,
+                referencia=str(obj["referencia"]) if obj.get("referencia") is not None else None,
+                fecha=date.fromisoformat(obj["fecha"]),
+                descripcion=(obj.get("descripcion") or "").strip(),
+                tipo=(obj.get("tipo") or "DIARIO").upper(),
+                detalles=[
+                    LineaImportada(int(d["id_cuenta"]), a_monto(d.get("debe")), a_monto(d.get("haber")),
+                                   d.get("descripcion"))
+                    for d in obj.get("detalles", [])
+                ]
+            )
+        except (ValueError, KeyError, TypeError, AttributeError, InvalidOperation) as e:
+            yield None, {"linea": numero, "referencia": None, "error": f"Línea inválida: {e}"}
+            continue
+        yield partida, None
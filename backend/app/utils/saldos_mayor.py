@@ -0,0 +1,306 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, and_, cast, delete, event, func, insert, literal, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models.tablas import Balanza, Cuenta, Mayor, Partida, PartidaDetalle, VersionLibro
+from .catalogo_cache import catalogo
+
+# Cuentas de naturaleza deudora; el resto (Pasivo, Capital, Ingreso) es acreedora
+TIPOS_DEUDORES = ("ACTIVO", "GASTO")
+
+# Espacio de claves para pg_advisory_xact_lock(clave, id_cuenta)
+_CLAVE_BLOQUEO_MAYOR = 8101
+
+
+def version_libro(db: Session) -> int:
+    """
+    Versión del libro guardada en la base (tabla version_libro): aumenta con cada transacción
+    confirmada que modificó `mayor`, en cualquier worker. Las cachés de reportes la usan en su clave.
+    """
+    return db.query(VersionLibro.version).filter(VersionLibro.id == 1).scalar() or 0
+
+
+def _marcar_libro_modificado(db: Session):
+    db.info["libro_modificado"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _al_confirmar(session):
+    # Al final de la transacción: el bloqueo de la fila dura solo hasta el COMMIT
+    if session.info.pop("libro_modificado", False):
+        session.execute(update(VersionLibro).where(VersionLibro.id == 1)
+                        .values(version=VersionLibro.version + 1))
+
+
+@event.listens_for(Session, "after_rollback")
+def _al_revertir(session):
+    session.info.pop("libro_modificado", None)
+
+
+def periodo_de(fecha: date) -> date:
+    return fecha.replace(day=1)
+
+
+def _siguiente_periodo(periodo: date) -> date:
+    return (periodo.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def saldo_segun_naturaleza(tipo: Optional[str], debe, haber):
+    """DEUDORA (ACTIVO, GASTO): Debe - Haber; ACREEDORA (PASIVO, INGRESO, CAPITAL): Haber - Debe."""
+    return debe - haber if (tipo or "ACTIVO").upper() in TIPOS_DEUDORES else haber - debe
+
+
+def expr_periodo(db: Session, columna):
+    """Primer día del mes de `columna` en SQL (date_trunc en PostgreSQL, date() en SQLite)."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(columna, "start of month")
+    return cast(func.date_trunc("month", columna), Date)
+
+
+# =====================================================
+# Mantenimiento incremental
+# =====================================================
+def aplicar_movimientos(db: Session, movimientos: Iterable, signo: int = 1):
+    """
+    Actualiza `mayor` con los movimientos (id_cuenta, fecha, debe, haber) de partidas
+    creadas (signo=1) o eliminadas (signo=-1). Se ejecuta dentro de la transacción del
+    llamador: un upsert por lote y un recálculo del saldo acumulado de las cuentas tocadas.
+    """
+    deltas = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+    for id_cuenta, fecha, debe, haber in movimientos:
+        delta = deltas[(id_cuenta, periodo_de(fecha))]
+        delta[0] += signo * Decimal(str(debe or 0))
+        delta[1] += signo * Decimal(str(haber or 0))
+    if not deltas:
+        return
+    _marcar_libro_modificado(db)
+
+    cuentas = sorted({id_cuenta for id_cuenta, _ in deltas})
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        # Serializa por cuenta las transacciones que tocan el mayor (orden fijo: sin interbloqueos)
+        db.execute(text(
+            "SELECT pg_advisory_xact_lock(:clave, id) FROM (SELECT unnest(CAST(:ids AS int[])) AS id ORDER BY id) t"
+        ), {"clave": _CLAVE_BLOQUEO_MAYOR, "ids": cuentas})
+
+    tabla = Mayor.__table__
+    upsert = (sqlite.insert if dialecto == "sqlite" else postgresql.insert)(tabla)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[tabla.c.id_cuenta, tabla.c.periodo],
+        set_={
+            "saldo_debe": tabla.c.saldo_debe + upsert.excluded.saldo_debe,
+            "saldo_haber": tabla.c.saldo_haber + upsert.excluded.saldo_haber,
+            "fecha_actualizacion": func.now(),
+        }
+    )
+    db.execute(upsert, [
+        {"id_cuenta": id_cuenta, "periodo": periodo, "saldo_debe": debe, "saldo_haber": haber, "saldo_final": 0}
+        for (id_cuenta, periodo), (debe, haber) in deltas.items()
+    ])
+
+    # saldo_final = acumulado hasta el período; solo cambia desde el período más antiguo tocado
+    anterior = tabla.alias("anterior")
+    acumulado = (
+        select(func.coalesce(func.sum(anterior.c.saldo_debe - anterior.c.saldo_haber), 0))
+        .where(anterior.c.id_cuenta == tabla.c.id_cuenta, anterior.c.periodo <= tabla.c.periodo)
+        .scalar_subquery()
+    )
+    primer_periodo = min(p for _, p in deltas)
+    db.execute(
+        update(tabla)
+        .where(tabla.c.id_cuenta.in_(cuentas), tabla.c.periodo >= primer_periodo)
+        .values(saldo_final=acumulado)
+    )
+    # Las balanzas desde ese período quedan desactualizadas; se regeneran al consultarlas
+    db.execute(delete(Balanza).where(Balanza.periodo >= primer_periodo))
+
+
+def reconstruir_mayor(db: Session) -> int:
+    """Recalcula `mayor` completo desde partida_detalle en una sola sentencia INSERT ... SELECT."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE mayor IN EXCLUSIVE MODE"))
+    _marcar_libro_modificado(db)
+
+    periodo = expr_periodo(db, Partida.fecha)
+    debe = func.coalesce(func.sum(PartidaDetalle.debe), 0)
+    haber = func.coalesce(func.sum(PartidaDetalle.haber), 0)
+    filas = (
+        select(PartidaDetalle.id_cuenta, periodo, debe, haber,
+               func.sum(debe - haber).over(partition_by=PartidaDetalle.id_cuenta, order_by=periodo))
+        .join_from(PartidaDetalle, Partida, Partida.id_partida == PartidaDetalle.id_partida)
+        .group_by(PartidaDetalle.id_cuenta, periodo)
+    )
+
+    db.execute(delete(Balanza))
+    db.execute(delete(Mayor))
+    db.execute(insert(Mayor).from_select(["id_cuenta", "periodo", "saldo_debe", "saldo_haber", "saldo_final"], filas))
+    return db.query(func.count(Mayor.id_mayor)).scalar()
+
+
+def generar_balanza(db: Session, periodo: date):
+    """
+    Llena `balanza` para el período en una sola sentencia INSERT ... SELECT sobre `mayor`:
+    saldo_anterior es el último saldo acumulado antes del período y los movimientos son
+    los del propio período. Incluye toda cuenta con saldo anterior o con movimientos.
+    """
+    periodo = periodo_de(periodo)
+    ultimo = (
+        select(Mayor.id_cuenta, Mayor.saldo_final,
+               func.row_number().over(partition_by=Mayor.id_cuenta, order_by=Mayor.periodo.desc()).label("orden"))
+        .where(Mayor.periodo < periodo)
+        .subquery()
+    )
+    actual = select(Mayor).where(Mayor.periodo == periodo).subquery()
+
+    saldo_anterior = func.coalesce(ultimo.c.saldo_final, 0)
+    debe = func.coalesce(actual.c.saldo_debe, 0)
+    haber = func.coalesce(actual.c.saldo_haber, 0)
+    filas = (
+        select(literal(periodo, Date), Cuenta.id_cuenta, saldo_anterior, debe, haber, saldo_anterior + debe - haber)
+        .select_from(Cuenta)
+        .outerjoin(ultimo, and_(ultimo.c.id_cuenta == Cuenta.id_cuenta, ultimo.c.orden == 1))
+        .outerjoin(actual, actual.c.id_cuenta == Cuenta.id_cuenta)
+        .where(or_(ultimo.c.id_cuenta.isnot(None), actual.c.id_cuenta.isnot(None)))
+    )
+
+    db.execute(delete(Balanza).where(Balanza.periodo == periodo))
+    db.execute(insert(Balanza).from_select(
+        ["periodo", "id_cuenta", "saldo_anterior", "movimientos_debe", "movimientos_haber", "saldo_final"], filas
+    ))
+
+
+# =====================================================
+# Lectura de saldos
+# =====================================================
+def _sumar_mayor(db: Session, totales: dict, inicio: Optional[date], fin: Optional[date], id_cuenta: Optional[int]):
+    """Suma los períodos completos de `mayor` con inicio <= periodo < fin."""
+    query = db.query(Mayor.id_cuenta, func.sum(Mayor.saldo_debe), func.sum(Mayor.saldo_haber))
+    if inicio:
+        query = query.filter(Mayor.periodo >= inicio)
+    if fin:
+        query = query.filter(Mayor.periodo < fin)
+    if id_cuenta:
+        query = query.filter(Mayor.id_cuenta == id_cuenta)
+    for cuenta, debe, haber in query.group_by(Mayor.id_cuenta):
+        totales[cuenta][0] += debe or 0
+        totales[cuenta][1] += haber or 0
+
+
+def _sumar_detalle(db: Session, totales: dict, desde: Optional[date], hasta: Optional[date],
+                   tipo: Optional[str], id_cuenta: Optional[int]):
+    """Suma las líneas de partida_detalle con desde <= fecha <= hasta."""
+    query = (
+        db.query(PartidaDetalle.id_cuenta, func.sum(PartidaDetalle.debe), func.sum(PartidaDetalle.haber))
+        .join(Partida, Partida.id_partida == PartidaDetalle.id_partida)
+    )
+    if desde:
+        query = query.filter(Partida.fecha >= desde)
+    if hasta:
+        query = query.filter(Partida.fecha <= hasta)
+    if tipo:
+        query = query.filter(Partida.tipo == tipo)
+    if id_cuenta:
+        query = query.filter(PartidaDetalle.id_cuenta == id_cuenta)
+    for cuenta, debe, haber in query.group_by(PartidaDetalle.id_cuenta):
+        totales[cuenta][0] += debe or 0
+        totales[cuenta][1] += haber or 0
+
+
+def saldos_por_cuenta(db: Session, desde: Optional[date] = None, hasta: Optional[date] = None,
+                      tipo: Optional[str] = None, id_cuenta: Optional[int] = None) -> list:
+    """
+    Totales de debe y haber por cuenta en [desde, hasta], ordenados por código.
+    Los meses completos se leen de `mayor`; solo los días sueltos de los extremos (o todo
+    el rango si se filtra por tipo de partida, que `mayor` no distingue) salen de partida_detalle.
+    """
+    totales = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+
+    if tipo:
+        _sumar_detalle(db, totales, desde, hasta, tipo, id_cuenta)
+    else:
+        # [inicio, fin) son los meses completamente contenidos en el rango
+        inicio = desde and (desde if desde.day == 1 else _siguiente_periodo(periodo_de(desde)))
+        fin = hasta and (_siguiente_periodo(periodo_de(hasta))
+                         if _siguiente_periodo(periodo_de(hasta)) - timedelta(days=1) == hasta
+                         else periodo_de(hasta))
+
+        if inicio and fin and inicio >= fin:
+            _sumar_detalle(db, totales, desde, hasta, None, id_cuenta)
+        else:
+            _sumar_mayor(db, totales, inicio, fin, id_cuenta)
+            if desde and desde < inicio:
+                _sumar_detalle(db, totales, desde, inicio - timedelta(days=1), None, id_cuenta)
+            if hasta and fin <= hasta:
+                _sumar_detalle(db, totales, fin, hasta, None, id_cuenta)
+
+    cuentas = catalogo.obtener(db).por_id
+    if any(c not in cuentas for c in totales):
+        cuentas = catalogo.obtener(db, refrescar=True).por_id
+
+    resultado = []
+    for id_c, (debe, haber) in totales.items():
+        cuenta = cuentas.get(id_c)
+        if cuenta is None or (debe == 0 and haber == 0):
+            continue
+        resultado.append({
+            "id_cuenta": id_c,
+            "codigo": cuenta.codigo,
+            "nombre": cuenta.nombre,
+            "tipo": cuenta.tipo,
+            "debe": debe,
+            "haber": haber
+        })
+    return sorted(resultado, key=lambda r: r["codigo"])
+
+
+def acumular_jerarquia(cuentas: list, saldos: list, max_nivel: Optional[int] = None) -> list:
+    """
+    Suma los saldos de cada cuenta a todos sus ancestros en un solo barrido ascendente:
+    las cuentas se recorren de código más largo a más corto, de modo que cada subárbol
+    está completo cuando se suma a su padre. `cuentas` es el catálogo (snapshot) y
+    `saldos` la salida de saldos_por_cuenta. Devuelve las cuentas con movimiento en su
+    subárbol hasta `max_nivel`, ordenadas por código.
+    """
+    totales = {c.id_cuenta: [Decimal("0"), Decimal("0")] for c in cuentas}
+    for s in saldos:
+        if s["id_cuenta"] in totales:
+            totales[s["id_cuenta"]][0] += s["debe"]
+            totales[s["id_cuenta"]][1] += s["haber"]
+
+    for c in sorted(cuentas, key=lambda c: len(c.codigo), reverse=True):
+        if c.cuenta_padre in totales:
+            padre = totales[c.cuenta_padre]
+            padre[0] += totales[c.id_cuenta][0]
+            padre[1] += totales[c.id_cuenta][1]
+
+    resultado = []
+    for c in cuentas:
+        debe, haber = totales[c.id_cuenta]
+        if (debe == 0 and haber == 0) or (max_nivel is not None and (c.nivel or 1) > max_nivel):
+            continue
+        resultado.append({
+            "id_cuenta": c.id_cuenta,
+            "codigo": c.codigo,
+            "nombre": c.nombre,
+            "tipo": c.tipo,
+            "nivel": c.nivel,
+            "id_cuenta_padre": c.cuenta_padre,
+            "debe": debe,
+            "haber": haber
+        })
+    return resultado
+
+
+if __name__ == "__main__":
+    # Reconstrucción completa: python -m app.utils.saldos_mayor
+    from .conexion_db import SessionLocal
+
+    with SessionLocal() as sesion:
+        registros = reconstruir_mayor(sesion)
+        sesion.commit()
+    print(f"Mayor reconstruido: {registros} registros")
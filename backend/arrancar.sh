@@ -0,0 +1,5 @@
+#!/bin/sh
+# Migra una sola vez y después levanta los workers: cada worker solo verifica la revisión
+set -e
+alembic upgrade head
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${UVICORN_WORKERS:-1}"
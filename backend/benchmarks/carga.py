@@ -0,0 +1,152 @@
+"""
+Prueba de carga de los endpoints más usados (`/partidas`, `/cuentas`, `/manual_cuentas` y
+`/auth/login`) con concurrencia fija. Por endpoint reporta throughput, p50/p95/p99 y
+consultas SQL por petición, y guarda el resultado en JSON para comparar versiones.
+
+Uso (desde backend/, sobre una base sembrada con benchmarks.datos_sinteticos):
+    DATABASE_URL=sqlite:///bench.sqlite python -m benchmarks.datos_sinteticos --reiniciar
+    DATABASE_URL=sqlite:///bench.sqlite python -m benchmarks.carga --concurrencia 20 --salida v1.json
+
+Por defecto la app corre en el mismo proceso (transporte ASGI, sin red); con --url se mide
+un backend ya levantado. Las consultas por petición se leen del encabezado Server-Timing
+que agrega el middleware de instrumentación.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import re
+import subprocess
+import time
+from datetime import datetime
+
+import httpx
+
+from .datos_sinteticos import PASSWORD
+
+# Server-Timing: db;dur=1.2;desc="3 consultas", app;dur=4.5
+_CONSULTAS = re.compile(r'desc="(\d+) consultas"')
+
+
+def _endpoints(args):
+    return {
+        "partidas": ("GET", f"/partidas/?limit={args.limite_partidas}", None),
+        "cuentas": ("GET", "/cuentas/", None),
+        "manual_cuentas": ("GET", "/manual_cuentas/", None),
+        "login": ("POST", "/auth/login", lambda n: {"username": f"bench_{n % args.usuarios}", "password": PASSWORD}),
+    }
+
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return round(valores[min(len(valores) - 1, max(0, int(round(len(valores) * p / 100)) - 1))] * 1000, 3)
+
+
+def _cliente_en_proceso() -> httpx.AsyncClient:
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+
+async def _medir_endpoint(cliente: httpx.AsyncClient, metodo: str, ruta: str, cuerpo, peticiones: int,
+                          concurrencia: int) -> dict:
+    latencias, consultas, codigos = [], [], {}
+    pendientes = iter(range(peticiones))
+
+    async def worker():
+        for n in pendientes:
+            inicio = time.perf_counter()
+            r = await cliente.request(metodo, ruta, json=cuerpo(n) if cuerpo else None)
+            latencias.append(time.perf_counter() - inicio)
+            encontrado = _CONSULTAS.search(r.headers.get("Server-Timing", ""))
+            if encontrado:
+                consultas.append(int(encontrado.group(1)))
+            codigos[r.status_code] = codigos.get(r.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "peticiones": peticiones,
+        "segundos": round(segundos, 3),
+        "peticiones_por_s": round(peticiones / segundos, 2),
+        "p50_ms": _percentil(latencias, 50),
+        "p95_ms": _percentil(latencias, 95),
+        "p99_ms": _percentil(latencias, 99),
+        "maximo_ms": round(max(latencias) * 1000, 3),
+        "consultas_por_peticion": round(sum(consultas) / len(consultas), 2) if consultas else None,
+        "codigos": {str(c): n for c, n in sorted(codigos.items())},
+    }
+
+
+def _version() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    en_proceso = args.url is None
+    endpoints = _endpoints(args)
+    seleccion = args.endpoints or list(endpoints)
+
+    cliente = _cliente_en_proceso() if en_proceso else httpx.AsyncClient(
+        base_url=args.url, timeout=120, limits=httpx.Limits(max_connections=args.concurrencia + 5))
+    resultados = {}
+    async with cliente:
+        for nombre in seleccion:
+            metodo, ruta, cuerpo = endpoints[nombre]
+            peticiones = args.peticiones_login if nombre == "login" else args.peticiones
+            # Calentamiento: cachés, pool de conexiones y planes de consulta
+            await _medir_endpoint(cliente, metodo, ruta, cuerpo, min(args.calentamiento, peticiones),
+                                  args.concurrencia)
+            resultados[nombre] = await _medir_endpoint(cliente, metodo, ruta, cuerpo, peticiones,
+                                                       args.concurrencia)
+    if en_proceso:
+        # Las conexiones de aiosqlite/asyncpg viven en hilos propios: sin cerrarlas el proceso no termina
+        from app.utils.conexion_db import async_engine
+        await async_engine.dispose()
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "version": _version(),
+        "python": platform.python_version(),
+        "destino": args.url or "en proceso",
+        "base_de_datos": _dialecto() if en_proceso else None,
+        "concurrencia": args.concurrencia,
+        "endpoints": resultados,
+    }
+
+    print(f"{'endpoint':<16}{'pet/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'consultas':>11}  códigos")
+    for nombre, r in resultados.items():
+        consultas = "-" if r["consultas_por_peticion"] is None else f"{r['consultas_por_peticion']:.2f}"
+        print(f"{nombre:<16}{r['peticiones_por_s']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+              f"{r['p99_ms']:>10.1f}{consultas:>11}  {r['codigos']}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.salida}")
+
+
+def _dialecto() -> str:
+    from app.utils.conexion_db import engine
+    return engine.dialect.name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="backend ya levantado (por defecto la app corre en este proceso)")
+    parser.add_argument("--endpoints", nargs="+", choices=["partidas", "cuentas", "manual_cuentas", "login"])
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--peticiones", type=int, default=500, help="peticiones medidas por endpoint")
+    parser.add_argument("--peticiones-login", type=int, default=100, help="bcrypt es lento a propósito")
+    parser.add_argument("--calentamiento", type=int, default=20)
+    parser.add_argument("--limite-partidas", type=int, default=200, help="tamaño de página de /partidas")
+    parser.add_argument("--usuarios", type=int, default=20, help="usuarios bench_N sembrados")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+"""
+Mide la latencia (p50/p99) de un endpoint ajeno al login mientras ocurre una ráfaga de
+inicios de sesión, para comprobar que bcrypt no bloquea al resto de la API.
+
+Uso (con el backend levantado):
+    python -m benchmarks.login_burst --url http://localhost:8000 --logins 200 --concurrencia 50
+
+Crea (si no existe) un usuario por cliente de la ráfaga, para que el límite de intentos
+por usuario no corte la prueba.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+PASSWORD = "benchmark-123"
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[max(0, int(round(len(valores) * p / 100)) - 1)] * 1000 if valores else 0.0
+
+
+async def _sondear(cliente: httpx.AsyncClient, ruta: str, detener: asyncio.Event, latencias: list):
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await cliente.get(ruta)
+        latencias.append(time.perf_counter() - inicio)
+        await asyncio.sleep(0.01)
+
+
+async def _medir(cliente: httpx.AsyncClient, ruta: str, sondas: int, duracion: float = None, rafaga=None):
+    latencias, detener = [], asyncio.Event()
+    tareas = [asyncio.create_task(_sondear(cliente, ruta, detener, latencias)) for _ in range(sondas)]
+    if rafaga is not None:
+        resultado = await rafaga
+    else:
+        await asyncio.sleep(duracion)
+        resultado = None
+    detener.set()
+    await asyncio.gather(*tareas)
+    return latencias, resultado
+
+
+async def _rafaga(cliente: httpx.AsyncClient, logins: int, concurrencia: int):
+    codigos = {}
+    pendientes = iter(range(logins))
+
+    async def worker(n):
+        for _ in pendientes:
+            r = await cliente.post("/auth/login", json={"username": f"bench_{n}", "password": PASSWORD})
+            codigos[r.status_code] = codigos.get(r.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrencia)))
+    return time.perf_counter() - inicio, codigos
+
+
+async def main(args):
+    limites = httpx.Limits(max_connections=args.concurrencia + args.sondas + 10)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limites) as cliente:
+        for n in range(args.concurrencia):
+            await cliente.post("/auth/register", json={"username": f"bench_{n}", "password": PASSWORD,
+                                                       "nombre_completo": "Benchmark", "rol": "usuario"})
+
+        base, _ = await _medir(cliente, args.ruta, args.sondas, duracion=args.duracion_base)
+        carga, (segundos, codigos) = await _medir(cliente, args.ruta, args.sondas,
+                                                  rafaga=_rafaga(cliente, args.logins, args.concurrencia))
+
+    print(f"Ráfaga: {args.logins} logins con {args.concurrencia} clientes en {segundos:.1f} s "
+          f"({args.logins / segundos:.1f} logins/s), respuestas {codigos}")
+    print(f"{'escenario':<15}{'peticiones':>11}{'p50 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+    for nombre, lat in (("sin carga", base), ("con ráfaga", carga)):
+        print(f"{nombre:<15}{len(lat):>11}{statistics.median(lat) * 1000:>10.1f}"
+              f"{_percentil(lat, 99):>10.1f}{max(lat) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--ruta", default="/health", help="endpoint ajeno al login que se sondea")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--sondas", type=int, default=5, help="clientes que sondean la ruta en paralelo")
+    parser.add_argument("--duracion-base", type=float, default=5.0, help="segundos de medición sin carga")
+    asyncio.run(main(parser.parse_args()))
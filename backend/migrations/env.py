@@ -0,0 +1,50 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool, text
+
+from app.models import tablas  # noqa: F401  (registra los modelos en Base.metadata)
+from app.utils.conexion_db import DATABASE_URL, DB_SCHEMA, Base, argumentos_conexion
+
+# Clave del advisory lock de PostgreSQL: si varios contenedores arrancan a la vez, uno
+# migra y los demás esperan (y luego no encuentran nada pendiente)
+CLAVE_BLOQUEO = 22015
+
+config = context.config
+if config.config_file_name is not None:
+    # Sin deshabilitar los loggers de la app cuando se migra desde código (aplicar_migraciones)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# Metadatos de los modelos: solo para `alembic revision --autogenerate`; las migraciones
+# describen el esquema por sí mismas y no dependen de cómo estén los modelos hoy
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)."""
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True,
+                      dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # Conexión propia y sin pool: las migraciones corren una vez, fuera de los workers
+    motor = create_engine(DATABASE_URL, poolclass=pool.NullPool, connect_args=argumentos_conexion(DATABASE_URL))
+    with motor.connect() as conexion:
+        if conexion.dialect.name == "postgresql":
+            if DB_SCHEMA:
+                conexion.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{DB_SCHEMA}"'))
+            # Bloqueo de sesión: sobrevive a los COMMIT de cada migración y se libera al cerrar
+            conexion.execute(text("SELECT pg_advisory_lock(:clave)"), {"clave": CLAVE_BLOQUEO})
+            conexion.commit()
+        context.configure(connection=conexion, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+    motor.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
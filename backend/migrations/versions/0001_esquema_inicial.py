@@ -0,0 +1,201 @@
+"""Esquema inicial (línea base)
+
+El esquema de database/init.sql antes de usar migraciones: tablas, CHECK de cuentas.tipo
+y partidas.tipo, cuentas.nivel NOT NULL y la vista reporte_ventas_diarias. Los índices que
+se agregaron después van en las revisiones siguientes.
+
+Una base existente se adopta tal cual: solo se crean las tablas que faltan. Las que creaba
+`Base.metadata.create_all` no tenían los CHECK ni nivel NOT NULL; se agregan aquí (en
+PostgreSQL NOT VALID: se exigen a las filas nuevas sin bloquear la tabla revisando las
+existentes, `ALTER TABLE ... VALIDATE CONSTRAINT` las revisa después).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+CHECKS = {
+    "cuentas": ("cuentas_tipo_check", "tipo IN ('Activo', 'Pasivo', 'Capital', 'Ingreso', 'Gasto')"),
+    "partidas": ("partidas_tipo_check", "tipo IN ('DIARIO', 'AJUSTE', 'CIERRE')"),
+}
+
+VISTA_VENTAS = """
+SELECT
+    fecha,
+    COUNT(*) AS cantidad_facturas,
+    SUM(total) AS total_ventas,
+    SUM(iva) AS total_iva,
+    SUM(total + iva) AS total_con_iva
+FROM facturas
+GROUP BY fecha
+ORDER BY fecha DESC
+"""
+
+
+def _inspector():
+    # modo --sql: se genera el script completo para una base vacía
+    return None if op.get_context().as_sql else sa.inspect(op.get_bind())
+
+
+def _check(tabla):
+    nombre, condicion = CHECKS[tabla]
+    return sa.CheckConstraint(condicion, name=nombre)
+
+
+def _adoptar(inspector, tabla):
+    """Agrega a una tabla creada por create_all el CHECK (y en cuentas nivel NOT NULL) de init.sql."""
+    nombre, condicion = CHECKS[tabla]
+    falta_check = nombre not in {c["name"] for c in inspector.get_check_constraints(tabla)}
+    nivel_nulo = tabla == "cuentas" and any(
+        c["name"] == "nivel" and c["nullable"] for c in inspector.get_columns("cuentas"))
+    if not (falta_check or nivel_nulo):
+        return
+
+    if nivel_nulo:
+        op.execute("UPDATE cuentas SET nivel = 1 WHERE nivel IS NULL")
+    # batch: SQLite no tiene ALTER TABLE ... ADD CONSTRAINT y reconstruye la tabla
+    with op.batch_alter_table(tabla) as batch:
+        if falta_check:
+            batch.create_check_constraint(nombre, condicion, postgresql_not_valid=True)
+        if nivel_nulo:
+            batch.alter_column("nivel", existing_type=sa.Integer, nullable=False, server_default="1")
+
+
+def upgrade():
+    inspector = _inspector()
+    existentes = set(inspector.get_table_names()) if inspector else set()
+
+    if "usuarios" not in existentes:
+        op.create_table(
+            "usuarios",
+            sa.Column("id_usuario", sa.Integer, primary_key=True),
+            sa.Column("username", sa.String(50), nullable=False, unique=True),
+            sa.Column("password_hash", sa.String, nullable=False),
+            sa.Column("nombre_completo", sa.String(100)),
+            sa.Column("rol", sa.String(50)),
+            sa.Column("activo", sa.Boolean, server_default=sa.true()),
+            sa.Column("fecha_creacion", sa.DateTime, server_default=sa.func.now()),
+        )
+
+    if "cuentas" not in existentes:
+        op.create_table(
+            "cuentas",
+            sa.Column("id_cuenta", sa.Integer, primary_key=True),
+            sa.Column("codigo", sa.String(20), nullable=False, unique=True),
+            sa.Column("nombre", sa.String(100), nullable=False),
+            sa.Column("tipo", sa.String(20)),
+            sa.Column("nivel", sa.Integer, nullable=False, server_default="1"),
+            sa.Column("cuenta_padre", sa.Integer, sa.ForeignKey("cuentas.id_cuenta")),
+            sa.Column("fecha_creacion", sa.DateTime, server_default=sa.func.now()),
+            sa.Column("id_usuario_crea", sa.Integer, sa.ForeignKey("usuarios.id_usuario")),
+            _check("cuentas"),
+        )
+    else:
+        _adoptar(inspector, "cuentas")
+
+    if "manual_cuentas" not in existentes:
+        op.create_table(
+            "manual_cuentas",
+            sa.Column("id_manual", sa.Integer, primary_key=True),
+            sa.Column("id_cuenta", sa.Integer, sa.ForeignKey("cuentas.id_cuenta", ondelete="CASCADE"),
+                      nullable=False),
+            sa.Column("descripcion", sa.Text, nullable=False),
+            sa.Column("ejemplos", sa.Text),
+            sa.Column("fecha_creacion", sa.TIMESTAMP, server_default=sa.func.now()),
+            sa.Column("id_usuario_crea", sa.Integer, sa.ForeignKey("usuarios.id_usuario")),
+        )
+
+    if "partidas" not in existentes:
+        op.create_table(
+            "partidas",
+            sa.Column("id_partida", sa.Integer, primary_key=True),
+            sa.Column("fecha", sa.Date, nullable=False),
+            sa.Column("descripcion", sa.Text, nullable=False),
+            sa.Column("tipo", sa.String(20), server_default="DIARIO"),
+            sa.Column("id_usuario_crea", sa.Integer, sa.ForeignKey("usuarios.id_usuario")),
+            sa.Column("fecha_creacion", sa.DateTime, server_default=sa.func.now()),
+            _check("partidas"),
+        )
+    else:
+        _adoptar(inspector, "partidas")
+
+    if "partida_detalle" not in existentes:
+        op.create_table(
+            "partida_detalle",
+            sa.Column("id_detalle", sa.Integer, primary_key=True),
+            sa.Column("id_partida", sa.Integer, sa.ForeignKey("partidas.id_partida", ondelete="CASCADE"),
+                      nullable=False),
+            sa.Column("id_cuenta", sa.Integer, sa.ForeignKey("cuentas.id_cuenta"), nullable=False),
+            sa.Column("debe", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("haber", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("descripcion", sa.Text),
+        )
+
+    if "mayor" not in existentes:
+        op.create_table(
+            "mayor",
+            sa.Column("id_mayor", sa.Integer, primary_key=True),
+            sa.Column("id_cuenta", sa.Integer, sa.ForeignKey("cuentas.id_cuenta"), nullable=False),
+            sa.Column("saldo_debe", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("saldo_haber", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("saldo_final", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("periodo", sa.Date, nullable=False),
+            sa.Column("fecha_actualizacion", sa.DateTime, server_default=sa.func.now()),
+        )
+
+    if "balanza" not in existentes:
+        op.create_table(
+            "balanza",
+            sa.Column("id_balanza", sa.Integer, primary_key=True),
+            sa.Column("periodo", sa.Date, nullable=False),
+            sa.Column("id_cuenta", sa.Integer, sa.ForeignKey("cuentas.id_cuenta"), nullable=False),
+            sa.Column("saldo_anterior", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("movimientos_debe", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("movimientos_haber", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("saldo_final", sa.Numeric(12, 2), server_default="0"),
+        )
+
+    if "facturas" not in existentes:
+        op.create_table(
+            "facturas",
+            sa.Column("id_factura", sa.Integer, primary_key=True),
+            sa.Column("numero_factura", sa.String(20), nullable=False, unique=True),
+            sa.Column("fecha", sa.Date, nullable=False),
+            sa.Column("cliente", sa.String(100)),
+            sa.Column("total", sa.Numeric(12, 2), nullable=False),
+            sa.Column("iva", sa.Numeric(12, 2), server_default="0"),
+            sa.Column("total_con_iva", sa.Numeric(12, 2), sa.Computed("total + iva", persisted=True)),
+            sa.Column("id_usuario_crea", sa.Integer, sa.ForeignKey("usuarios.id_usuario")),
+            sa.Column("fecha_creacion", sa.TIMESTAMP, server_default=sa.func.now()),
+        )
+
+    if "auditoria" not in existentes:
+        op.create_table(
+            "auditoria",
+            sa.Column("id_auditoria", sa.Integer, primary_key=True),
+            sa.Column("tabla_afectada", sa.String(50)),
+            sa.Column("accion", sa.String(20)),
+            sa.Column("id_registro", sa.Integer),
+            sa.Column("id_usuario", sa.Integer, sa.ForeignKey("usuarios.id_usuario")),
+            sa.Column("fecha_accion", sa.TIMESTAMP, server_default=sa.func.now()),
+            sa.Column("descripcion", sa.Text),
+        )
+
+    if op.get_context().dialect.name == "postgresql":
+        op.execute(f"CREATE OR REPLACE VIEW reporte_ventas_diarias AS {VISTA_VENTAS}")
+    else:
+        op.execute(f"CREATE VIEW IF NOT EXISTS reporte_ventas_diarias AS {VISTA_VENTAS}")
+
+
+def downgrade():
+    op.execute("DROP VIEW IF EXISTS reporte_ventas_diarias")
+    for tabla in ("auditoria", "facturas", "balanza", "mayor", "partida_detalle", "partidas", "manual_cuentas",
+                  "cuentas", "usuarios"):
+        op.drop_table(tabla)
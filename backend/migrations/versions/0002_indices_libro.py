@@ -0,0 +1,48 @@
+"""Índices de los accesos del libro
+
+Todos los índices agregados después de la línea base:
+- partidas(fecha, id_partida): libro diario paginado por cursor; partidas(tipo, fecha) con filtro de tipo.
+- partida_detalle(id_cuenta, id_partida) con INCLUDE de los importes: mayor de una cuenta.
+- partida_detalle(id_partida): detalles de una página de partidas (SELECT ... IN), el
+  borrado en cascada y los joins del libro diario.
+- cuentas(cuenta_padre): subcuentas de una cuenta y verificación de la FK al borrarla.
+- manual_cuentas(id_cuenta): borrado en cascada de cuentas y join con el catálogo.
+- Únicos mayor(id_cuenta, periodo) y balanza(periodo, id_cuenta): claves de los upserts de saldos.
+
+En PostgreSQL se crean CONCURRENTLY para no bloquear las escrituras en tablas grandes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDICES = [
+    ("ix_partidas_fecha_id", "partidas", ["fecha", "id_partida"], {}),
+    ("ix_partidas_tipo_fecha", "partidas", ["tipo", "fecha"], {}),
+    ("ix_partida_detalle_cuenta_movimientos", "partida_detalle", ["id_cuenta", "id_partida"],
+     {"postgresql_include": ["id_detalle", "debe", "haber"]}),
+    ("ix_partida_detalle_partida", "partida_detalle", ["id_partida"], {}),
+    ("ix_cuentas_cuenta_padre", "cuentas", ["cuenta_padre"], {}),
+    ("ix_manual_cuentas_cuenta", "manual_cuentas", ["id_cuenta"], {}),
+    ("ux_mayor_cuenta_periodo", "mayor", ["id_cuenta", "periodo"], {"unique": True}),
+    ("ux_balanza_periodo_cuenta", "balanza", ["periodo", "id_cuenta"], {"unique": True}),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas, opciones in INDICES:
+            op.create_index(nombre, tabla, columnas, if_not_exists=True, postgresql_concurrently=True, **opciones)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _, _ in INDICES:
+            op.drop_index(nombre, table_name=tabla, if_exists=True, postgresql_concurrently=True)
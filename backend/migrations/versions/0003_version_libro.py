@@ -0,0 +1,30 @@
+"""Versión del libro compartida por los workers
+
+Tabla de una fila con el contador que sube cada transacción que modifica `mayor`. Antes
+vivía en la memoria de cada proceso y una partida registrada en un worker no invalidaba
+los reportes en caché de los demás.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tabla = op.create_table(
+        "version_libro",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+    )
+    op.bulk_insert(tabla, [{"id": 1, "version": 0}])
+
+
+def downgrade():
+    op.drop_table("version_libro")
@@ -0,0 +1,30 @@
+"""Versión del catálogo compartida por los workers
+
+Tabla de una fila con el contador que sube cada transacción que modifica `cuentas`. La
+copia del catálogo en memoria de cada worker se recarga cuando la versión de la base
+cambia, en lugar de esperar a que venza un TTL.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tabla = op.create_table(
+        "version_catalogo",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+    )
+    op.bulk_insert(tabla, [{"id": 1, "version": 0}])
+
+
+def downgrade():
+    op.drop_table("version_catalogo")
@@ -0,0 +1,128 @@
+"""
+Las pruebas corren sobre una base SQLite temporal migrada con Alembic (o sobre
+TEST_DATABASE_URL, que se vacía: nunca apuntarla a una base con datos reales).
+"""
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+_DIRECTORIO = tempfile.mkdtemp(prefix="contabilidad_pruebas_")
+# Antes de importar la app: conexion_db crea los motores al importarse
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{_DIRECTORIO}/pruebas.sqlite")
+for variable in ("ASYNC_DATABASE_URL", "DB_SCHEMA", "SLOW_QUERY_MS"):
+    os.environ.pop(variable, None)
+
+from sqlalchemy import delete, insert, update  # noqa: E402
+
+from app.models.tablas import Balanza, Cuenta, ManualCuenta, Mayor, Partida, PartidaDetalle, Usuario  # noqa: E402
+from app.utils.catalogo_cache import marcar_catalogo_modificado  # noqa: E402
+from app.utils.conexion_db import SessionLocal, engine  # noqa: E402
+from app.utils.migraciones import aplicar_migraciones  # noqa: E402
+from app.utils.saldos_mayor import reconstruir_mayor  # noqa: E402
+
+TIPOS_CUENTA = ["Activo", "Pasivo", "Capital", "Ingreso", "Gasto"]
+# Usuarios que crean las pruebas (se borran al terminar cada una)
+PREFIJO_USUARIOS = "prueba_"
+
+
+def _limpiar(db):
+    for tabla in (Balanza, Mayor, PartidaDetalle, Partida, ManualCuenta):
+        db.execute(delete(tabla))
+    db.execute(update(Cuenta).values(cuenta_padre=None))
+    db.execute(delete(Cuenta))
+    db.execute(delete(Usuario).where(Usuario.username.like(f"{PREFIJO_USUARIOS}%")))
+    marcar_catalogo_modificado(db)
+    db.commit()
+
+
+def _insertar_cuentas(db, filas: list) -> list:
+    ids = db.execute(insert(Cuenta).returning(Cuenta.id_cuenta, sort_by_parameter_order=True), filas).scalars().all()
+    return [dict(fila, id_cuenta=id_cuenta) for fila, id_cuenta in zip(filas, ids)]
+
+
+def _sembrar(db, cuentas: int = 5, subcuentas: int = 0, partidas: int = 0, max_lineas: int = 4,
+             desde: date = date(2024, 1, 1), dias: int = 365, semilla: int = 42) -> SimpleNamespace:
+    """
+    Catálogo de `cuentas` de 4 dígitos (los tipos rotan) con `subcuentas` de 6 dígitos cada una
+    y `partidas` cuadradas de 2 a `max_lineas` líneas sobre las cuentas de detalle; el mayor se
+    reconstruye al final para que los saldos materializados coincidan con el detalle.
+    """
+    rng = random.Random(semilla)
+    nivel1 = _insertar_cuentas(db, [
+        {"codigo": f"{i % 5 + 1}{i // 5 + 1:03d}", "nombre": f"{TIPOS_CUENTA[i % 5]} {i // 5 + 1}",
+         "tipo": TIPOS_CUENTA[i % 5], "nivel": 1, "cuenta_padre": None}
+        for i in range(cuentas)
+    ])
+    nivel2 = _insertar_cuentas(db, [
+        {"codigo": f"{p['codigo']}{j + 1:02d}", "nombre": f"{p['nombre']}.{j + 1}", "tipo": p["tipo"],
+         "nivel": 3, "cuenta_padre": p["id_cuenta"]}
+        for p in nivel1 for j in range(subcuentas)
+    ]) if subcuentas else []
+    hojas = nivel2 or nivel1
+
+    id_partidas = []
+    for inicio in range(0, partidas, 5000):
+        cabeceras = [{"fecha": desde + timedelta(days=rng.randrange(dias)), "tipo": "DIARIO",
+                      "descripcion": f"Partida {inicio + i + 1}"} for i in range(min(5000, partidas - inicio))]
+        ids = db.execute(insert(Partida).returning(Partida.id_partida, sort_by_parameter_order=True),
+                         cabeceras).scalars().all()
+        id_partidas += ids
+        lineas = []
+        for id_partida in ids:
+            elegidas = rng.sample(hojas, rng.randint(2, max(2, min(max_lineas, len(hojas)))))
+            importes = [Decimal(rng.randint(100, 1_000_000)) / 100 for _ in elegidas[1:]]
+            lineas.append({"id_partida": id_partida, "id_cuenta": elegidas[0]["id_cuenta"],
+                           "debe": sum(importes), "haber": 0})
+            lineas += [{"id_partida": id_partida, "id_cuenta": c["id_cuenta"], "debe": 0, "haber": importe}
+                       for c, importe in zip(elegidas[1:], importes)]
+        db.execute(insert(PartidaDetalle), lineas)
+
+    reconstruir_mayor(db)
+    marcar_catalogo_modificado(db)
+    db.commit()
+    return SimpleNamespace(
+        cuentas=nivel1 + nivel2,
+        hojas=[c["id_cuenta"] for c in hojas],
+        partidas=id_partidas,
+        por_tipo={tipo: [c["id_cuenta"] for c in hojas if c["tipo"] == tipo] for tipo in TIPOS_CUENTA},
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def esquema():
+    aplicar_migraciones()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre una base sin datos contables; lo que la prueba inserte se borra al terminar."""
+    with SessionLocal() as sesion:
+        _limpiar(sesion)
+        yield sesion
+        sesion.rollback()
+        _limpiar(sesion)
+
+
+@pytest.fixture
+def libro(request, db):
+    """
+    Libro sintético y determinista ya confirmado. Los parámetros de _sembrar se pasan con
+    @pytest.mark.parametrize("libro", [{"partidas": 50}], indirect=True).
+    """
+    return _sembrar(db, **getattr(request, "param", {}))
+
+
+@pytest.fixture
+def cliente():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
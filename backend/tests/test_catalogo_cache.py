@@ -0,0 +1,39 @@
+"""El catálogo en memoria de un worker se recarga cuando otro worker cambia las cuentas."""
+from sqlalchemy import delete, insert, update
+
+from app.models.tablas import Cuenta, VersionCatalogo
+from app.utils.catalogo_cache import catalogo, version_catalogo
+
+
+def _otro_worker(db, sentencia):
+    """Escribe en la base y sube la versión del catálogo sin pasar por este proceso."""
+    db.execute(sentencia)
+    db.execute(update(VersionCatalogo).values(version=VersionCatalogo.version + 1))
+    db.commit()
+
+
+def test_la_version_sube_al_confirmar(cliente, db, libro):
+    antes = version_catalogo(db)
+    assert cliente.post("/cuentas/", json={"codigo": "9001", "nombre": "Nueva", "tipo": "Gasto"}).status_code == 200
+    assert version_catalogo(db) == antes + 1
+
+
+def test_cuenta_creada_en_otro_worker(cliente, db, libro):
+    etag = cliente.get("/cuentas/").headers["ETag"]
+    _otro_worker(db, insert(Cuenta).values(codigo="9001", nombre="Otra", tipo="Gasto", nivel=1))
+
+    respuesta = cliente.get("/cuentas/", headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert "9001" in [c["codigo"] for c in respuesta.json()]
+    assert "9001" in catalogo.obtener(db).por_codigo
+
+
+def test_padre_eliminado_en_otro_worker(cliente, db, libro):
+    padre = libro.cuentas[0]
+    assert cliente.post("/cuentas/", json={"codigo": f"{padre['codigo']}01", "nombre": "Hija",
+                                           "tipo": padre["tipo"]}).status_code == 200
+    _otro_worker(db, delete(Cuenta).where(Cuenta.codigo.like(f"{padre['codigo']}%")))
+
+    respuesta = cliente.post("/cuentas/", json={"codigo": f"{padre['codigo']}02", "nombre": "Hija",
+                                                "tipo": padre["tipo"]})
+    assert respuesta.status_code == 400
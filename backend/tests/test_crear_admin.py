@@ -0,0 +1,41 @@
+"""El comando crear_admin crea el primer administrador o promueve a un usuario existente."""
+import pytest
+from sqlalchemy import select
+
+from app.models.tablas import Usuario
+from app.utils import crear_admin
+
+
+def _rol(db, username):
+    db.expire_all()
+    return db.scalar(select(Usuario.rol).where(Usuario.username == username))
+
+
+def test_crea_administrador(cliente, db, monkeypatch, capsys):
+    monkeypatch.setattr(crear_admin.getpass, "getpass", lambda _: "secreta-123")
+    crear_admin.main(["prueba_admin", "--nombre", "Administrador"])
+
+    assert capsys.readouterr().out.strip() == "Administrador creado: prueba_admin"
+    assert _rol(db, "prueba_admin") == "admin"
+    login = cliente.post("/auth/login", json={"username": "prueba_admin", "password": "secreta-123"})
+    assert login.status_code == 200
+    assert login.json()["usuario"]["rol"] == "admin"
+
+
+def test_promueve_usuario_existente(cliente, db, monkeypatch, capsys):
+    assert cliente.post("/auth/register", json={"username": "prueba_comun", "password": "secreta-123"}).status_code == 200
+
+    def no_pedir(_):
+        raise AssertionError("no se pide contraseña a un usuario existente")
+    monkeypatch.setattr(crear_admin.getpass, "getpass", no_pedir)
+    crear_admin.main(["prueba_comun"])
+
+    assert capsys.readouterr().out.strip() == "Administrador asignado: prueba_comun"
+    assert _rol(db, "prueba_comun") == "admin"
+
+
+def test_contrasena_vacia(db, monkeypatch):
+    monkeypatch.setattr(crear_admin.getpass, "getpass", lambda _: "")
+    with pytest.raises(SystemExit):
+        crear_admin.main(["prueba_admin"])
+    assert _rol(db, "prueba_admin") is None
@@ -0,0 +1,13 @@
+"""El estado del pool informa la configuración con que se creó y el uso en vivo."""
+from app.utils.conexion_db import _CONFIG_POOL, engine, estado_pool
+
+
+def test_estado_pool():
+    with engine.connect():
+        estado = estado_pool(engine.pool)
+        assert estado["en_uso"] >= 1
+    assert estado["tamano"] == _CONFIG_POOL["pool_size"]
+    assert (estado["max_overflow"], estado["timeout_s"], estado["recycle_s"], estado["pre_ping"]) == (
+        _CONFIG_POOL["max_overflow"], _CONFIG_POOL["pool_timeout"], _CONFIG_POOL["pool_recycle"],
+        _CONFIG_POOL["pool_pre_ping"])
+    assert estado["checkout"]["total"] >= 1
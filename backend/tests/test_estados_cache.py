@@ -0,0 +1,49 @@
+"""Los estados financieros en caché se invalidan con partidas y cuentas modificadas en cualquier worker."""
+from datetime import date
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.models.tablas import Cuenta, Partida, PartidaDetalle, VersionCatalogo, VersionLibro
+from app.utils.estados_financieros import estado_resultados
+from app.utils.saldos_mayor import aplicar_movimientos, version_libro
+
+
+def test_la_version_sube_al_confirmar(db, libro):
+    antes = version_libro(db)
+
+    aplicar_movimientos(db, [(libro.por_tipo["Activo"][0], date(2024, 5, 1), 10, 0)])
+    db.rollback()
+    assert version_libro(db) == antes
+
+    aplicar_movimientos(db, [(libro.por_tipo["Activo"][0], date(2024, 5, 1), 10, 0)])
+    db.commit()
+    assert version_libro(db) == antes + 1
+
+
+def test_partida_de_otro_worker_invalida_el_reporte(db, libro):
+    assert estado_resultados(db)["utilidad_neta"] == 0
+
+    # Otro proceso: escribe la partida y sube la versión en la base, sin pasar por este
+    id_partida = db.scalar(insert(Partida).returning(Partida.id_partida),
+                           [{"fecha": date(2024, 5, 2), "descripcion": "Venta", "tipo": "DIARIO"}])
+    db.execute(insert(PartidaDetalle), [
+        {"id_partida": id_partida, "id_cuenta": libro.por_tipo["Activo"][0], "debe": 100, "haber": 0},
+        {"id_partida": id_partida, "id_cuenta": libro.por_tipo["Ingreso"][0], "debe": 0, "haber": 100},
+    ])
+    db.execute(update(VersionLibro).values(version=VersionLibro.version + 1))
+    db.commit()
+
+    assert estado_resultados(db)["utilidad_neta"] == 100
+
+
+@pytest.mark.parametrize("libro", [{"partidas": 20}], indirect=True)
+def test_cuenta_renombrada_en_otro_worker_invalida_el_reporte(db, libro):
+    ingreso = estado_resultados(db)["ingresos"]["cuentas"][0]
+
+    # Otro proceso: cambia el nombre y sube solo la versión del catálogo
+    db.execute(update(Cuenta).where(Cuenta.id_cuenta == ingreso["id_cuenta"]).values(nombre="Ventas renombradas"))
+    db.execute(update(VersionCatalogo).values(version=VersionCatalogo.version + 1))
+    db.commit()
+
+    assert estado_resultados(db)["ingresos"]["cuentas"][0]["cuenta"] == "Ventas renombradas"
@@ -0,0 +1,25 @@
+"""Una exportación XLSX que no cabe en una hoja se rechaza en lugar de truncarse."""
+import pytest
+
+from app.utils import exportacion
+
+# 20 partidas de 2 líneas: 40 filas en el diario
+pytestmark = pytest.mark.parametrize("libro", [{"subcuentas": 2, "partidas": 20, "max_lineas": 2}], indirect=True)
+
+
+def test_diario_xlsx_mayor_que_una_hoja(cliente, libro, monkeypatch):
+    monkeypatch.setattr(exportacion, "MAX_FILAS_XLSX", 30)
+
+    respuesta = cliente.get("/exportar/diario", params={"formato": "xlsx"})
+    assert respuesta.status_code == 413
+    assert "csv" in respuesta.json()["detail"]
+
+    assert cliente.get("/exportar/diario", params={"formato": "csv"}).status_code == 200
+
+
+def test_diario_xlsx_que_cabe(cliente, libro, monkeypatch):
+    monkeypatch.setattr(exportacion, "MAX_FILAS_XLSX", 41)
+
+    respuesta = cliente.get("/exportar/diario", params={"formato": "xlsx"})
+    assert respuesta.status_code == 200
+    assert respuesta.content[:2] == b"PK"
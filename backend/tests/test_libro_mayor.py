@@ -0,0 +1,44 @@
+"""El libro mayor paginado da el mismo saldo acumulado que una sola página con todo."""
+import pytest
+from sqlalchemy import func, select
+
+from app.models.tablas import PartidaDetalle
+
+
+pytestmark = pytest.mark.parametrize("libro", [{"subcuentas": 2, "partidas": 400, "dias": 120}], indirect=True)
+
+
+@pytest.fixture
+def id_cuenta(db, libro):
+    return db.scalar(select(PartidaDetalle.id_cuenta).group_by(PartidaDetalle.id_cuenta)
+                     .order_by(func.count().desc()).limit(1))
+
+
+def _recorrer(cliente, id_cuenta, params, limit):
+    movimientos, params = [], dict(params, limit=limit)
+    while True:
+        respuesta = cliente.get(f"/mayor/{id_cuenta}", params=params)
+        assert respuesta.status_code == 200
+        movimientos += respuesta.json()["movimientos"]
+        if "X-Next-Cursor" not in respuesta.headers:
+            return movimientos
+        params["cursor"] = respuesta.headers["X-Next-Cursor"]
+
+
+@pytest.mark.parametrize("params", [{}, {"desde": "2024-02-10", "hasta": "2024-04-15"}])
+def test_paginas_continuan_el_saldo(cliente, id_cuenta, params):
+    completo = _recorrer(cliente, id_cuenta, params, limit=5000)
+    paginado = _recorrer(cliente, id_cuenta, params, limit=7)
+
+    assert len(completo) > 7
+    assert [(m["id_detalle"], m["saldo"]) for m in paginado] == [(m["id_detalle"], m["saldo"]) for m in completo]
+
+
+def test_saldo_de_la_pagina_lo_calcula_el_servidor(cliente, id_cuenta):
+    completo = _recorrer(cliente, id_cuenta, {}, limit=5000)
+    corte = completo[9]
+    cursor = f"{corte['fecha']}_{corte['id_partida']}_{corte['id_detalle']}"
+
+    respuesta = cliente.get(f"/mayor/{id_cuenta}", params={"cursor": cursor, "limit": 5})
+    assert [m["saldo"] for m in respuesta.json()["movimientos"]] == [m["saldo"] for m in completo[10:15]]
+    assert cliente.get(f"/mayor/{id_cuenta}", params={"cursor": cursor + "_999999.99"}).status_code == 400
@@ -0,0 +1,110 @@
+"""
+`mayor` se mantiene al registrar, eliminar e importar partidas y coincide con el detalle;
+la reconstrucción completa (solo administradores) da los mismos totales.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.tablas import Mayor, Partida, PartidaDetalle
+from app.utils.crear_admin import crear_admin
+from app.utils.saldos_mayor import saldos_por_cuenta
+
+pytestmark = pytest.mark.parametrize("libro", [{"subcuentas": 2, "partidas": 200, "dias": 120}], indirect=True)
+
+# Rango completo, meses completos con días sueltos en ambos extremos y días dentro de un solo mes
+RANGOS = [(None, None), (date(2024, 2, 10), date(2024, 3, 20)), (date(2024, 2, 3), date(2024, 2, 17))]
+
+
+def _montos(debe, haber) -> tuple:
+    return Decimal(str(debe or 0)), Decimal(str(haber or 0))
+
+
+def _detalle(db, desde=None, hasta=None, por_periodo=True) -> dict:
+    """Totales (debe, haber) agregados directamente desde partida_detalle."""
+    totales = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+    filas = db.execute(select(PartidaDetalle.id_cuenta, Partida.fecha, PartidaDetalle.debe, PartidaDetalle.haber)
+                       .join(Partida, Partida.id_partida == PartidaDetalle.id_partida))
+    for id_cuenta, fecha, debe, haber in filas:
+        if (desde and fecha < desde) or (hasta and fecha > hasta):
+            continue
+        debe, haber = _montos(debe, haber)
+        clave = (id_cuenta, fecha.replace(day=1)) if por_periodo else id_cuenta
+        totales[clave][0] += debe
+        totales[clave][1] += haber
+    return {clave: tuple(t) for clave, t in totales.items() if any(t)}
+
+
+def _mayor(db) -> dict:
+    """Movimientos por (cuenta, período) en `mayor`, verificando de paso el saldo acumulado."""
+    filas = db.execute(select(Mayor.id_cuenta, Mayor.periodo, Mayor.saldo_debe, Mayor.saldo_haber, Mayor.saldo_final)
+                       .order_by(Mayor.id_cuenta, Mayor.periodo)).all()
+    acumulado = {}
+    for f in filas:
+        debe, haber = _montos(f.saldo_debe, f.saldo_haber)
+        acumulado[f.id_cuenta] = acumulado.get(f.id_cuenta, Decimal("0")) + debe - haber
+        assert Decimal(str(f.saldo_final)) == acumulado[f.id_cuenta], f
+    return {(f.id_cuenta, f.periodo): _montos(f.saldo_debe, f.saldo_haber)
+            for f in filas if any(_montos(f.saldo_debe, f.saldo_haber))}
+
+
+def _verificar(db):
+    db.rollback()  # lo que confirmó la API, no una instantánea anterior
+    assert _mayor(db) == _detalle(db)
+    for desde, hasta in RANGOS:
+        saldos = {s["id_cuenta"]: _montos(s["debe"], s["haber"]) for s in saldos_por_cuenta(db, desde, hasta)}
+        assert saldos == _detalle(db, desde, hasta, por_periodo=False), (desde, hasta)
+
+
+def test_registrar_y_eliminar_partidas(cliente, db, libro):
+    a, b, c = libro.hojas[:3]
+    for fecha, importe in [("2024-02-15", 125.5), ("2024-03-31", 80), ("2024-06-01", 42.1)]:
+        respuesta = cliente.post("/partidas/", json={"fecha": fecha, "descripcion": "Prueba", "detalles": [
+            {"id_cuenta": a, "debe": importe, "haber": 0},
+            {"id_cuenta": b, "debe": 0, "haber": importe - 20},
+            {"id_cuenta": c, "debe": 0, "haber": 20},
+        ]})
+        assert respuesta.status_code == 200, respuesta.text
+        _verificar(db)
+    nueva = respuesta.json()["id_partida"]
+
+    # Una partida recién registrada (único movimiento de su mes) y dos del libro sembrado
+    for id_partida in (nueva, *libro.partidas[:2]):
+        assert cliente.delete(f"/partidas/{id_partida}").status_code == 200
+        _verificar(db)
+
+
+def test_importar_partidas(cliente, db, libro):
+    a, b = libro.hojas[:2]
+    archivo = "\n".join(["referencia,fecha,descripcion,id_cuenta,debe,haber"] + [
+        f"{n},2024-0{n % 3 + 2}-{n + 10},Importada {n},{cuenta},{debe},{haber}"
+        for n in range(1, 10) for cuenta, debe, haber in ((a, n * 10.25, 0), (b, 0, n * 10.25))
+    ])
+    respuesta = cliente.post("/partidas/importar", files={"archivo": ("partidas.csv", archivo.encode(), "text/csv")})
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["importadas"] == 9
+    _verificar(db)
+
+
+def test_reconstruir_como_admin(cliente, db, libro):
+    antes = _mayor(db)
+    assert antes == _detalle(db)
+
+    crear_admin(db, "prueba_admin", "secreta-123")
+    # Un mayor desfasado: la reconstrucción lo recalcula desde el detalle
+    db.execute(update(Mayor).where(Mayor.id_cuenta == libro.hojas[0]).values(saldo_debe=0, saldo_final=0))
+    db.commit()
+    token = cliente.post("/auth/login", json={"username": "prueba_admin", "password": "secreta-123"}).json()["access_token"]
+
+    respuesta = cliente.post("/mayorizacion/reconstruir", headers={"Authorization": f"Bearer {token}"})
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["registros"] == len(antes)
+    _verificar(db)
+    assert _mayor(db) == antes
+
+
+def test_reconstruir_requiere_sesion(cliente, libro):
+    assert cliente.post("/mayorizacion/reconstruir").status_code == 401
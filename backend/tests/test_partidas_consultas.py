@@ -0,0 +1,38 @@
+"""El listado de partidas hace las mismas consultas sin importar cuántas partidas devuelva."""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.utils.conexion_db import async_engine, engine
+
+# Cabeceras de la página y un SELECT ... IN con los detalles de todas ellas
+CONSULTAS_LISTADO = 2
+
+
+@contextmanager
+def contar_sentencias():
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    motores = (engine, async_engine.sync_engine)
+    for motor in motores:
+        event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        for motor in motores:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+
+@pytest.mark.parametrize("libro", [{"subcuentas": 3, "partidas": n} for n in (1, 50, 500)], indirect=True)
+def test_listado_no_crece_con_la_pagina(cliente, libro):
+    partidas = len(libro.partidas)
+    with contar_sentencias() as sentencias:
+        respuesta = cliente.get("/partidas/", params={"limit": partidas})
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()) == partidas
+    assert all(len(p["detalles"]) >= 2 for p in respuesta.json())
+    assert len(sentencias) == CONSULTAS_LISTADO, sentencias
@@ -0,0 +1,27 @@
+"""Lo que se guarda en partida_detalle y en mayor son los importes que se validaron."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.tablas import Mayor, PartidaDetalle
+
+
+@pytest.mark.parametrize("libro", [{"cuentas": 3}], indirect=True)
+def test_importes_redondeados_como_en_la_validacion(cliente, db, libro):
+    a, b, c = libro.hojas
+
+    # 0.015 y 0.025 redondean a 0.02 (mitad al par) y la partida cuadra contra 0.04;
+    # redondeados por separado en la base (mitad hacia arriba) sumarían 0.05
+    respuesta = cliente.post("/partidas/", json={"fecha": "2024-03-10", "descripcion": "Centavos", "detalles": [
+        {"id_cuenta": a, "debe": 0.015, "haber": 0},
+        {"id_cuenta": b, "debe": 0.025, "haber": 0},
+        {"id_cuenta": c, "debe": 0, "haber": 0.04},
+    ]})
+    assert respuesta.status_code == 200, respuesta.text
+    assert [d["debe"] for d in respuesta.json()["detalles"]] == [0.02, 0.02, 0]
+
+    debe, haber = db.execute(select(func.sum(PartidaDetalle.debe), func.sum(PartidaDetalle.haber))).one()
+    assert Decimal(str(debe)) == Decimal(str(haber)) == Decimal("0.04")
+    saldos = dict(db.execute(select(Mayor.id_cuenta, Mayor.saldo_debe)).all())
+    assert Decimal(str(saldos[a])) == Decimal(str(saldos[b])) == Decimal("0.02")
@@ -0,0 +1,79 @@
+"""
+El planificador de PostgreSQL usa los índices de la migración 0002 en las consultas que
+ejecutan los endpoints del libro. Solo corre con TEST_DATABASE_URL apuntando a PostgreSQL:
+los planes de SQLite no dicen nada de los de producción.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, func, select, text
+
+from app.controllers.cuentas_controller import consulta_subcuentas
+from app.controllers.mayor_controller import consultas_libro_mayor
+from app.controllers.partidas_controller import consulta_listado
+from app.models.tablas import PartidaDetalle
+from app.utils.conexion_db import engine
+
+pytestmark = [
+    pytest.mark.skipif(engine.dialect.name != "postgresql", reason="los planes se verifican en PostgreSQL"),
+    # Lo bastante grande para que recorrer las tablas deje de convenir
+    pytest.mark.parametrize("libro", [{"cuentas": 50, "subcuentas": 40, "partidas": 20000, "semilla": 2024}],
+                            indirect=True),
+]
+
+
+@contextmanager
+def capturar_sentencias():
+    """Sentencias que llegan al driver, con sus parámetros, para pedir el plan de cada una."""
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+
+def _indices(nodo: dict) -> set:
+    indices = {nodo["Index Name"]} if "Index Name" in nodo else set()
+    for hijo in nodo.get("Plans", []):
+        indices |= _indices(hijo)
+    return indices
+
+
+def _planes(db, ejecutar) -> list:
+    """Índices del plan de cada sentencia que emite `ejecutar` (así se incluye el SELECT ... IN de selectinload)."""
+    with capturar_sentencias() as sentencias:
+        ejecutar()
+    return [_indices(db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sentencia}", parametros)
+                     .scalar()[0]["Plan"]) for sentencia, parametros in sentencias]
+
+
+def test_consultas_del_libro_usan_sus_indices(db, libro):
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+    # Libro diario: primera página, sus detalles y una página por cursor
+    pagina = []
+    cabeceras, detalles = _planes(db, lambda: pagina.extend(db.scalars(consulta_listado(200)).all()))
+    assert "ix_partidas_fecha_id" in cabeceras
+    assert "ix_partida_detalle_partida" in detalles
+    ultima = pagina[199]
+    cabeceras, _ = _planes(db, lambda: db.scalars(consulta_listado(200, (ultima.fecha, ultima.id_partida))).all())
+    assert "ix_partidas_fecha_id" in cabeceras
+
+    # Libro mayor de la cuenta con más movimientos: página por cursor y saldo previo a ella
+    id_cuenta = db.scalar(select(PartidaDetalle.id_cuenta).group_by(PartidaDetalle.id_cuenta)
+                          .order_by(func.count().desc()).limit(1))
+    movimientos = db.execute(consultas_libro_mayor(id_cuenta, 1, 10)[0]).all()
+    corte = movimientos[9]
+    pagina_mayor, previos = consultas_libro_mayor(id_cuenta, 1, 10, (corte.fecha, corte.id_partida, corte.id_detalle))
+    for indices in _planes(db, lambda: (db.scalar(previos), db.execute(pagina_mayor).all())):
+        assert "ix_partida_detalle_cuenta_movimientos" in indices
+
+    # Al borrar una cuenta de detalle se verifica que no tenga subcuentas
+    plan, = _planes(db, lambda: db.scalar(consulta_subcuentas(libro.hojas[0])))
+    assert "ix_cuentas_cuenta_padre" in plan
@@ -0,0 +1,36 @@
+"""Nadie puede darse rol de administrador al registrarse."""
+from sqlalchemy import select
+
+from app.models.tablas import Usuario
+from app.utils.crear_admin import crear_admin
+
+
+def _registrar(cliente, username, rol=None, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return cliente.post("/auth/register", headers=headers,
+                        json={"username": username, "password": "secreta-123", "rol": rol})
+
+
+def test_registro_anonimo(cliente, db):
+    assert _registrar(cliente, "prueba_admin_falso", rol="admin").status_code == 403
+    assert _registrar(cliente, "prueba_nuevo").status_code == 200
+    assert db.scalar(select(Usuario.rol).where(Usuario.username == "prueba_nuevo")) == "usuario"
+    assert db.scalar(select(Usuario.id_usuario).where(Usuario.username == "prueba_admin_falso")) is None
+
+
+def test_admin_crea_admin(cliente, db):
+    crear_admin(db, "prueba_admin", "secreta-123")
+    db.commit()
+    token = cliente.post("/auth/login", json={"username": "prueba_admin", "password": "secreta-123"}).json()["access_token"]
+
+    assert _registrar(cliente, "prueba_admin_2", rol="admin", token=token).status_code == 200
+    assert db.scalar(select(Usuario.rol).where(Usuario.username == "prueba_admin_2")) == "admin"
+
+
+def test_usuario_sin_rol_admin_no_asigna_roles(cliente, db):
+    assert _registrar(cliente, "prueba_comun").status_code == 200
+    token = cliente.post("/auth/login", json={"username": "prueba_comun", "password": "secreta-123"}).json()["access_token"]
+
+    assert _registrar(cliente, "prueba_otro_admin", rol="admin", token=token).status_code == 403
+    assert _registrar(cliente, "prueba_explicito", rol="usuario", token=token).status_code == 200
+    assert _registrar(cliente, "prueba_token_falso", token="no-es-un-token").status_code == 401
@@ -0,0 +1,55 @@
+"""Solo un administrador activa o desactiva usuarios, y los tokens de un usuario desactivado dejan de valer."""
+import pytest
+from sqlalchemy import select
+
+from app.models.tablas import Usuario
+from app.utils.crear_admin import crear_admin
+
+PASSWORD = "secreta-123"
+
+
+def _login(cliente, username):
+    return cliente.post("/auth/login", json={"username": username, "password": PASSWORD})
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def usuarios(cliente, db):
+    crear_admin(db, "prueba_admin", PASSWORD)
+    db.commit()
+    assert cliente.post("/auth/register", json={"username": "prueba_comun", "password": PASSWORD}).status_code == 200
+    return {
+        "admin": _login(cliente, "prueba_admin").json()["access_token"],
+        "comun": _login(cliente, "prueba_comun").json()["access_token"],
+        "id_comun": db.scalar(select(Usuario.id_usuario).where(Usuario.username == "prueba_comun")),
+    }
+
+
+def test_requiere_admin(cliente, usuarios):
+    ruta = f"/auth/usuarios/{usuarios['id_comun']}/desactivar"
+    assert cliente.put(ruta).status_code == 401
+    assert cliente.put(ruta, headers=_auth(usuarios["comun"])).status_code == 403
+
+
+def test_desactivar_y_activar(cliente, db, usuarios):
+    admin, comun, id_comun = usuarios["admin"], usuarios["comun"], usuarios["id_comun"]
+    assert cliente.get("/panel/", headers=_auth(comun)).status_code == 200  # su estado queda en caché
+
+    respuesta = cliente.put(f"/auth/usuarios/{id_comun}/desactivar", headers=_auth(admin))
+    assert respuesta.status_code == 200
+    assert db.scalar(select(Usuario.activo).where(Usuario.id_usuario == id_comun)) is False
+    # El token emitido antes de desactivarlo se rechaza de inmediato, sin esperar el TTL
+    assert cliente.get("/panel/", headers=_auth(comun)).status_code == 403
+    assert _login(cliente, "prueba_comun").status_code == 403
+
+    assert cliente.put(f"/auth/usuarios/{id_comun}/activar", headers=_auth(admin)).status_code == 200
+    db.expire_all()
+    assert db.scalar(select(Usuario.activo).where(Usuario.id_usuario == id_comun)) is True
+    assert cliente.get("/panel/", headers=_auth(comun)).status_code == 200
+
+
+def test_usuario_inexistente(cliente, usuarios):
+    assert cliente.put("/auth/usuarios/999999/activar", headers=_auth(usuarios["admin"])).status_code == 404
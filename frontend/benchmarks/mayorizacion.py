@@ -0,0 +1,100 @@
+"""
+Mide el trabajo en pandas que hace la página de Mayorización con las respuestas del backend:
+el selector de cuentas del resumen (GET /mayorizacion) y el armado del libro mayor de la
+cuenta elegida (GET /mayor/{id_cuenta}, todas las páginas). Compara la versión anterior de
+la página (diccionario desde `itertuples`, naturaleza fila por fila y fechas sin formato)
+con las funciones de `utils.mayorizacion` que usa ahora.
+
+Uso (desde frontend/, solo necesita pandas y numpy):
+    python -m benchmarks.mayorizacion --cuentas 5000 --movimientos 100000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.mayorizacion import movimientos_mayor, selector_cuentas
+
+TIPOS = ["ACTIVO", "PASIVO", "CAPITAL", "INGRESO", "GASTO"]
+
+
+def _datos(cuentas: int, movimientos: int, semilla: int = 7):
+    """Un resumen y una lista de movimientos con la forma del JSON que devuelve el backend."""
+    rng = np.random.default_rng(semilla)
+    resumen = pd.DataFrame({
+        "id_cuenta": np.arange(1, cuentas + 1),
+        "codigo": [str(100000 + i) for i in range(cuentas)],
+        "cuenta": [f"Cuenta {i + 1}" for i in range(cuentas)],
+        "tipo_cuenta": [TIPOS[i % len(TIPOS)] for i in range(cuentas)],
+        "debe": rng.integers(1, 10_000_000, cuentas) / 100,
+        "haber": rng.integers(1, 10_000_000, cuentas) / 100,
+    })
+    resumen["saldo"] = resumen["debe"] - resumen["haber"]
+
+    inicio = date(2024, 1, 1)
+    importes = rng.integers(1, 100_000, movimientos) / 100
+    es_debe = rng.random(movimientos) < 0.5
+    saldos = np.cumsum(np.where(es_debe, importes, -importes))
+    lista = [
+        {"id_detalle": i + 1, "id_partida": i + 1, "fecha": (inicio + timedelta(days=i * 365 // movimientos)).isoformat(),
+         "tipo": "DIARIO", "descripcion": f"Partida {i + 1}", "debe": float(importes[i]) if es_debe[i] else 0.0,
+         "haber": 0.0 if es_debe[i] else float(importes[i]), "saldo": float(saldos[i])}
+        for i in range(movimientos)
+    ]
+    return resumen, lista
+
+
+def selector_anterior(resumen: pd.DataFrame, elegida: str):
+    opciones = {f"{r.codigo} - {r.cuenta}": r for r in resumen.itertuples()}
+    fila = opciones[elegida]
+    return fila, "DEUDORA" if fila.tipo_cuenta in ["ACTIVO", "GASTO"] else "ACREEDORA"
+
+
+def selector_actual(resumen: pd.DataFrame, elegida: str):
+    fila = selector_cuentas(resumen).loc[elegida]
+    return fila, fila.naturaleza
+
+
+def movimientos_anterior(lista: list) -> pd.DataFrame:
+    df = pd.DataFrame(lista)
+    df["fecha"] = pd.to_datetime(df["fecha"]).dt.date
+    return df.rename(columns={"saldo": "saldo_acumulado"})
+
+
+def _medir(funcion, *args, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main(args):
+    resumen, lista = _datos(args.cuentas, args.movimientos)
+    elegida = f"{resumen['codigo'].iloc[-1]} - {resumen['cuenta'].iloc[-1]}"
+
+    t_sel_antes, (fila_antes, nat_antes) = _medir(selector_anterior, resumen, elegida, repeticiones=args.repeticiones)
+    t_sel_ahora, (fila_ahora, nat_ahora) = _medir(selector_actual, resumen, elegida, repeticiones=args.repeticiones)
+    t_mov_antes, esperado = _medir(movimientos_anterior, lista, repeticiones=args.repeticiones)
+    t_mov_ahora, obtenido = _medir(movimientos_mayor, lista, repeticiones=args.repeticiones)
+
+    # Ambas versiones deben dar lo mismo
+    assert (fila_antes.id_cuenta, nat_antes) == (fila_ahora.id_cuenta, nat_ahora)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+    print(f"{args.cuentas} cuentas en el resumen, {args.movimientos} movimientos de la cuenta elegida")
+    print(f"{'operación':<30}{'anterior ms':>14}{'actual ms':>12}{'aceleración':>13}")
+    for nombre, antes, despues in (("selector de cuentas", t_sel_antes, t_sel_ahora),
+                                   ("libro mayor de la cuenta", t_mov_antes, t_mov_ahora)):
+        print(f"{nombre:<30}{antes * 1000:>14.2f}{despues * 1000:>12.2f}{antes / despues:>12.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cuentas", type=int, default=5000)
+    parser.add_argument("--movimientos", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=5, help="se reporta el mejor tiempo")
+    main(parser.parse_args())
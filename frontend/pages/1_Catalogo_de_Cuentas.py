@@ -1,14 +1,8 @@
 import streamlit as st
-import requests
-import os
+from utils import api, catalogo
 from utils.auth import require_login
 from utils.sidebar import render_sidebar
 
-# ==============================
-# CONFIGURACIÓN DEL BACKEND
-# ==============================
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
-
 require_login()
 render_sidebar()
 
@@ -20,23 +14,43 @@ st.title("Catálogo de Cuentas Contables")
 # ==============================
 
 def cargar_cuentas():
+    # Catálogo compartido entre páginas; se invalida tras cada alta, edición o baja
+    return catalogo.obtener_indice().cuentas
+
+
+def cargar_arbol():
     try:
-        r = requests.get(f"{BACKEND_URL}/cuentas/")
+        r = api.get("/cuentas/arbol")
         if r.status_code == 200:
             return r.json()
         else:
-            st.error(f"Error al cargar cuentas: {r.text}")
+            st.error(f"Error al cargar jerarquía: {r.text}")
             return []
     except Exception as e:
         st.error(f"Error de conexión con backend: {e}")
         return []
 
 
+def aplanar_arbol(nodos, profundidad=0):
+    """Recorre el árbol en profundidad devolviendo filas con el nombre sangrado según su nivel."""
+    filas = []
+    for n in nodos:
+        filas.append({
+            "Código": n["codigo"],
+            "Cuenta": "\u3000" * profundidad + n["nombre"],
+            "Tipo": n["tipo"],
+            "Nivel": n["nivel"],
+        })
+        filas.extend(aplanar_arbol(n["subcuentas"], profundidad + 1))
+    return filas
+
+
 def crear_cuenta(payload):
     try:
-        r = requests.post(f"{BACKEND_URL}/cuentas/", json=payload)
+        r = api.post("/cuentas/", json=payload)
         if r.status_code == 200:
             st.success("Cuenta creada exitosamente")
+            catalogo.invalidar()
             st.session_state["refresh"] = True
         else:
             st.error(f" Error: {r.text}")
@@ -46,9 +60,10 @@ def crear_cuenta(payload):
 
 def actualizar_cuenta(id_cuenta, payload):
     try:
-        r = requests.put(f"{BACKEND_URL}/cuentas/{id_cuenta}", json=payload)
+        r = api.put(f"/cuentas/{id_cuenta}", json=payload)
         if r.status_code == 200:
             st.success("Cuenta actualizada correctamente")
+            catalogo.invalidar()
             st.session_state["refresh"] = True
         else:
             st.error(f"Error al actualizar: {r.text}")
@@ -58,9 +73,10 @@ def actualizar_cuenta(id_cuenta, payload):
 
 def eliminar_cuenta(id_cuenta):
     try:
-        r = requests.delete(f"{BACKEND_URL}/cuentas/{id_cuenta}")
+        r = api.delete(f"/cuentas/{id_cuenta}")
         if r.status_code == 200:
             st.success("Cuenta eliminada correctamente")
+            catalogo.invalidar()
             st.session_state["refresh"] = True
         else:
             st.error(f"Error al eliminar: {r.text}")
@@ -144,7 +160,11 @@ if "refresh" in st.session_state and st.session_state["refresh"]:
     st.session_state["refresh"] = False
     st.rerun()
 
-if cuentas:
+vista = st.radio("Vista", ["Tabla", "Jerarquía"], horizontal=True)
+
+if cuentas and vista == "Jerarquía":
+    st.dataframe(aplanar_arbol(cargar_arbol()), use_container_width=True, hide_index=True)
+elif cuentas:
     st.dataframe(cuentas, use_container_width=True)
 else:
     st.info("No hay cuentas registradas aún.")
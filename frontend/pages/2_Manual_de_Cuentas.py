@@ -1,12 +1,9 @@
 import streamlit as st
 import pandas as pd
-import requests
-import os
+from utils import api, catalogo
 from utils.auth import require_login
 from utils.sidebar import render_sidebar
 
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
-
 require_login()
 render_sidebar()
 
@@ -18,20 +15,11 @@ st.title("Manual de Cuentas Contables")
 # ===========================
 
 def obtener_cuentas():
-    try:
-        r = requests.get(f"{BACKEND_URL}/cuentas/")
-        if r.status_code == 200:
-            return r.json()
-        else:
-            st.error("No se pudieron cargar las cuentas.")
-            return []
-    except Exception as e:
-        st.error(f"Error de conexión con backend: {e}")
-        return []
+    return catalogo.obtener_indice().cuentas
 
 def obtener_manual():
     try:
-        r = requests.get(f"{BACKEND_URL}/manual_cuentas/")
+        r = api.get("/manual_cuentas/")
         if r.status_code == 200:
             return r.json()
         else:
@@ -42,21 +30,21 @@ def obtener_manual():
         return []
 
 def crear_manual(data):
-    r = requests.post(f"{BACKEND_URL}/manual_cuentas/", json=data)
+    r = api.post("/manual_cuentas/", json=data)
     if r.status_code == 200:
         st.success("Descripción agregada correctamente")
     else:
         st.error(f"Error al crear: {r.text}")
 
 def actualizar_manual(id_manual, data):
-    r = requests.put(f"{BACKEND_URL}/manual_cuentas/{id_manual}", json=data)
+    r = api.put(f"/manual_cuentas/{id_manual}", json=data)
     if r.status_code == 200:
         st.success("Descripción actualizada")
     else:
         st.error(f"Error al actualizar: {r.text}")
 
 def eliminar_manual(id_manual):
-    r = requests.delete(f"{BACKEND_URL}/manual_cuentas/{id_manual}")
+    r = api.delete(f"/manual_cuentas/{id_manual}")
     if r.status_code == 200:
         st.success("Eliminado correctamente")
     else:
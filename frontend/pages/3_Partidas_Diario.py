@@ -1,11 +1,8 @@
 import streamlit as st
-import requests
 import pandas as pd
-import os
 from datetime import date
 
-# Configuración de la API
-API_URL = os.getenv("BACKEND_URL", "http://backend:8000")
+from utils import api, catalogo
 
 st.set_page_config(page_title="Libro Diario", layout="wide", page_icon="📒")
 
@@ -13,42 +10,27 @@ st.set_page_config(page_title="Libro Diario", layout="wide", page_icon="📒")
 # FUNCIONES AUXILIARES
 # ==========================================
 
-def obtener_cuentas():
+def obtener_partidas(filtros, cursor=None, limite=20):
     """
-    Obtiene las cuentas del backend.
-    Retorna lista de dicts con campos: {'id_cuenta': int, 'codigo': str, 'nombre': str, ...}
+    Obtiene una página de partidas ordenadas por (fecha, id_partida).
+    Retorna (partidas, siguiente_cursor); siguiente_cursor es None en la última página.
     """
+    params = {k: v for k, v in filtros.items() if v}
+    params["limit"] = limite
+    if cursor:
+        params["cursor"] = cursor
     try:
-        r = requests.get(f"{API_URL}/cuentas")
+        r = api.get("/partidas", params=params)
         if r.status_code == 200:
-            return r.json()
+            return r.json(), r.headers.get("X-Next-Cursor")
     except:
         pass
-    
-    # Retorno dummy por si no hay conexión aún
-    return [
-        {"id_cuenta": 1, "codigo": "1101", "nombre": "Caja General"},
-        {"id_cuenta": 2, "codigo": "1102", "nombre": "Bancos"},
-        {"id_cuenta": 3, "codigo": "2101", "nombre": "Cuentas por Pagar"},
-        {"id_cuenta": 4, "codigo": "4101", "nombre": "Ventas"},
-        {"id_cuenta": 5, "codigo": "5101", "nombre": "Gastos de Sueldos"},
-        {"id_cuenta": 6, "codigo": "1201", "nombre": "Mobiliario y Equipo"}
-    ]
-
-def obtener_partidas():
-    """Obtiene todas las partidas del backend."""
-    try:
-        r = requests.get(f"{API_URL}/partidas")
-        if r.status_code == 200:
-            return r.json()
-    except:
-        pass
-    return []
+    return [], None
 
 def eliminar_partida(id_partida):
     """Intenta eliminar una partida (requiere endpoint DELETE en backend)."""
     try:
-        r = requests.delete(f"{API_URL}/partidas/{id_partida}")
+        r = api.delete(f"/partidas/{id_partida}")
         return r.status_code in [200, 204]
     except:
         return False
@@ -59,9 +41,13 @@ def eliminar_partida(id_partida):
 if "lineas" not in st.session_state:
     st.session_state.lineas = []
 
-if "cuentas_list" not in st.session_state:
-    data_cuentas = obtener_cuentas()
-    st.session_state.cuentas_list = [f"{c['codigo']} - {c['nombre']}" for c in data_cuentas]
+# Catálogo compartido (caché con TTL): no se descarga en cada interacción
+indice_cuentas = catalogo.obtener_indice()
+
+# Pila de cursores de la lista paginada: el último es el inicio de la página actual
+if "cursores_diario" not in st.session_state:
+    st.session_state.cursores_diario = [None]
+    st.session_state.filtros_diario = None
 
 if "monto_debe" not in st.session_state:
     st.session_state.monto_debe = 0.00
@@ -107,7 +93,7 @@ with tab_crear:
         c1, c2, c3, c4 = st.columns([3, 1.5, 1.5, 1])
         
         with c1:
-            cuenta_seleccionada = st.selectbox("Seleccionar Cuenta", st.session_state.cuentas_list)
+            cuenta_seleccionada = st.selectbox("Seleccionar Cuenta", indice_cuentas.etiquetas)
         
         with c2:
             monto_debe = st.number_input(
@@ -133,26 +119,21 @@ with tab_crear:
             st.write("")
             st.write("")
             if st.button("➕ Agregar", use_container_width=True):
-                codigo_cuenta = cuenta_seleccionada.split(" - ")[0]
-                
-                data_cuentas = obtener_cuentas()
-                id_cuenta = None
-                nombre_cuenta = ""
-                for c in data_cuentas:
-                    if c.get('codigo') == codigo_cuenta:
-                        id_cuenta = c.get('id_cuenta')
-                        nombre_cuenta = c.get('nombre', '')
-                        break
-                
-                if monto_debe == 0 and monto_haber == 0:
+                # Búsqueda en el índice en memoria: agregar una línea no hace llamadas al backend
+                codigo_cuenta = cuenta_seleccionada.split(" - ")[0] if cuenta_seleccionada else None
+                cuenta = indice_cuentas.por_codigo.get(codigo_cuenta)
+
+                if cuenta is None:
+                    st.toast("⚠️ Seleccione una cuenta válida", icon="⚠️")
+                elif monto_debe == 0 and monto_haber == 0:
                     st.toast("⚠️ El monto debe ser mayor a 0 en Debe o Haber", icon="⚠️")
                 elif monto_debe > 0 and monto_haber > 0:
                     st.toast("⛔ No se puede registrar en Debe y Haber al mismo tiempo", icon="⛔")
                 else:
                     st.session_state.lineas.append({
-                        "id_cuenta": id_cuenta,
+                        "id_cuenta": cuenta["id_cuenta"],
                         "cuenta": codigo_cuenta,
-                        "nombre_cuenta": nombre_cuenta,
+                        "nombre_cuenta": cuenta["nombre"],
                         "debe": monto_debe,
                         "haber": monto_haber
                     })
@@ -227,7 +208,7 @@ with tab_crear:
             
             try:
                 with st.spinner("Guardando en base de datos..."):
-                    r = requests.post(f"{API_URL}/partidas", json=payload)
+                    r = api.post("/partidas", json=payload)
                     
                     if r.status_code == 200:
                         st.balloons()
@@ -250,15 +231,39 @@ with tab_crear:
 # ==========================================
 with tab_listar:
     st.subheader("📋 Partidas Registradas")
-    
-    partidas = obtener_partidas()
+
+    # Filtros enviados al backend
+    f1, f2, f3, f4 = st.columns(4)
+    with f1:
+        f_desde = st.date_input("Desde", value=date(date.today().year, 1, 1), key="diario_desde")
+    with f2:
+        f_hasta = st.date_input("Hasta", value=date.today(), key="diario_hasta")
+    with f3:
+        f_tipo = st.selectbox("Tipo", ["Todos", "DIARIO", "AJUSTE", "CIERRE"], key="diario_tipo")
+    with f4:
+        f_cuenta = st.selectbox("Cuenta", ["Todas"] + indice_cuentas.etiquetas, key="diario_cuenta")
+
+    filtros = {
+        "desde": str(f_desde),
+        "hasta": str(f_hasta),
+        "tipo": None if f_tipo == "Todos" else f_tipo,
+        "id_cuenta": None if f_cuenta == "Todas" else indice_cuentas.por_codigo[f_cuenta.split(" - ")[0]]["id_cuenta"],
+    }
+    # Si cambian los filtros se vuelve a la primera página
+    if st.session_state.filtros_diario != filtros:
+        st.session_state.filtros_diario = filtros
+        st.session_state.cursores_diario = [None]
+
+    pagina = len(st.session_state.cursores_diario)
+    partidas, siguiente_cursor = obtener_partidas(filtros, st.session_state.cursores_diario[-1])
     
     if not partidas:
-        st.info("No hay partidas registradas aún.")
+        st.info("No hay partidas registradas con los filtros seleccionados.")
     else:
-        # Mostrar partidas en tabla expandible
-        for idx, partida in enumerate(partidas):
-            with st.expander(f"📌 {partida['fecha']} - {partida['descripcion'][:40]}... (ID: {partida['id_partida']})"):
+        # Mostrar solo la página actual en tabla expandible
+        for partida in partidas:
+            id_partida = partida['id_partida']
+            with st.expander(f"📌 {partida['fecha']} - {partida['descripcion'][:40]}... (ID: {id_partida})"):
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
@@ -266,7 +271,7 @@ with tab_listar:
                 with col2:
                     st.write(f"**Tipo:** {partida['tipo']}")
                 with col3:
-                    st.write(f"**ID:** {partida['id_partida']}")
+                    st.write(f"**ID:** {id_partida}")
                 with col4:
                     pass
                 
@@ -275,8 +280,9 @@ with tab_listar:
                 # Mostrar detalles en tabla
                 detalles_data = []
                 for det in partida['detalles']:
+                    cuenta_det = indice_cuentas.por_id.get(det['id_cuenta'])
                     detalles_data.append({
-                        'Cuenta ID': det['id_cuenta'],
+                        'Cuenta': catalogo.etiqueta(cuenta_det) if cuenta_det else str(det['id_cuenta']),
                         'Debe': f"${det['debe']:.2f}",
                         'Haber': f"${det['haber']:.2f}"
                     })
@@ -288,16 +294,29 @@ with tab_listar:
                 col_acc1, col_acc2, col_acc3 = st.columns(3)
                 
                 with col_acc1:
-                    if st.button(f"✏️ Editar", key=f"edit_{idx}", use_container_width=True):
+                    if st.button(f"✏️ Editar", key=f"edit_{id_partida}", use_container_width=True):
                         st.info("Función de edición: Elimina esta partida y crea una nueva con los cambios.")
                 
                 with col_acc2:
-                    if st.button(f"🗑️ Eliminar", key=f"del_{idx}", use_container_width=True):
-                        if eliminar_partida(partida['id_partida']):
-                            st.success(f"✅ Partida {partida['id_partida']} eliminada.")
+                    if st.button(f"🗑️ Eliminar", key=f"del_{id_partida}", use_container_width=True):
+                        if eliminar_partida(id_partida):
+                            st.success(f"✅ Partida {id_partida} eliminada.")
                             st.rerun()
                         else:
                             st.error(f"❌ No se pudo eliminar la partida. El servidor puede no tener endpoint DELETE.")
                 
                 with col_acc3:
-                    st.write("")  # Espaciador
\ No newline at end of file
+                    st.write("")  # Espaciador
+
+    # Navegación entre páginas
+    nav1, nav2, nav3 = st.columns([1, 2, 1])
+    with nav1:
+        if st.button("⬅️ Anterior", disabled=pagina == 1, use_container_width=True):
+            st.session_state.cursores_diario.pop()
+            st.rerun()
+    with nav2:
+        st.markdown(f"<div style='text-align: center'>Página {pagina}</div>", unsafe_allow_html=True)
+    with nav3:
+        if st.button("Siguiente ➡️", disabled=siguiente_cursor is None, use_container_width=True):
+            st.session_state.cursores_diario.append(siguiente_cursor)
+            st.rerun()
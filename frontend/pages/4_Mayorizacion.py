@@ -1,8 +1,9 @@
 import streamlit as st
-import requests
 import pandas as pd
-import os
-from datetime import date, datetime
+from datetime import date
+
+from utils import api, catalogo
+from utils.mayorizacion import movimientos_mayor, selector_cuentas
 
 # Intentamos importar utils, si no existen (para pruebas locales), usamos pass
 try:
@@ -13,9 +14,6 @@ try:
 except ImportError:
     pass
 
-# Configuración de la API
-API_URL = os.getenv("BACKEND_URL", "http://backend:8000")
-
 st.set_page_config(page_title="Mayorización", layout="wide", page_icon="📚")
 st.title("📚 Mayorización (Mayor Auxiliar)")
 st.markdown("---")
@@ -24,175 +22,155 @@ st.markdown("---")
 # FUNCIONES DE DATOS (CON CACHÉ)
 # ==========================================
 
+def obtener_cuentas():
+    """Catálogo de cuentas con sus índices por código, id y etiqueta (caché compartida entre páginas)."""
+    return catalogo.obtener_indice()
+
+
 @st.cache_data(ttl=10)  # Cachear por 10 segundos para evitar llamadas excesivas pero mantener datos frescos
-def obtener_datos_maestros():
+def obtener_resumen(desde, hasta, tipo=None, id_cuenta=None):
     """
-    Obtiene partidas y cuentas, y retorna un DataFrame 'aplanado' listo para analizar.
+    Obtiene el resumen de saldos por cuenta ya agrupado por el backend
+    (debe, haber y saldo según naturaleza), aplicando los filtros en SQL.
     """
-    # 1. Obtener Cuentas
-    cuentas_map = {}
+    params = {"desde": str(desde), "hasta": str(hasta)}
+    if tipo:
+        params["tipo"] = tipo
+    if id_cuenta:
+        params["id_cuenta"] = id_cuenta
     try:
-        r_cuentas = requests.get(f"{API_URL}/cuentas")
-        if r_cuentas.status_code == 200:
-            datos_cuentas = r_cuentas.json()
-        else:
-            st.warning(f"⚠️ No se pudo obtener cuentas: {r_cuentas.status_code}")
-            datos_cuentas = []
-        cuentas_map = {c['id_cuenta']: c for c in datos_cuentas}
+        r = api.get("/mayorizacion/", params=params)
+        if r.status_code == 200:
+            return pd.DataFrame(r.json())
+        st.warning(f"⚠️ No se pudo obtener la mayorización: {r.status_code}")
     except Exception as e:
-        st.error(f"Error conectando con cuentas: {e}")
-        return pd.DataFrame(), {}
+        st.error(f"Error procesando mayorización: {e}")
+    return pd.DataFrame()
 
-    # 2. Obtener Partidas
-    flat_data = []
+
+@st.cache_data(ttl=10)
+def obtener_movimientos(id_cuenta, desde, hasta, tipo=None):
+    """
+    Obtiene el libro mayor de una cuenta: saldo inicial y movimientos ordenados por fecha y
+    partida con el saldo acumulado ya calculado en el backend (se recorren todas las páginas).
+    """
+    params = {"desde": str(desde), "hasta": str(hasta), "limit": 2000}
+    if tipo:
+        params["tipo"] = tipo
+    movimientos, saldo_inicial = [], 0.0
     try:
-        r_partidas = requests.get(f"{API_URL}/partidas")
-        if r_partidas.status_code == 200:
-            partidas = r_partidas.json()
-        else:
-            st.warning(f"⚠️ No se pudo obtener partidas: {r_partidas.status_code}")
-            partidas = []
+        while True:
+            r = api.get(f"/mayor/{id_cuenta}", params=params)
+            if r.status_code != 200:
+                st.warning(f"⚠️ No se pudo obtener movimientos: {r.status_code}")
+                return pd.DataFrame(), 0.0
+            data = r.json()
+            saldo_inicial = data["saldo_inicial"]
+            movimientos.extend(data["movimientos"])
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+    except Exception as e:
+        st.error(f"Error procesando movimientos: {e}")
+        return pd.DataFrame(), 0.0
 
-        # APLANAR DATOS (Flattening)
-        # Convertimos la estructura anidada JSON en una tabla plana inmediatamente
-        for p in partidas:
-            fecha_dt = datetime.strptime(p['fecha'], "%Y-%m-%d").date()
-            for d in p.get('detalles', []):
-                cta = cuentas_map.get(d['id_cuenta'], {})
-                flat_data.append({
-                    "id_partida": p['id_partida'],
-                    "fecha": fecha_dt,
-                    "desc_partida": p['descripcion'],
-                    "tipo": p['tipo'],
-                    "id_cuenta": d['id_cuenta'],
-                    "codigo": cta.get('codigo', 'S/C'),
-                    "cuenta": cta.get('nombre', 'Desconocida'),
-                    "debe": float(d.get('debe', 0.0)),
-                    "haber": float(d.get('haber', 0.0))
-                })
+    return movimientos_mayor(movimientos), saldo_inicial
 
-    except Exception as e:
-        st.error(f"Error procesando partidas: {e}")
-        return pd.DataFrame(), {}
 
-    return pd.DataFrame(flat_data), cuentas_map
+def exportar_mayor(id_cuenta, desde, hasta, tipo=None, formato="csv"):
+    """Descarga del backend el mayor de la cuenta ya generado (CSV o XLSX, en streaming)."""
+    params = {"desde": str(desde), "hasta": str(hasta), "formato": formato}
+    if tipo:
+        params["tipo"] = tipo
+    try:
+        with api.get(f"/exportar/mayor/{id_cuenta}", params=params, stream=True) as r:
+            if r.status_code == 200:
+                return b"".join(r.iter_content(chunk_size=64 * 1024))
+            st.warning(f"⚠️ No se pudo exportar el mayor: {r.status_code}")
+    except Exception as e:
+        st.error(f"Error exportando mayor: {e}")
+    return None
 
 # ==========================================
 # INTERFAZ Y LÓGICA
 # ==========================================
 
-# 1. Cargar Datos
-with st.spinner("Cargando partidas y cuentas..."):
+# 1. Cargar Catálogo
+with st.spinner("Cargando cuentas..."):
     # Botón para forzar actualización
     col_refresh1, col_refresh2 = st.columns([4, 1])
     with col_refresh2:
         if st.button("🔄 Actualizar", use_container_width=True):
             st.cache_data.clear()
+            catalogo.invalidar()
             st.rerun()
     
-    df_master, map_cuentas = obtener_datos_maestros()
+    indice = obtener_cuentas()
 
-if df_master.empty:
+if not indice.cuentas:
     st.warning("No hay datos disponibles o hubo un error de conexión.")
     st.stop()
 
-# 2. Filtros
+# 2. Filtros (se envían al backend)
 with st.expander("🔍 Filtros de Mayorización", expanded=True):
     c1, c2, c3, c4 = st.columns(4)
     with c1:
-        # Validar que hay datos antes de obtener min/max
-        fecha_min = df_master['fecha'].min() if not df_master.empty else date.today()
-        f_inicio = st.date_input("Desde", value=fecha_min)
+        f_inicio = st.date_input("Desde", value=date(date.today().year, 1, 1))
     with c2:
-        fecha_max = df_master['fecha'].max() if not df_master.empty else date.today()
-        f_fin = st.date_input("Hasta", value=fecha_max)
+        f_fin = st.date_input("Hasta", value=date.today())
     with c3:
-        tipos_disp = ["Todos"] + list(df_master['tipo'].unique()) if not df_master.empty else ["Todos"]
-        f_tipo = st.selectbox("Tipo de Partida", tipos_disp)
+        f_tipo = st.selectbox("Tipo de Partida", ["Todos", "DIARIO", "AJUSTE", "CIERRE"])
     with c4:
         # Filtro opcional por cuenta específica desde el inicio
-        if not df_master.empty:
-            cuentas_disp = ["Todas"] + sorted([f"{c['codigo']} - {c['nombre']}" for c in map_cuentas.values()])
-        else:
-            cuentas_disp = ["Todas"]
-        f_cuenta = st.selectbox("Filtrar Cuenta", cuentas_disp)
+        # Las etiquetas ya vienen ordenadas por código en el índice compartido
+        f_cuenta = st.selectbox("Filtrar Cuenta", ["Todas"] + indice.etiquetas)
 
-# 3. Aplicar Filtros al DataFrame
-if not df_master.empty:
-    mask = (df_master['fecha'] >= f_inicio) & (df_master['fecha'] <= f_fin)
-    if f_tipo != "Todos":
-        mask = mask & (df_master['tipo'] == f_tipo)
-    if f_cuenta != "Todas":
-        # Extraer código de forma segura
-        try:
-            cod_filtro = f_cuenta.split(" - ")[0]
-            mask = mask & (df_master['codigo'] == cod_filtro)
-        except:
-            st.warning("⚠️ Error al procesar filtro de cuenta.")
-    
-    df_filtered = df_master.loc[mask].copy()
-else:
-    df_filtered = pd.DataFrame()
+tipo_filtro = None if f_tipo == "Todos" else f_tipo
+id_cuenta_filtro = None if f_cuenta == "Todas" else indice.por_etiqueta[f_cuenta]["id_cuenta"]
+
+# 3. Resumen agrupado por el backend
+with st.spinner("Calculando mayorización..."):
+    df_resumen = obtener_resumen(f_inicio, f_fin, tipo_filtro, id_cuenta_filtro)
 
 # ==========================================
 # VISTA 1: BALANCE DE COMPROBACIÓN (RESUMEN)
 # ==========================================
 st.subheader("📊 Resumen de Saldos")
 
-if df_filtered.empty:
+if df_resumen.empty:
     st.info("No hay movimientos con los filtros seleccionados.")
-else:
-    # Agrupación potente con Pandas (reemplaza los bucles manuales)
-    # Agrupamos por Código y Nombre, sumamos Debe y Haber
-    df_resumen = df_filtered.groupby(['codigo', 'cuenta'])[['debe', 'haber']].sum().reset_index()
-    
-    # Agregar tipo de cuenta al resumen para cálculo correcto de saldo
-    def obtener_tipo_cuenta(codigo):
-        for id_c, c_data in map_cuentas.items():
-            if c_data.get('codigo') == codigo:
-                return c_data.get('tipo', 'ACTIVO').upper()
-        return 'ACTIVO'
-    
-    df_resumen['tipo_cuenta'] = df_resumen['codigo'].apply(obtener_tipo_cuenta)
-    
-    # Calculamos Saldo considerando naturaleza contable
-    # DEUDORA (ACTIVO, GASTO): Saldo = Debe - Haber
-    # ACREEDORA (PASIVO, INGRESO, CAPITAL): Saldo = Haber - Debe
-    def calcular_saldo(row):
-        if row['tipo_cuenta'] in ['ACTIVO', 'GASTO']:
-            return row['debe'] - row['haber']
-        else:
-            return row['haber'] - row['debe']
-    
-    df_resumen['saldo'] = df_resumen.apply(calcular_saldo, axis=1)
-    
-    # Mostrar solo las columnas relevantes
-    df_mostrar = df_resumen[['codigo', 'cuenta', 'tipo_cuenta', 'debe', 'haber', 'saldo']]
-    df_mostrar.columns = ['Código', 'Cuenta', 'Tipo', 'Debe', 'Haber', 'Saldo']
-
-    st.dataframe(
-        df_mostrar,
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Código": "Código",
-            "Cuenta": "Cuenta",
-            "Tipo": "Tipo",
-            "Debe": st.column_config.NumberColumn("Total Debe", format="$ %.2f"),
-            "Haber": st.column_config.NumberColumn("Total Haber", format="$ %.2f"),
-            "Saldo": st.column_config.NumberColumn("Saldo Neto", format="$ %.2f"),
-        }
-    )
+    st.stop()
 
-    # Totales de control (Footer)
-    t_debe = df_resumen['debe'].sum()
-    t_haber = df_resumen['haber'].sum()
-    diff = t_debe - t_haber
-    
-    col_t1, col_t2, col_t3 = st.columns(3)
-    col_t1.metric("Suma Debe", f"${t_debe:,.2f}")
-    col_t2.metric("Suma Haber", f"${t_haber:,.2f}")
-    col_t3.metric("Cuadre", "✅ OK" if abs(diff) < 0.01 else f"❌ ${diff:,.2f}", delta_color="off" if abs(diff) < 0.01 else "inverse")
+# El saldo ya viene calculado según la naturaleza contable:
+# DEUDORA (ACTIVO, GASTO): Saldo = Debe - Haber
+# ACREEDORA (PASIVO, INGRESO, CAPITAL): Saldo = Haber - Debe
+df_mostrar = df_resumen[['codigo', 'cuenta', 'tipo_cuenta', 'debe', 'haber', 'saldo']]
+df_mostrar.columns = ['Código', 'Cuenta', 'Tipo', 'Debe', 'Haber', 'Saldo']
+
+st.dataframe(
+    df_mostrar,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "Código": "Código",
+        "Cuenta": "Cuenta",
+        "Tipo": "Tipo",
+        "Debe": st.column_config.NumberColumn("Total Debe", format="$ %.2f"),
+        "Haber": st.column_config.NumberColumn("Total Haber", format="$ %.2f"),
+        "Saldo": st.column_config.NumberColumn("Saldo Neto", format="$ %.2f"),
+    }
+)
+
+# Totales de control (Footer)
+t_debe = df_resumen['debe'].sum()
+t_haber = df_resumen['haber'].sum()
+diff = t_debe - t_haber
+
+col_t1, col_t2, col_t3 = st.columns(3)
+col_t1.metric("Suma Debe", f"${t_debe:,.2f}")
+col_t2.metric("Suma Haber", f"${t_haber:,.2f}")
+col_t3.metric("Cuadre", "✅ OK" if abs(diff) < 0.01 else f"❌ ${diff:,.2f}", delta_color="off" if abs(diff) < 0.01 else "inverse")
 
 # ==========================================
 # VISTA 2: MAYOR AUXILIAR DETALLADO (Running Balance)
@@ -200,54 +178,39 @@ else:
 st.markdown("---")
 st.subheader("🔎 Detalle por Cuenta (Libro Mayor)")
 
-# Selector dinámico basado en lo que quedó filtrado
-lista_cuentas_activas = df_filtered['cuenta'].unique()
-cuenta_sel = st.selectbox("Seleccione Cuenta para ver detalles:", sorted(lista_cuentas_activas))
+# Selector dinámico basado en las cuentas con movimientos en el resumen: etiqueta y
+# naturaleza se calculan por columna y la cuenta elegida se busca por índice
+df_cuentas_mov = selector_cuentas(df_resumen)
+cuenta_sel = st.selectbox("Seleccione Cuenta para ver detalles:", df_cuentas_mov.index)
 
 if cuenta_sel:
-    # Filtramos solo esa cuenta y ORDENAMOS por fecha (Crucial para saldo acumulado)
-    df_detalle = df_filtered[df_filtered['cuenta'] == cuenta_sel].sort_values(by=['fecha', 'id_partida'])
-    
-    # Obtener tipo de cuenta para calcular saldo correctamente
-    cuenta_detalle = None
-    for id_c, c_data in map_cuentas.items():
-        if c_data.get('nombre') == cuenta_sel:
-            cuenta_detalle = c_data
-            break
-    
-    # CÁLCULO DE SALDO ACUMULADO (RUNNING BALANCE)
-    # Considerar naturaleza de la cuenta:
-    # - DEUDORA (ACTIVO, GASTO): Saldo = Debe - Haber
-    # - ACREEDORA (PASIVO, INGRESO, CAPITAL): Saldo = Haber - Debe
-    es_deudora = cuenta_detalle.get('tipo', 'ACTIVO') if cuenta_detalle else True
-    es_deudora = es_deudora.upper() in ['ACTIVO', 'GASTO'] if isinstance(es_deudora, str) else True
-    
-    if es_deudora:
-        # Cuentas deudoras: Debe positivo, Haber negativo
-        df_detalle['mov_neto'] = df_detalle['debe'] - df_detalle['haber']
-    else:
-        # Cuentas acreedoras: Haber positivo, Debe negativo
-        df_detalle['mov_neto'] = df_detalle['haber'] - df_detalle['debe']
-    
-    df_detalle['saldo_acumulado'] = df_detalle['mov_neto'].cumsum()
+    fila_cuenta = df_cuentas_mov.loc[cuenta_sel]
+    # El backend devuelve solo esa cuenta ORDENADA por fecha (Crucial para saldo acumulado)
+    df_detalle, saldo_inicial = obtener_movimientos(fila_cuenta.id_cuenta, f_inicio, f_fin, tipo_filtro)
+    if df_detalle.empty:
+        st.info("La cuenta no tiene movimientos en el período.")
+        st.stop()
+
+    # El saldo acumulado (según la naturaleza de la cuenta) ya viene del backend e incluye
+    # el saldo anterior a la fecha inicial
 
     # Métricas de cabecera
     saldo_actual = df_detalle['saldo_acumulado'].iloc[-1]
-    naturaleza = "DEUDORA" if es_deudora else "ACREEDORA"
-    m_c1, m_c2, m_c3 = st.columns([2, 1, 1])
+    m_c1, m_c2, m_c3, m_c4 = st.columns([2, 1, 1, 1])
     m_c1.info(f"Movimientos de: **{cuenta_sel}**")
-    m_c2.metric("Naturaleza", naturaleza)
-    m_c3.metric("Saldo al cierre", f"${saldo_actual:,.2f}")
+    m_c2.metric("Naturaleza", fila_cuenta.naturaleza)
+    m_c3.metric("Saldo inicial", f"${saldo_inicial:,.2f}")
+    m_c4.metric("Saldo al cierre", f"${saldo_actual:,.2f}")
 
     # Tabla detallada
     st.dataframe(
-        df_detalle[['fecha', 'tipo', 'desc_partida', 'debe', 'haber', 'saldo_acumulado']],
+        df_detalle[['fecha', 'tipo', 'descripcion', 'debe', 'haber', 'saldo_acumulado']],
         use_container_width=True,
         hide_index=True,
         column_config={
             "fecha": st.column_config.DateColumn("Fecha"),
             "tipo": "Tipo",
-            "desc_partida": "Concepto",
+            "descripcion": "Concepto",
             "debe": st.column_config.NumberColumn("Debe", format="$ %.2f"),
             "haber": st.column_config.NumberColumn("Haber", format="$ %.2f"),
             "saldo_acumulado": st.column_config.NumberColumn(
@@ -262,11 +225,19 @@ if cuenta_sel:
     st.markdown("##### Evolución del Saldo")
     st.line_chart(df_detalle, x='fecha', y='saldo_acumulado')
 
-    # Exportación individual
-    csv = df_detalle.to_csv(index=False)
-    st.download_button(
-        label=f"📥 Descargar Mayor de {cuenta_sel}",
-        data=csv,
-        file_name=f"mayor_{cuenta_sel}_{date.today()}.csv",
-        mime="text/csv"
-    )
\ No newline at end of file
+    # Exportación individual: el archivo lo genera el backend con el saldo inicial incluido
+    col_fmt, col_exp = st.columns([1, 3])
+    with col_fmt:
+        formato = st.radio("Formato", ["csv", "xlsx"], horizontal=True)
+    with col_exp:
+        if st.button(f"📥 Exportar Mayor de {cuenta_sel}"):
+            with st.spinner("Generando archivo..."):
+                contenido = exportar_mayor(fila_cuenta.id_cuenta, f_inicio, f_fin, tipo_filtro, formato)
+            if contenido:
+                st.download_button(
+                    label="Guardar archivo",
+                    data=contenido,
+                    file_name=f"mayor_{fila_cuenta.codigo}_{date.today()}.{formato}",
+                    mime="text/csv" if formato == "csv" else
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
\ No newline at end of file
@@ -1,10 +1,86 @@
 
+from datetime import date
+
+import pandas as pd
 import streamlit as st
 
+from utils import api
 from utils.auth import require_login
 from utils.sidebar import render_sidebar
 
+
 require_login()
 render_sidebar()
 st.title("📘 Balanza de Comprobación")
-st.write("Página: Balanza de Comprobación. Implementa aquí los formularios y llamadas a la API.")
+st.markdown("---")
+
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio",
+         "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+
+@st.cache_data(ttl=10)
+def obtener_balanza(periodo, regenerar=False):
+    """Obtiene la balanza precalculada del período (primer día del mes)."""
+    try:
+        r = api.get("/balanza/", params={"periodo": str(periodo), "regenerar": regenerar})
+        if r.status_code == 200:
+            return pd.DataFrame(r.json())
+        st.warning(f"⚠️ No se pudo obtener la balanza: {r.status_code}")
+    except Exception as e:
+        st.error(f"Error de conexión con backend: {e}")
+    return pd.DataFrame()
+
+
+# 1. Selección del período
+hoy = date.today()
+c1, c2, c3 = st.columns([1, 1, 1])
+with c1:
+    anio = st.number_input("Año", min_value=2000, max_value=2100, value=hoy.year, step=1)
+with c2:
+    mes = st.selectbox("Mes", MESES, index=hoy.month - 1)
+with c3:
+    st.write("")
+    st.write("")
+    regenerar = st.button("🔄 Regenerar", use_container_width=True)
+    if regenerar:
+        st.cache_data.clear()
+
+periodo = date(int(anio), MESES.index(mes) + 1, 1)
+
+with st.spinner("Cargando balanza..."):
+    df = obtener_balanza(periodo, regenerar)
+
+if df.empty:
+    st.info("No hay saldos ni movimientos para el período seleccionado.")
+    st.stop()
+
+# 2. Tabla de la balanza
+df_mostrar = df[['codigo', 'cuenta', 'tipo_cuenta', 'saldo_anterior', 'debe', 'haber', 'saldo_deudor', 'saldo_acreedor']]
+st.dataframe(
+    df_mostrar,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "codigo": "Código",
+        "cuenta": "Cuenta",
+        "tipo_cuenta": "Tipo",
+        "saldo_anterior": st.column_config.NumberColumn("Saldo Anterior", format="$ %.2f",
+                                                        help="Saldo acumulado al cierre del mes anterior (Debe - Haber)"),
+        "debe": st.column_config.NumberColumn("Movimientos Debe", format="$ %.2f"),
+        "haber": st.column_config.NumberColumn("Movimientos Haber", format="$ %.2f"),
+        "saldo_deudor": st.column_config.NumberColumn("Saldo Deudor", format="$ %.2f"),
+        "saldo_acreedor": st.column_config.NumberColumn("Saldo Acreedor", format="$ %.2f"),
+    }
+)
+
+# 3. Totales de control
+t_debe, t_haber = df['debe'].sum(), df['haber'].sum()
+t_deudor, t_acreedor = df['saldo_deudor'].sum(), df['saldo_acreedor'].sum()
+diff = t_deudor - t_acreedor
+
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("Movimientos Debe", f"${t_debe:,.2f}")
+col2.metric("Movimientos Haber", f"${t_haber:,.2f}")
+col3.metric("Saldos Deudores", f"${t_deudor:,.2f}")
+col4.metric("Saldos Acreedores", f"${t_acreedor:,.2f}")
+col5.metric("Cuadre", "✅ OK" if abs(diff) < 0.01 else f"❌ ${diff:,.2f}")
@@ -1,10 +1,100 @@
 
+from datetime import date
+
+import pandas as pd
 import streamlit as st
 
+from utils import api
 from utils.auth import require_login
 from utils.sidebar import render_sidebar
 
+
 require_login()
 render_sidebar()
 st.title("📘 Estados Financieros")
-st.write("Página: Estados Financieros. Implementa aquí los formularios y llamadas a la API.")
+st.markdown("---")
+
+
+@st.cache_data(ttl=10)
+def obtener_estado(reporte, desde, hasta, max_nivel):
+    """Obtiene un estado financiero calculado (y memorizado) por el backend."""
+    params = {"hasta": str(hasta)}
+    if desde:
+        params["desde"] = str(desde)
+    if max_nivel:
+        params["max_nivel"] = max_nivel
+    try:
+        r = api.get(f"/estados_financieros/{reporte}", params=params)
+        if r.status_code == 200:
+            return r.json()
+        st.warning(f"⚠️ No se pudo obtener el reporte: {r.status_code}")
+    except Exception as e:
+        st.error(f"Error de conexión con backend: {e}")
+    return None
+
+
+def mostrar_seccion(titulo, seccion):
+    st.markdown(f"#### {titulo}")
+    df = pd.DataFrame(seccion["cuentas"])
+    if df.empty:
+        st.caption("Sin saldos.")
+    else:
+        # Sangría según el nivel de la cuenta en el catálogo
+        df["cuenta"] = df["nivel"].fillna(1).astype(int).map(lambda n: " " * (n - 1)) + df["cuenta"]
+        st.dataframe(
+            df[["codigo", "cuenta", "saldo"]],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "codigo": "Código",
+                "cuenta": "Cuenta",
+                "saldo": st.column_config.NumberColumn("Saldo", format="$ %.2f"),
+            }
+        )
+    st.markdown(f"**Total {titulo}: ${seccion['total']:,.2f}**")
+
+
+# 1. Filtros
+hoy = date.today()
+c1, c2, c3 = st.columns([1, 1, 1])
+with c1:
+    desde = st.date_input("Desde", value=date(hoy.year, 1, 1))
+with c2:
+    hasta = st.date_input("Hasta", value=hoy)
+with c3:
+    max_nivel = st.selectbox("Nivel de detalle", ["Todos", 1, 2, 3, 4], index=0)
+max_nivel = None if max_nivel == "Todos" else max_nivel
+
+if desde > hasta:
+    st.error("La fecha inicial no puede ser mayor que la final.")
+    st.stop()
+
+tab_balance, tab_resultados = st.tabs(["🏦 Balance General", "📈 Estado de Resultados"])
+
+# 2. Balance General a la fecha de corte
+with tab_balance:
+    balance = obtener_estado("balance_general", None, hasta, max_nivel)
+    if balance:
+        st.caption(f"Al {hasta.strftime('%d/%m/%Y')}")
+        col_a, col_b = st.columns(2)
+        with col_a:
+            mostrar_seccion("Activo", balance["activo"])
+        with col_b:
+            mostrar_seccion("Pasivo", balance["pasivo"])
+            mostrar_seccion("Capital", balance["capital"])
+            st.markdown(f"Resultado del ejercicio: **${balance['resultado_ejercicio']:,.2f}**")
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Total Activo", f"${balance['activo']['total']:,.2f}")
+        m2.metric("Pasivo + Capital", f"${balance['total_pasivo_capital']:,.2f}")
+        m3.metric("Cuadre", "✅ OK" if balance["cuadrado"] else "❌ Descuadrado")
+
+# 3. Estado de Resultados del período
+with tab_resultados:
+    resultados = obtener_estado("estado_resultados", desde, hasta, max_nivel)
+    if resultados:
+        st.caption(f"Del {desde.strftime('%d/%m/%Y')} al {hasta.strftime('%d/%m/%Y')}")
+        mostrar_seccion("Ingresos", resultados["ingresos"])
+        mostrar_seccion("Gastos", resultados["gastos"])
+        utilidad = resultados["utilidad_neta"]
+        st.metric("Utilidad neta" if utilidad >= 0 else "Pérdida neta", f"${utilidad:,.2f}")
@@ -7,7 +7,8 @@ st.title("📝 Registrar Usuario")
 username = st.text_input("Usuario")
 password = st.text_input("Contraseña", type="password")
 nombre = st.text_input("Nombre completo")
-rol = st.selectbox("Rol", ["admin", "usuario"])
+# Solo un administrador puede crear otros administradores (el backend lo exige)
+rol = st.selectbox("Rol", ["admin", "usuario"]) if st.session_state.get("rol") == "admin" else "usuario"
 
 if st.button("Registrar"):
     if register_user(username, password, nombre, rol):
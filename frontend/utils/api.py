@@ -0,0 +1,64 @@
+import os
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.getenv("BACKEND_URL", "http://backend:8000")
+
+# (conexión, lectura) en segundos
+TIMEOUT = (float(os.getenv("API_TIMEOUT_CONEXION", "3")), float(os.getenv("API_TIMEOUT_LECTURA", "30")))
+
+
+@st.cache_resource
+def _sesion() -> requests.Session:
+    """
+    Sesión HTTP única por proceso de Streamlit: reutiliza las conexiones (keep-alive) y
+    reintenta con backoff los errores de conexión y los 502/503/504. Los POST solo se
+    reintentan si la conexión falló antes de enviarse.
+    """
+    reintentos = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=reintentos)
+    sesion = requests.Session()
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+def _encabezados(extra=None) -> dict:
+    # La sesión se comparte entre usuarios: el token se agrega en cada llamada, nunca en la sesión
+    encabezados = dict(extra or {})
+    token = st.session_state.get("token")
+    if token:
+        encabezados.setdefault("Authorization", f"Bearer {token}")
+    return encabezados
+
+
+def solicitar(metodo: str, ruta: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", TIMEOUT)
+    kwargs["headers"] = _encabezados(kwargs.get("headers"))
+    return _sesion().request(metodo, f"{API_URL}{ruta}", **kwargs)
+
+
+def get(ruta: str, **kwargs) -> requests.Response:
+    return solicitar("GET", ruta, **kwargs)
+
+
+def post(ruta: str, **kwargs) -> requests.Response:
+    return solicitar("POST", ruta, **kwargs)
+
+
+def put(ruta: str, **kwargs) -> requests.Response:
+    return solicitar("PUT", ruta, **kwargs)
+
+
+def delete(ruta: str, **kwargs) -> requests.Response:
+    return solicitar("DELETE", ruta, **kwargs)
@@ -1,13 +1,12 @@
-import os
-import requests
 import streamlit as st
 
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+from utils import api
+
 
 def login(username, password):
     try:
-        r = requests.post(
-            f"{BACKEND_URL}/auth/login",
+        r = api.post(
+            "/auth/login",
             json={"username": username, "password": password}
         )
 
@@ -28,8 +27,8 @@ def login(username, password):
 
 def register_user(username, password, nombre, rol):
     try:
-        r = requests.post(
-            f"{BACKEND_URL}/auth/register",
+        r = api.post(
+            "/auth/register",
             json={
                 "username": username,
                 "password": password,
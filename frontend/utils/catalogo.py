@@ -0,0 +1,56 @@
+import os
+
+import streamlit as st
+
+from utils import api
+
+# Segundos antes de revalidar el catálogo con el backend (If-None-Match: si no cambió
+# la respuesta es un 304 vacío). Las ediciones del catálogo lo invalidan al momento.
+CATALOGO_TTL = int(os.getenv("CATALOGO_TTL", "60"))
+
+
+class IndiceCuentas:
+    """Catálogo de cuentas con índices por código, por id y por etiqueta 'codigo - nombre'."""
+
+    def __init__(self, cuentas: list):
+        self.cuentas = sorted(cuentas, key=lambda c: c["codigo"])
+        self.por_codigo = {c["codigo"]: c for c in self.cuentas}
+        self.por_id = {c["id_cuenta"]: c for c in self.cuentas}
+        self.por_etiqueta = {etiqueta(c): c for c in self.cuentas}
+        self.etiquetas = list(self.por_etiqueta)
+
+
+def etiqueta(cuenta: dict) -> str:
+    return f"{cuenta['codigo']} - {cuenta['nombre']}"
+
+
+# Última versión descargada, para revalidar con su ETag al vencer el TTL
+_ultimo = {"etag": None, "indice": None}
+
+
+@st.cache_resource(ttl=CATALOGO_TTL, show_spinner=False)
+def _cargar_indice() -> IndiceCuentas:
+    encabezados = {"If-None-Match": _ultimo["etag"]} if _ultimo["etag"] else {}
+    r = api.get("/cuentas/", headers=encabezados)
+    if r.status_code == 304 and _ultimo["indice"] is not None:
+        return _ultimo["indice"]
+    r.raise_for_status()  # un error no se guarda en caché: se reintenta en la próxima llamada
+
+    indice = IndiceCuentas(r.json())
+    _ultimo.update(etag=r.headers.get("ETag"), indice=indice)
+    return indice
+
+
+def obtener_indice() -> IndiceCuentas:
+    """Índice compartido entre páginas y usuarios; es de solo lectura."""
+    try:
+        return _cargar_indice()
+    except Exception as e:
+        st.error(f"Error cargando el catálogo de cuentas: {e}")
+        return IndiceCuentas([])
+
+
+def invalidar():
+    """Llamar después de crear, editar o eliminar cuentas."""
+    _ultimo.update(etag=None, indice=None)
+    _cargar_indice.clear()
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+# Naturaleza contable:
+# DEUDORA (ACTIVO, GASTO): Saldo = Debe - Haber
+# ACREEDORA (PASIVO, INGRESO, CAPITAL): Saldo = Haber - Debe
+TIPOS_DEUDORES = ("ACTIVO", "GASTO")
+
+
+def signo_naturaleza(tipos: pd.Series) -> np.ndarray:
+    """1 para las cuentas deudoras y -1 para las acreedoras (sin tipo cuenta como ACTIVO), sobre toda la columna."""
+    return np.where(tipos.fillna("ACTIVO").str.upper().isin(TIPOS_DEUDORES), 1, -1)
+
+
+def naturaleza(tipos: pd.Series) -> np.ndarray:
+    return np.where(signo_naturaleza(tipos) == 1, "DEUDORA", "ACREEDORA")
+
+
+def selector_cuentas(resumen: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cuentas del resumen indexadas por su etiqueta 'código - cuenta' y con su naturaleza,
+    calculadas por columna: la cuenta elegida en el selector se busca con `.loc`.
+    """
+    return resumen.assign(
+        etiqueta=resumen["codigo"] + " - " + resumen["cuenta"],
+        naturaleza=naturaleza(resumen["tipo_cuenta"]),
+    ).set_index("etiqueta")
+
+
+def movimientos_mayor(movimientos: list) -> pd.DataFrame:
+    """Movimientos de GET /mayor como DataFrame: fecha como date y el saldo como `saldo_acumulado`."""
+    df = pd.DataFrame(movimientos)
+    if df.empty:
+        return df
+    # Las fechas llegan en ISO (AAAA-MM-DD): con el formato explícito pandas las convierte
+    # en bloque, sin inferir el formato ni analizar fila por fila
+    df["fecha"] = pd.to_datetime(df["fecha"], format="%Y-%m-%d").dt.date
+    return df.rename(columns={"saldo": "saldo_acumulado"})